@@ -0,0 +1,59 @@
+"""
+Counts the database round-trips of authenticated requests, with and
+without the cache of authenticated users.
+
+Run from the repository root: python -m benchmarks.auth_round_trips_benchmark
+"""
+import os
+
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark_secret_key')
+
+from src import config, create_app
+from src.cache import cache
+from src.cache.backends import MemoryCacheBackend
+from src.database.models import Base
+from src.database.setup import engine, initialize_default_data
+from tests.api.routes.helper_requests import create_portfolio, register_user
+from tests.database.helper_queries import count_queries
+
+REQUESTS = 100
+ENDPOINTS = ['/user/refresh', '/user/portfolios']
+
+
+def count_round_trips(client, auth_token: str, endpoint: str, ttl: float):
+    """
+    Sends GET requests to an endpoint and counts the executed SQL statements.
+        Parameters:
+            FlaskClient client;
+            str auth_token;
+            str endpoint;
+            float ttl: TTL of the cached users, 0 disables the cache;
+        Returns:
+            float: Average number of statements per request.
+    """
+    cache._cache = cache.Cache(MemoryCacheBackend(config.CACHE_MAX_BYTES),
+                               {**config.CACHE_TTL, 'principal': ttl})
+
+    with count_queries() as statements:
+        for _ in range(REQUESTS):
+            response = client.get(endpoint, headers={'Authorization': 'Bearer ' + auth_token})
+            assert response.status_code == 200
+
+    return len(statements) / REQUESTS
+
+
+if __name__ == '__main__':
+    Base.metadata.create_all(engine)
+    initialize_default_data()
+
+    app = create_app()
+    with app.test_client() as client, app.app_context():
+        auth_token = register_user(client, 'round.trips@example.com', 'Password123!')
+        create_portfolio(client, auth_token, 'Portfolio')
+
+        print(f'{"Endpoint":<20}{"Uncached":>10}{"Cached":>10}  (statements per request)')
+        for endpoint in ENDPOINTS:
+            uncached = count_round_trips(client, auth_token, endpoint, 0)
+            cached = count_round_trips(client, auth_token, endpoint, config.CACHE_TTL['principal'])
+            print(f'{endpoint:<20}{uncached:>10.2f}{cached:>10.2f}')
@@ -0,0 +1,112 @@
+"""
+Benchmark of the response compression for typical response bodies.
+Measures bytes on the wire and the CPU time of compressing every body
+with every supported encoding.
+
+Run from the repository root: python -m benchmarks.compression_benchmark
+"""
+import os
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+
+from benchmarks.serializer_benchmark import create_portfolio_tree
+from src.api.utils.compression import compress, get_available_encodings
+from src.api.utils.json_provider import FastJSONProvider
+
+REPETITIONS = 20
+
+
+def create_price_history(years: int):
+    """
+    Creates random daily price data.
+        Parameters:
+            int years;
+        Returns:
+            DataFrame
+    """
+    end = pd.Timestamp.now(tz='UTC').normalize()
+    dates = pd.bdate_range(end - pd.DateOffset(years=years), end, name='Date')
+    close = 100 * np.cumprod(1 + np.random.normal(0, 0.01, len(dates)))
+    return pd.DataFrame({
+        'Date': dates, 'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': np.random.randint(1e6, 1e7, len(dates)),
+        'Dividends': 0.0, 'Stock Splits': 0.0
+    })
+
+
+def create_etf_info():
+    """
+    Creates ETF data in the format of get_etf_info.
+        Parameters:
+            -
+        Returns:
+            dict
+    """
+    return {
+        'fund_holding_info': {
+            'holdings': [{'symbol': f'T{i}', 'holdingName': f'Holding Company {i} Inc.',
+                          'holdingPercent': 0.05 / (i + 1)} for i in range(10)],
+            'sectorWeightings': [{f'sector_{i}': 1 / 11} for i in range(11)],
+            'equityHoldings': {'priceToEarnings': 21.5, 'priceToBook': 3.6}
+        },
+        'fund_profile': {'family': 'Fund Family', 'categoryName': 'Large Blend',
+                         'feesExpensesInvestment': {'annualReportExpenseRatio': 0.0024}}
+    }
+
+
+def create_bodies():
+    """
+    Creates the response bodies of the benchmarked endpoints.
+        Parameters:
+            -
+        Returns:
+            Dict[str, bytes]
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    price_10y = create_price_history(10)
+    price_max = create_price_history(40)
+    columns = {column: price_10y[column].to_numpy() for column in price_10y.columns[1:]}
+
+    return {
+        'priceData 10y': price_10y.to_json(orient='records', date_format='iso').encode(),
+        'priceData max': price_max.to_json(orient='records', date_format='iso').encode(),
+        'priceData 10y columns': app.json.dump_bytes(columns),
+        'ticker (ETF)': app.json.dump_bytes(create_etf_info()),
+        'portfolio (500 elements)': app.json.dump_bytes(create_portfolio_tree(500).to_json())
+    }
+
+
+def measure(body: bytes, encoding: str, repetitions: int):
+    """
+    Measures the compressed size and the average compression time of a body.
+        Parameters:
+            bytes body;
+            str encoding;
+            int repetitions;
+        Returns:
+            tuple:
+                int: Compressed size in bytes.
+                float: Average duration in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        compressed = compress(body, encoding)
+    return len(compressed), (time.perf_counter() - start) / repetitions * 1000
+
+
+if __name__ == '__main__':
+    print(f'{"Response":<26}{"Encoding":<10}{"Bytes":>10}{"Ratio":>8}{"CPU":>10}')
+
+    for name, body in create_bodies().items():
+        print(f'{name:<26}{"identity":<10}{len(body):>10}{1:>8.2f}{0:>8.2f}ms')
+
+        for encoding in get_available_encodings():
+            size, duration = measure(body, encoding, REPETITIONS)
+            print(f'{"":<26}{encoding:<10}{size:>10}{size / len(body):>8.2f}{duration:>8.2f}ms')
@@ -0,0 +1,85 @@
+"""
+Benchmark of the per-request overhead of the authentication decorators
+on an empty handler. Compares the decorator stack with the previous
+signature validation on every request.
+
+Run from the repository root: python -m benchmarks.decorator_benchmark
+"""
+import os
+import time
+
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark_secret_key')
+
+from src import create_app
+from src.api.utils import decorators
+from src.api.utils.decorators import jwt_required, validate_portfolio_owner
+from src.database.models import Base
+from src.database.setup import engine, initialize_default_data
+from tests.api.routes.helper_requests import create_portfolio, register_user
+
+REPETITIONS = 2000
+
+
+def empty_handler(user_id: str, portfolio):
+    return None
+
+
+def per_request_validation(func):
+    """
+    Wraps a decorated handler, so the signature validation of the previous
+    implementation runs on every request again.
+        Parameters:
+            function func;
+        Returns:
+            function
+    """
+
+    def wrapper(*args, **kwargs):
+        decorators.validate_function_params(empty_handler, ['user_id'])
+        decorators.validate_function_params(empty_handler, ['user_id', 'portfolio'])
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def measure(app, handler, path: str, auth_token: str):
+    """
+    Calls a handler within the context of a request.
+        Parameters:
+            Flask app;
+            function handler;
+            str path;
+            str auth_token;
+        Returns:
+            float: Average duration in microseconds.
+    """
+    headers = {'Authorization': 'Bearer ' + auth_token}
+    portfolio_id = path.rsplit('/', 1)[-1]
+
+    with app.test_request_context(path, headers=headers):
+        start = time.perf_counter()
+        for _ in range(REPETITIONS):
+            handler(portfolio_id=portfolio_id)
+        return (time.perf_counter() - start) / REPETITIONS * 1e6
+
+
+if __name__ == '__main__':
+    Base.metadata.create_all(engine)
+    initialize_default_data()
+
+    app = create_app()
+    with app.test_client() as client, app.app_context():
+        auth_token = register_user(client, 'decorators@example.com', 'Password123!')
+        portfolio_id = create_portfolio(client, auth_token, 'Portfolio')
+        path = f'/user/portfolios/{portfolio_id}'
+
+        stack = jwt_required(validate_portfolio_owner(empty_handler))
+        handlers = {
+            'empty handler': lambda portfolio_id: empty_handler('', None),
+            'decorator stack': stack,
+            'per-request validation': per_request_validation(stack)
+        }
+
+        for name, handler in handlers.items():
+            print(f'{name:<24}{measure(app, handler, path, auth_token):>10.1f}us')
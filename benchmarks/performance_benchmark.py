@@ -0,0 +1,70 @@
+"""
+Benchmark of the portfolio performance calculation for a portfolio with
+500 holdings and 10 years of daily price data, served from the cache of
+the price history store.
+
+Run from the repository root: python -m benchmarks.performance_benchmark
+"""
+import os
+import time
+
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+# The pickled price histories need about 85MB, more than the default cache size
+os.environ.setdefault('CACHE_MAX_BYTES', str(256 * 1024 * 1024))
+
+from benchmarks.compression_benchmark import create_price_history
+from src.database.models import Base
+from src.database.setup import engine, initialize_default_data
+from src.market_data import price_data
+from src.portfolio_analysis.performance import get_portfolio_performance
+from tests.database.helper_queries import (generate_new_asset_type,
+                                           generate_new_portfolio,
+                                           generate_new_user, insert_new_asset,
+                                           insert_new_portfolio_element)
+
+HOLDINGS = 500
+YEARS = 10
+REPETITIONS = 10
+
+
+def create_portfolio(holdings: int):
+    """
+    Creates a portfolio with one element per holding.
+        Parameters:
+            int holdings;
+        Returns:
+            str: The portfolio ID.
+    """
+    portfolio = generate_new_portfolio(generate_new_user().id)
+    asset_type = generate_new_asset_type()
+
+    for i in range(holdings):
+        asset = insert_new_asset(f'T{i}', f'T{i}', None, 'USD', asset_type.id)
+        insert_new_portfolio_element(portfolio.id, asset.id, 10.0, 1.0, 0.0)
+
+    return portfolio.id
+
+
+if __name__ == '__main__':
+    Base.metadata.create_all(engine)
+    initialize_default_data()
+    portfolio_id = create_portfolio(HOLDINGS)
+
+    # Random price data instead of yahoo finance, stored in the cache on the first call.
+    # Every ticker misses some bars, so the dates need to be aligned.
+    price_history = create_price_history(YEARS)
+    price_data.fetch_for_symbol = lambda ticker, fetch: price_history.sample(
+        frac=0.98).sort_index().reset_index(drop=True)
+
+    start = time.perf_counter()
+    performance = get_portfolio_performance(portfolio_id, '10y', '1d')
+    cold = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(REPETITIONS):
+        get_portfolio_performance(portfolio_id, '10y', '1d')
+    cached = (time.perf_counter() - start) / REPETITIONS * 1000
+
+    print(f'{HOLDINGS} holdings, {len(performance["dates"])} dates')
+    print(f'Cold (cache filled)  : {cold:>8.1f}ms')
+    print(f'Cached price history:  {cached:>8.1f}ms')
@@ -0,0 +1,67 @@
+"""
+Benchmark of repeated 10y daily price data requests with the local price history store.
+Yahoo Finance is simulated with a fixed latency, so the benchmark runs offline.
+
+Run from the repository root: python -m benchmarks.price_history_benchmark
+"""
+import os
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+import numpy as np
+import pandas as pd
+
+from src.database.models import Base
+from src.database.setup import engine
+from src.market_data import price_history_store
+
+SIMULATED_LATENCY = 0.3  # Seconds per Yahoo Finance request
+REPETITIONS = 20
+
+
+class SimulatedTicker:
+    """
+    Replaces the yfinance Ticker with 10 years of random daily price data.
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    def history(self, period: str = None, start=None, **kwargs):
+        time.sleep(SIMULATED_LATENCY)
+
+        end = pd.Timestamp.now(tz='America/New_York').normalize()
+        index = pd.bdate_range(end - pd.DateOffset(years=10), end, name='Date')
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.01, len(index)))
+        df = pd.DataFrame({
+            'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+            'Volume': np.random.randint(1e6, 1e7, len(index)),
+            'Dividends': 0.0, 'Stock Splits': 0.0
+        }, index=index)
+
+        return df if start is None else df[df.index >= start]
+
+
+def measure(repetitions: int):
+    """
+    Measures the average duration of a 10y daily price data request.
+        Parameters:
+            int repetitions;
+        Returns:
+            float: Average duration in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        df = price_history_store.get_stored_price_history('AAPL', '10y', '1d')
+        df.to_json(orient='records', date_format='iso')
+    return (time.perf_counter() - start) / repetitions * 1000
+
+
+if __name__ == '__main__':
+    price_history_store.yf.Ticker = SimulatedTicker
+    Base.metadata.create_all(engine)
+
+    print(f'Simulated Yahoo Finance latency: {SIMULATED_LATENCY * 1000:.0f} ms')
+    print(f'First request (fetch and store): {measure(1):.1f} ms')
+    print(f'Repeated requests (local read):  {measure(REPETITIONS):.1f} ms')
@@ -0,0 +1,96 @@
+"""
+Benchmark of the JSON serialization of a portfolio with 10,000 elements.
+Compares the compiled serializers with the previous reflective Model.to_json.
+
+Run from the repository root: python -m benchmarks.serializer_benchmark
+"""
+import os
+import time
+import uuid
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from src.database.models import Asset, AssetType, Portfolio, PortfolioElement
+
+ELEMENTS = 10_000
+REPETITIONS = 10
+
+
+def reflective_to_json(obj):
+    """
+    Previous implementation of Model.to_json, which inspects the mapper of
+    every object on every call.
+        Parameters:
+            Model obj;
+        Returns:
+            dict: The object in dictionary format.
+    """
+    relationships = obj.__mapper__.relationships.keys()
+
+    json_values = obj._json_values
+    if len(json_values) == 0:
+        json_values = obj.__table__.columns.keys()
+
+    json_data = {}
+
+    for key in json_values:
+        if key in relationships:
+            if obj.__mapper__.relationships[key].uselist:
+                json_data[key] = [reflective_to_json(item) for item in getattr(obj, key)]
+            else:
+                json_data[key] = reflective_to_json(getattr(obj, key))
+        else:
+            json_data[key] = getattr(obj, key)
+
+    return json_data
+
+
+def create_portfolio_tree(element_count: int):
+    """
+    Creates a portfolio with elements of different assets, without a database.
+        Parameters:
+            int element_count;
+        Returns:
+            Portfolio
+    """
+    asset_type = AssetType(id=uuid.uuid4(), name='Stock',
+                           quote_type='EQUITY', unit_type='shares')
+    portfolio = Portfolio(id=uuid.uuid4(), name='Benchmark')
+
+    for i in range(element_count):
+        asset = Asset(id=uuid.uuid4(), name=f'Asset {i}', ticker_symbol=f'T{i}',
+                      isin=f'US{i:010d}', default_currency='USD', asset_type=asset_type)
+        portfolio.elements.append(PortfolioElement(
+            id=uuid.uuid4(), count=10.0, buy_price=100.0, order_fee=1.0,
+            portfolio_id=portfolio.id, asset=asset))
+
+    return portfolio
+
+
+def measure(serialize, portfolio: Portfolio, repetitions: int):
+    """
+    Measures the average duration of serializing the portfolio.
+        Parameters:
+            Callable serialize;
+            Portfolio portfolio;
+            int repetitions;
+        Returns:
+            float: Average duration in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        serialize(portfolio)
+    return (time.perf_counter() - start) / repetitions * 1000
+
+
+if __name__ == '__main__':
+    portfolio = create_portfolio_tree(ELEMENTS)
+
+    assert reflective_to_json(portfolio) == portfolio.to_json()
+
+    reflective = measure(reflective_to_json, portfolio, REPETITIONS)
+    compiled = measure(Portfolio.to_json, portfolio, REPETITIONS)
+
+    print(f'Portfolio with {ELEMENTS} elements, average of {REPETITIONS} runs')
+    print(f'Reflective to_json:  {reflective:.1f}ms')
+    print(f'Compiled serializer: {compiled:.1f}ms ({reflective / compiled:.1f}x faster)')
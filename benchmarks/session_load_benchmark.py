@@ -0,0 +1,81 @@
+"""
+Load test of concurrent authenticated requests against the database.
+Compares one session shared by all threads with the request-scoped sessions.
+
+Run from the repository root: python -m benchmarks.session_load_benchmark
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), 'load_test.sqlite3')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_FILE}'
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark_secret_key')
+
+from src import create_app
+from src.database import queries
+from src.database.models import Base
+from src.database.setup import Session, engine, initialize_default_data
+from tests.api.routes.helper_requests import create_portfolio, register_user
+
+THREADS = 8
+REQUESTS_PER_THREAD = 50
+
+
+def run_load_test(app, auth_token: str):
+    """
+    Sends GET /user/portfolios requests from multiple threads at the same time.
+        Parameters:
+            Flask app;
+            str auth_token;
+        Returns:
+            tuple:
+                float: Requests per second.
+                int: Number of failed requests.
+    """
+
+    def send_requests(_):
+        failed = 0
+        with app.test_client() as client:
+            for _ in range(REQUESTS_PER_THREAD):
+                response = client.get('/user/portfolios', headers={
+                    'Authorization': 'Bearer ' + auth_token
+                })
+                if response.status_code != 200:
+                    failed += 1
+        return failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        failed = sum(executor.map(send_requests, range(THREADS)))
+    duration = time.perf_counter() - start
+
+    return THREADS * REQUESTS_PER_THREAD / duration, failed
+
+
+if __name__ == '__main__':
+    Base.metadata.create_all(engine)
+    initialize_default_data()
+
+    app = create_app()
+    with app.test_client() as client:
+        auth_token = register_user(
+            client, 'load.test@example.com', 'Password123!')
+        for i in range(5):
+            create_portfolio(client, auth_token, f'Portfolio {i}')
+
+    total = THREADS * REQUESTS_PER_THREAD
+    print(f'{THREADS} threads, {total} requests each run')
+
+    throughput, failed = run_load_test(app, auth_token)
+    print(f'Request-scoped sessions: {throughput:.0f} req/s, {failed} failed')
+
+    # Simulate the previous setup, one session shared by all threads
+    scoped_session = queries.session
+    queries.session = Session()
+    throughput, failed = run_load_test(app, auth_token)
+    queries.session = scoped_session
+    print(f'One shared session:      {throughput:.0f} req/s, {failed} failed')
+
+    os.remove(DATABASE_FILE)
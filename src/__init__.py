@@ -2,6 +2,11 @@ from flask import Flask
 
 from src.api.routes.assets import assets
 from src.api.routes.user import user
+from src.api.utils.compression import compress_response
+from src.api.utils.json_provider import FastJSONProvider
+from src.database.models import Base
+from src.database.serializers import compile_all_serializers
+from src.database.setup import remove_session
 
 
 def create_app():
@@ -15,8 +20,20 @@ def create_app():
 
     app = Flask(__name__, static_folder=None)
 
+    # Encode and decode JSON with orjson
+    app.json = FastJSONProvider(app)
+
     # Register Blueprints
     app.register_blueprint(user, url_prefix='/user')
     app.register_blueprint(assets, url_prefix='/assets')
 
+    # Compress responses as accepted by the client
+    app.after_request(compress_response)
+
+    # Close the database session of every request
+    app.teardown_appcontext(remove_session)
+
+    # Compile the JSON serializers of all models once at startup
+    compile_all_serializers(Base)
+
     return app
@@ -2,13 +2,20 @@ from flask import Blueprint, request
 from yahooquery.utils.countries import COUNTRIES
 from yfinance.exceptions import YFChartError
 
+from src.api.utils.decorators import conditional_get
 from src.api.utils.request_parser import *
 from src.api.utils.responses import *
+from src.config import CACHE_TTL, MAX_BULK_TICKERS
 from src.constants.errors import ApiErrors
+from src.market_data.downsampling import MIN_POINTS, RESAMPLE_RULES
 from src.market_data.etf_data import get_etf_info
 from src.market_data.general_data import get_general_info
-from src.market_data.price_data import (VALID_INTERVALS, VALID_PERIODS,
-                                        get_current_price, get_price_data)
+from src.market_data.price_data import (PRICE_DATA_FORMATS, VALID_INTERVALS,
+                                        VALID_PERIODS, get_current_price,
+                                        get_current_prices, get_price_data,
+                                        get_price_data_binary,
+                                        get_price_data_columns,
+                                        stream_price_data)
 from src.market_data.search import search_assets
 
 # Create blueprint which is used in the flask app
@@ -16,6 +23,7 @@ assets = Blueprint('assets', __name__)
 
 
 @assets.route('/search', methods=['GET'])
+@conditional_get(max_age=CACHE_TTL['search'])
 def get_search_assets():
     """
     Handles GET requests to /assets/search, used to search assets.
@@ -53,6 +61,7 @@ def get_search_assets():
 
 
 @assets.route('/ticker/<ticker>', methods=['GET'])
+@conditional_get(max_age=CACHE_TTL['quote_info'])
 def ticker_info(ticker: str):
     """
     Handles GET requests to /assets/ticker/<ticker>, used to get information
@@ -89,10 +98,19 @@ def ticker_info(ticker: str):
 
 
 @assets.route('/ticker/<ticker>/priceData', methods=['GET'])
+@conditional_get(max_age=CACHE_TTL['price_history'], vary=['Accept'])
 def ticker_price_data(ticker: str):
     """
     Handles GET requests to /assets/ticker/<ticker>/priceData,
     used to get price data of a specific ticker.
+    The optional query parameter "format=columns" returns parallel arrays per column
+    instead of a list of records, "format=ndjson" streams one record per line
+    without the response envelope. With "Accept: application/octet-stream" the price data
+    is returned as packed little-endian float64 columns, described by the headers
+    X-Price-Data-Columns and X-Price-Data-Rows.
+    Long series can be downsampled with the optional query parameters "resample",
+    which aggregates the bars to an interval (e.g. 1wk), and "points", which
+    reduces the bars to a maximum number while preserving the shape of the chart.
         Parameters:
             str ticker;
         Returns:
@@ -103,6 +121,9 @@ def ticker_price_data(ticker: str):
 
     period = request.args.get('period')
     interval = request.args.get('interval')
+    data_format = request.args.get('format', 'records').lower()
+    points = request.args.get('points')
+    resample = request.args.get('resample')
 
     # "period" and "interval" are required
     if not isinstance(period, str) or len(period) <= 0:
@@ -126,9 +147,41 @@ def ticker_price_data(ticker: str):
         return generate_bad_request_response(
             ApiErrors.invalid_query_param('interval')
         )
+    if data_format not in PRICE_DATA_FORMATS:
+        return generate_bad_request_response(
+            ApiErrors.invalid_query_param('format')
+        )
+
+    # "points" and "resample" are optional, but need to be valid
+    if points is not None:
+        if not points.isdecimal() or int(points) < MIN_POINTS:
+            return generate_bad_request_response(
+                ApiErrors.invalid_query_param('points')
+            )
+        points = int(points)
+    if resample is not None:
+        resample = resample.lower()
+        if resample not in RESAMPLE_RULES:
+            return generate_bad_request_response(
+                ApiErrors.invalid_query_param('resample')
+            )
+
+    binary = request.accept_mimetypes.best_match(
+        ['application/json', 'application/octet-stream']) == 'application/octet-stream'
 
     try:
-        price_data = get_price_data(ticker, period, interval)
+        if binary:
+            price_data = get_price_data_binary(
+                ticker, period, interval, points, resample)
+        elif data_format == 'ndjson':
+            price_data = stream_price_data(
+                ticker, period, interval, points, resample)
+        elif data_format == 'columns':
+            price_data = get_price_data_columns(
+                ticker, period, interval, points, resample)
+        else:
+            price_data = get_price_data(
+                ticker, period, interval, points, resample)
     except YFChartError as e:  # invalid interval for requested period
         return generate_bad_request_response(str(e))
     except Exception as e:  # pragma: no cover
@@ -140,10 +193,22 @@ def ticker_price_data(ticker: str):
     if price_data is None:
         return generate_not_found_response(ApiErrors.Assets.ticker_not_found)
 
-    return generate_success_response(price_data)
+    if binary:
+        body, columns, rows = price_data
+        return generate_binary_success_response(body, {
+            'X-Price-Data-Columns': ','.join(columns),
+            'X-Price-Data-Rows': str(rows)
+        })
+    if data_format == 'ndjson':
+        return generate_stream_success_response(price_data, 'application/x-ndjson')
+    if data_format == 'columns':
+        return generate_success_response(price_data)
+
+    return generate_raw_success_response(price_data)
 
 
 @assets.route('/ticker/<ticker>/currentPrice', methods=['GET'])
+@conditional_get(max_age=CACHE_TTL['current_price'])
 def ticker_current_price(ticker: str):
     """
     Handles GET requests to /assets/ticker/<ticker>/currentPrice,
@@ -165,3 +230,66 @@ def ticker_current_price(ticker: str):
         return generate_not_found_response(ApiErrors.Assets.ticker_not_found)
 
     return generate_success_response(current_price)
+
+
+@assets.route('/prices', methods=['GET', 'POST'])
+@conditional_get(max_age=CACHE_TTL['current_price'])
+def current_prices():
+    """
+    Handles GET and POST requests to /assets/prices, used to get the current
+    prices of multiple tickers at once. The tickers are passed as comma
+    separated query parameter "tickers" (GET) or as list "tickers" in the
+    JSON body (POST).
+        Parameters:
+            -
+        Returns:
+            tuple:
+                Response: Flask Response, contains the response_object dict
+                int: the response status code
+    """
+
+    if request.method == 'POST':
+        # Parsing the request body
+        try:
+            request_body = parse_json_request_body(request)
+        except ValueError as e:
+            return generate_bad_request_response(str(e))
+        except Exception as e:
+            return generate_internal_error_response(ApiErrors.invalid_json, e)
+
+        tickers = request_body.get('tickers')
+
+        # Validating field types
+        if not isinstance(tickers, list) or not all(isinstance(t, str) for t in tickers):
+            return generate_bad_request_response(
+                ApiErrors.field_wrong_type('tickers', 'list of strings')
+            )
+    else:
+        tickers = request.args.get('tickers')
+
+        # "tickers" is a required parameter
+        if not isinstance(tickers, str) or len(tickers) <= 0:
+            return generate_bad_request_response(
+                ApiErrors.missing_query_param('tickers')
+            )
+
+        tickers = tickers.split(',')
+
+    tickers = [t.strip() for t in tickers if len(t.strip()) > 0]
+
+    # Validating field values
+    if len(tickers) <= 0:
+        return generate_bad_request_response(ApiErrors.field_is_empty('tickers'))
+    if len(tickers) > MAX_BULK_TICKERS:
+        return generate_bad_request_response(
+            ApiErrors.Assets.too_many_tickers(MAX_BULK_TICKERS)
+        )
+
+    try:
+        prices = get_current_prices(tickers)
+    except Exception as e:  # pragma: no cover
+        return generate_internal_error_response(
+            ApiErrors.Assets.current_prices_error, e
+        )
+
+    return generate_success_response(prices)
@@ -1,27 +1,42 @@
 from flask import Blueprint, request
 from sqlalchemy.exc import IntegrityError
 
-from src.api.utils.decorators import jwt_required, validate_portfolio_owner
+from src.api.utils.decorators import (conditional_get, jwt_required,
+                                      validate_portfolio_owner)
+from src.api.utils.http_cache import (generate_not_modified_response,
+                                      get_version_etag, is_not_modified)
 from src.api.utils.request_parser import parse_json_request_body
 from src.api.utils.responses import *
+from src.config import RISK_BENCHMARK_TICKER
 from src.constants.asset_types import QUOTE_TYPE_LIST
 from src.constants.errors import ApiErrors
 from src.constants.messages import ApiMessages
 from src.database import models, queries
 from src.market_data.general_data import get_general_info
-from src.portfolio_analysis.stock_analysis import \
-    get_stock_portfolio_distribution
+from src.market_data.price_history_store import (STORED_INTERVALS,
+                                                 STORED_PERIODS)
+from src.portfolio_analysis.correlation import (MAX_WINDOW, MIN_WINDOW,
+                                                get_portfolio_correlation)
+from src.portfolio_analysis.exposure import get_portfolio_exposure
+from src.portfolio_analysis.performance import get_portfolio_performance
+from src.portfolio_analysis.risk import get_portfolio_risk
+from src.portfolio_analysis.stock_analysis import (
+    DISTRIBUTION_WEIGHTS, get_stock_portfolio_distribution)
+from src.portfolio_analysis.valuation import get_portfolio_valuation
 
 # Create blueprint which is used in the flask app
 user_portfolios = Blueprint('portfolio', __name__)
 
 
 @user_portfolios.route('', methods=['GET'])
+@conditional_get(private=True)
 @jwt_required
 def get_all_user_portfolios(user_id: str):
     """
     Handles GET requests to /user/portfolios
     Returns all portfolios of the user including all elements as a list.
+    The ETag is based on the portfolio versions, so unchanged portfolios
+    are neither loaded nor serialized.
         Parameters:
             str user_id;
         Returns:
@@ -31,21 +46,33 @@ def get_all_user_portfolios(user_id: str):
     """
 
     try:
+        etag = get_version_etag(queries.get_portfolio_versions_by_user_id(user_id))
+        if is_not_modified(etag):
+            return generate_not_modified_response(etag)
+
         portfolios: list[models.Portfolio] = queries.get_portfolios_by_user_id(
-            user_id)
+            user_id, load_profile='portfolio_tree')
     except Exception as e:  # pragma: no cover
         return generate_internal_error_response(ApiErrors.Portfolio.get_portfolios_by_user_id_error, e)
 
-    return generate_success_response([p.to_json() for p in portfolios])
+    # Portfolios might have changed in between, so use the loaded versions
+    response, status = generate_success_response([p.to_json() for p in portfolios])
+    response.set_etag(get_version_etag(
+        sorted((p.id, p.version) for p in portfolios)))
+
+    return response, status
 
 
 @user_portfolios.route('/<portfolio_id>', methods=['GET'])
+@conditional_get(private=True)
 @jwt_required
 @validate_portfolio_owner
 def get_user_portfolio(user_id: str, portfolio: models.Portfolio):
     """
     Handles GET requests to /user/portfolios/<portfolio_id> where <portfolio_id> is the ID of a users portfolio.
     Returns the portfolio with all elements as response.
+    The ETag is based on the portfolio version, so the elements of an unchanged
+    portfolio are neither loaded nor serialized.
         Parameters:
             str user_id;
             Portfolio portfolio;
@@ -55,7 +82,19 @@ def get_user_portfolio(user_id: str, portfolio: models.Portfolio):
                 int: the response status code
     """
 
-    return generate_success_response(portfolio.to_json())
+    etag = get_version_etag([(portfolio.id, portfolio.version)])
+    if is_not_modified(etag):
+        return generate_not_modified_response(etag)
+
+    try:
+        queries.load_portfolio_elements(portfolio)
+    except Exception as e:  # pragma: no cover
+        return generate_internal_error_response(ApiErrors.Portfolio.get_portfolio_by_id_error, e)
+
+    response, status = generate_success_response(portfolio.to_json())
+    response.set_etag(etag)
+
+    return response, status
 
 
 @user_portfolios.route('/<portfolio_id>', methods=['DELETE'])
@@ -76,18 +115,11 @@ def delete_user_portfolio(user_id: str, portfolio: models.Portfolio):
 
     # Try to delete portfolio
     try:
-        portfolio_deleted = queries.delete_portfolio_by_id(portfolio.id)
+        queries.delete_portfolio(portfolio)
     except Exception as e:  # pragma: no cover
         return generate_internal_error_response(ApiErrors.delete_data_by_id_error('portfolio', portfolio.id), e)
 
-    # Check if portfolio was deleted successfully
-    if portfolio_deleted == True:
-        return generate_success_response(ApiMessages.delete_data_by_id_success('portfolio', portfolio.id))
-    else:
-        # Will only be reached in rare edge cases as the
-        # "validate_portfolio_owner" decorator handles this case already.
-        message = ApiErrors.data_by_id_not_found('portfolio', portfolio.id)
-        return generate_not_found_response(message)
+    return generate_success_response(ApiMessages.delete_data_by_id_success('portfolio', portfolio.id))
 
 
 @user_portfolios.route('/create', methods=['POST'])
@@ -180,7 +212,7 @@ def update_user_portfolio(user_id: str, portfolio: models.Portfolio):
     # Updating Portfolio Name and sending updated portfolio in response
     try:
         portfolio: models.Portfolio = queries.update_portfolio_name(
-            portfolio.id, portfolio_name)
+            portfolio, portfolio_name)
     except Exception as e:  # pragma: no cover
         return generate_internal_error_response(ApiErrors.Portfolio.update_portfolio_name_error, e)
 
@@ -305,6 +337,7 @@ def add_element_to_user_portfolio(user_id: str, portfolio: models.Portfolio):
 
 
 @user_portfolios.route('/<portfolio_id>/<p_element_id>', methods=['GET'])
+@conditional_get(private=True)
 @jwt_required
 @validate_portfolio_owner
 def get_element_of_user_portfolio(user_id: str, portfolio: models.Portfolio, p_element_id: str):
@@ -442,20 +475,176 @@ def update_element_of_user_portfolio(user_id: str, portfolio: models.Portfolio,
 
 
 @user_portfolios.route('/<portfolio_id>/analysis', methods=['GET'])
+@conditional_get(private=True)
 @jwt_required
 @validate_portfolio_owner
 def get_stock_portfolio_analysis(user_id: str, portfolio: models.Portfolio):
     """
     Handles GET requests to /user/portfolios/<portfolio_id>/analysis where <portfolio_id> is the ID of a users portfolio.
     Returns the the distribution of Stocks in that portfolio
+    The query param "weight_by" is market_value (default) or cost_basis.
         Parameters:
             Portfolio portfolio;
         Returns:
             JSON
     """
+    weight_by = request.args.get('weight_by', 'market_value')
+
+    if weight_by not in DISTRIBUTION_WEIGHTS:
+        return generate_bad_request_response(ApiErrors.invalid_query_param('weight_by'))
+
     try:
-        analysis = get_stock_portfolio_distribution(portfolio.id)
+        analysis = get_stock_portfolio_distribution(portfolio.id, weight_by)
     except Exception as e:  # pragma: no cover
         return generate_internal_error_response(ApiErrors.Portfolio.get_portfolio_analysis_error, e)
 
     return generate_success_response(analysis)
+
+
+@user_portfolios.route('/<portfolio_id>/valuation', methods=['GET'])
+@conditional_get(private=True)
+@jwt_required
+@validate_portfolio_owner
+def get_user_portfolio_valuation(user_id: str, portfolio: models.Portfolio):
+    """
+    Handles GET requests to /user/portfolios/<portfolio_id>/valuation where <portfolio_id> is the ID of a users portfolio.
+    Returns the current market value, cost basis, unrealized P&L and weight of every element and the portfolio totals.
+        Parameters:
+            str user_id;
+            Portfolio portfolio;
+        Returns:
+            tuple:
+                Response: Flask Response, contains the response_object dict
+                int: the response status code
+    """
+    try:
+        valuation = get_portfolio_valuation(portfolio.id)
+    except Exception as e:  # pragma: no cover
+        return generate_internal_error_response(ApiErrors.Portfolio.get_portfolio_valuation_error, e)
+
+    return generate_success_response(valuation)
+
+
+@user_portfolios.route('/<portfolio_id>/performance', methods=['GET'])
+@conditional_get(private=True)
+@jwt_required
+@validate_portfolio_owner
+def get_user_portfolio_performance(user_id: str, portfolio: models.Portfolio):
+    """
+    Handles GET requests to /user/portfolios/<portfolio_id>/performance where <portfolio_id> is the ID of a users portfolio.
+    Returns the value of the portfolio for every bar of a period, based on the current positions.
+    The query params "period" (default 1y) and "interval" (default 1d) need to be
+    served from the price history store.
+        Parameters:
+            str user_id;
+            Portfolio portfolio;
+        Returns:
+            tuple:
+                Response: Flask Response, contains the response_object dict
+                int: the response status code
+    """
+    period = request.args.get('period', '1y').lower()
+    interval = request.args.get('interval', '1d').lower()
+
+    if period not in STORED_PERIODS:
+        return generate_bad_request_response(ApiErrors.invalid_query_param('period'))
+    if interval not in STORED_INTERVALS:
+        return generate_bad_request_response(ApiErrors.invalid_query_param('interval'))
+
+    try:
+        performance = get_portfolio_performance(portfolio.id, period, interval)
+    except Exception as e:  # pragma: no cover
+        return generate_internal_error_response(ApiErrors.Portfolio.get_portfolio_performance_error, e)
+
+    return generate_success_response(performance)
+
+
+@user_portfolios.route('/<portfolio_id>/risk', methods=['GET'])
+@conditional_get(private=True)
+@jwt_required
+@validate_portfolio_owner
+def get_user_portfolio_risk(user_id: str, portfolio: models.Portfolio):
+    """
+    Handles GET requests to /user/portfolios/<portfolio_id>/risk where <portfolio_id> is the ID of a users portfolio.
+    Returns volatility, max drawdown, Sharpe and Sortino ratio, beta and VaR of the portfolio and every position.
+    The query params "period" (default 1y) and "interval" (default 1d) need to be
+    served from the price history store, "benchmark" is the ticker of the beta.
+        Parameters:
+            str user_id;
+            Portfolio portfolio;
+        Returns:
+            tuple:
+                Response: Flask Response, contains the response_object dict
+                int: the response status code
+    """
+    period = request.args.get('period', '1y').lower()
+    interval = request.args.get('interval', '1d').lower()
+    benchmark = request.args.get('benchmark', RISK_BENCHMARK_TICKER).upper()
+
+    if period not in STORED_PERIODS:
+        return generate_bad_request_response(ApiErrors.invalid_query_param('period'))
+    if interval not in STORED_INTERVALS:
+        return generate_bad_request_response(ApiErrors.invalid_query_param('interval'))
+    if len(benchmark) == 0:
+        return generate_bad_request_response(ApiErrors.invalid_query_param('benchmark'))
+
+    try:
+        risk = get_portfolio_risk(portfolio.id, portfolio.version, period, interval, benchmark)
+    except Exception as e:  # pragma: no cover
+        return generate_internal_error_response(ApiErrors.Portfolio.get_portfolio_risk_error, e)
+
+    return generate_success_response(risk)
+
+
+@user_portfolios.route('/<portfolio_id>/correlation', methods=['GET'])
+@conditional_get(private=True)
+@jwt_required
+@validate_portfolio_owner
+def get_user_portfolio_correlation(user_id: str, portfolio: models.Portfolio):
+    """
+    Handles GET requests to /user/portfolios/<portfolio_id>/correlation where <portfolio_id> is the ID of a users portfolio.
+    Returns the covariance and correlation matrix of the daily returns of the positions.
+    The query param "window" is the number of daily returns (default 252).
+        Parameters:
+            str user_id;
+            Portfolio portfolio;
+        Returns:
+            tuple:
+                Response: Flask Response, contains the response_object dict
+                int: the response status code
+    """
+    window = request.args.get('window', '252')
+
+    if not window.isdecimal() or not MIN_WINDOW <= int(window) <= MAX_WINDOW:
+        return generate_bad_request_response(ApiErrors.invalid_query_param('window'))
+
+    try:
+        correlation = get_portfolio_correlation(portfolio.id, int(window))
+    except Exception as e:  # pragma: no cover
+        return generate_internal_error_response(ApiErrors.Portfolio.get_portfolio_correlation_error, e)
+
+    return generate_success_response(correlation)
+
+
+@user_portfolios.route('/<portfolio_id>/exposure', methods=['GET'])
+@conditional_get(private=True)
+@jwt_required
+@validate_portfolio_owner
+def get_user_portfolio_exposure(user_id: str, portfolio: models.Portfolio):
+    """
+    Handles GET requests to /user/portfolios/<portfolio_id>/exposure where <portfolio_id> is the ID of a users portfolio.
+    Returns the look-through exposure of the portfolio, ETFs are decomposed into their holdings and sectors.
+        Parameters:
+            str user_id;
+            Portfolio portfolio;
+        Returns:
+            tuple:
+                Response: Flask Response, contains the response_object dict
+                int: the response status code
+    """
+    try:
+        exposure = get_portfolio_exposure(portfolio.id)
+    except Exception as e:  # pragma: no cover
+        return generate_internal_error_response(ApiErrors.Portfolio.get_portfolio_exposure_error, e)
+
+    return generate_success_response(exposure)
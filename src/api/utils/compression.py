@@ -0,0 +1,170 @@
+import gzip
+import zlib
+from typing import Iterable
+
+from flask import Response, request
+
+from src.config import COMPRESSION_LEVELS, COMPRESSION_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Only text based responses are compressed, packed binary data barely shrinks
+COMPRESSIBLE_MIMETYPES = ['application/json', 'application/x-ndjson', 'text/plain', 'text/html']
+
+
+def get_available_encodings():
+    """
+    Returns the supported content encodings, in order of preference.
+    Brotli and Zstandard are only supported if their packages are installed.
+        Parameters:
+            -
+        Returns:
+            List[str]
+    """
+    encodings = []
+    if zstandard is not None:
+        encodings.append('zstd')
+    if brotli is not None:
+        encodings.append('br')
+    encodings.append('gzip')
+    return encodings
+
+
+def compress(data: bytes, encoding: str):
+    """
+    Compresses a complete response body.
+        Parameters:
+            bytes data;
+            str encoding: One of the available encodings;
+        Returns:
+            bytes
+    """
+    level = COMPRESSION_LEVELS[encoding]
+
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """
+    Compresses a response body chunk by chunk. Every compressed chunk is
+    flushed, so the client can decompress it without waiting for the rest.
+    """
+
+    def __init__(self, encoding: str):
+        level = COMPRESSION_LEVELS[encoding]
+        self.encoding = encoding
+
+        if encoding == 'zstd':
+            self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == 'br':
+            self.compressor = brotli.Compressor(quality=level)
+        else:
+            # wbits of 31 writes a gzip header and trailer
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes):
+        """
+        Compresses and flushes a chunk.
+            Parameters:
+                bytes chunk;
+            Returns:
+                bytes
+        """
+        if self.encoding == 'zstd':
+            return self.compressor.compress(chunk) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.encoding == 'br':
+            return self.compressor.process(chunk) + self.compressor.flush()
+        return self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        """
+        Ends the compressed stream.
+            Parameters:
+                -
+            Returns:
+                bytes
+        """
+        if self.encoding == 'zstd':
+            return self.compressor.flush()
+        if self.encoding == 'br':
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def compress_stream(chunks: Iterable[bytes | str], encoding: str):
+    """
+    Compresses a streamed response body.
+        Parameters:
+            Iterable[bytes | str] chunks;
+            str encoding: One of the available encodings;
+        Returns:
+            Generator[bytes]: The compressed chunks.
+    """
+    compressor = StreamCompressor(encoding)
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        if chunk:
+            yield compressor.compress(chunk)
+
+    yield compressor.finish()
+
+
+def compress_response(response: Response):
+    """
+    Compresses a response with the best encoding the client accepts.
+    Registered as after request function of the flask app.
+    Streamed responses are compressed chunk by chunk, other responses only
+    if they are at least COMPRESSION_MIN_SIZE bytes large.
+    Strong ETags become weak if an encoding is negotiated, as the compressed
+    body differs from the original. This does not depend on the size, so a 304
+    carries the same validator and Vary headers as the 200 it revalidates.
+        Parameters:
+            Response response;
+        Returns:
+            Response
+    """
+    if (response.status_code < 200 or response.status_code == 204
+            or request.method == 'HEAD'
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    # The response depends on the header, whether it is compressed or not
+    response.vary.add('Accept-Encoding')
+
+    encoding = request.accept_encodings.best_match(get_available_encodings())
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+
+    if response.status_code == 304:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -3,12 +3,16 @@ from functools import wraps
 from typing import Callable, List
 
 from flask import jsonify, make_response, request
-from sqlalchemy.exc import NoResultFound
 
-from src.api.utils.jwt_auth import decode_auth_token
+from src.api.utils.http_cache import (generate_not_modified_response,
+                                     get_content_etag, is_not_modified,
+                                     set_cache_headers)
+from src.api.utils.jwt_auth import decode_auth_token, user_exists
 from src.api.utils.responses import *
 from src.constants.errors import ApiErrors
-from src.constants.http_status_codes import HTTP_401_UNAUTHORIZED
+from src.constants.http_status_codes import (HTTP_200_OK,
+                                             HTTP_304_NOT_MODIFIED,
+                                             HTTP_401_UNAUTHORIZED)
 from src.database import models, queries
 
 
@@ -42,13 +46,16 @@ def jwt_required(func: Callable):
                 Response: Flask Response, contains the response_object dict
                 int: the response status code
             OR: executes the wrapped function
+        Raises:
+            TypeError: If func does not accept the user_id parameter.
     """
 
+    # Ensure the decorated function includes the passed on parameters,
+    # checked once when the route is registered
+    validate_function_params(func, ['user_id'])
+
     @wraps(func)
     def decorator(*args, **kwargs):
-        # Ensure the decorated function includes the passed on parameters
-        validate_function_params(func, ['user_id'])
-
         # Get Auth header from the request object
         auth_header = request.headers.get('Authorization')
 
@@ -63,18 +70,14 @@ def jwt_required(func: Callable):
             is_valid, uid_or_message = decode_auth_token(auth_token)
 
             if is_valid:
-                user = None
-
                 # If the token is valid, make sure the user exists
                 try:
-                    user = queries.get_user_by_id(uid_or_message)
-                except NoResultFound as e:  # User ID was not found
-                    pass
+                    is_existing_user = user_exists(uid_or_message)
                 except Exception as e:
                     return generate_internal_error_response(ApiErrors.User.get_user_by_id_error, e)
 
                 # If user exists, continue with wrapped function
-                if user is not None:
+                if is_existing_user:
                     return func(user_id=uid_or_message, *args, **kwargs)
                 else:
                     response_object = {
@@ -97,43 +100,109 @@ def jwt_required(func: Callable):
     return decorator
 
 
-def validate_portfolio_owner(func: Callable):
+def validate_portfolio_owner(func: Callable | None = None, load_profile: str | None = None):
     """
     Wrapper function for every API request that includes a portfolio_id to check
     that the user_id from authentication is the owner of this portfolio.
+    The portfolio is loaded together with the ownership check in one query and
+    passed on, so the wrapped function does not need to fetch it again.
 
     Needs to be used in combination with @jwt_required decorator, in the following order:
     @jwt_required
     @validate_portfolio_owner
+    def function(...)
+
+    Relationships the wrapped function needs can be loaded with a load profile:
+    @jwt_required
+    @validate_portfolio_owner(load_profile='portfolio_tree')
     def function(...)
 
         Parameters:
-            function func;
+            function | None func;
+            str | None load_profile: Relationships to load, see load_profiles.py;
         Returns:
             tuple:
                 Response: Flask Response, contains the response_object dict
                 int: the response status code
             OR: executes the wrapped function
+        Raises:
+            TypeError: If func does not accept the user_id and portfolio parameters.
     """
 
+    if func is None:
+        return lambda func: validate_portfolio_owner(func, load_profile)
+
+    # Ensure the decorated function includes the passed on parameters,
+    # checked once when the route is registered
+    validate_function_params(func, ['user_id', 'portfolio'])
+
     @wraps(func)
     def decorator(user_id: str, portfolio_id: str, *args, **kwargs):
-        # Ensure the decorated function includes the passed on parameters
-        validate_function_params(func, ['user_id', 'portfolio'])
-
-        # Fetch portfolio by portfolio ID
+        # Fetch the portfolio only if the user owns it
         try:
-            portfolio: models.Portfolio = queries.get_portfolio_by_id(
-                portfolio_id)
+            portfolio: models.Portfolio = queries.get_portfolio_owned_by_user(
+                portfolio_id, user_id, load_profile)
         except Exception as e:
             return generate_internal_error_response(ApiErrors.Portfolio.get_portfolio_by_id_error, e)
 
-        # Check whether the user owns this portfolio or not
-        if portfolio is not None and str(portfolio.user_id) == user_id:
+        if portfolio is not None:
             return func(user_id=user_id, portfolio=portfolio, *args, **kwargs)
         else:
-            # For security reasons, return 404
+            # For security reasons, return 404 for portfolios of other users as well
             message = ApiErrors.data_by_id_not_found('portfolio', portfolio_id)
             return generate_not_found_response(message)
 
     return decorator
+
+
+def conditional_get(max_age: int = 0, private: bool = False, vary: list[str] | None = None):
+    """
+    Wrapper function for GET requests to resources that clients can cache.
+    Successful responses get an ETag and a Cache-Control header. If the client
+    already has the response, 304 is returned without a body.
+    The ETag is the hash of the response body, unless the wrapped function
+    already set one (e.g. based on versions) or returned 304 itself.
+    Streamed responses only get the Cache-Control header.
+    Request headers the response depends on are listed in the Vary header
+    of every response, including 304.
+
+    Needs to be used as first decorator after the route:
+    @blueprint.route(...)
+    @conditional_get(max_age=60)
+    def function(...)
+
+        Parameters:
+            int max_age: Seconds public responses can be used without revalidation;
+            bool private: Whether the response belongs to a user;
+            List[str] | None vary: Request headers that select the representation, e.g. Accept;
+        Returns:
+            function: The decorator.
+    """
+
+    def wrapper(func: Callable):
+
+        @wraps(func)
+        def decorator(*args, **kwargs):
+            response, status = func(*args, **kwargs)
+
+            if request.method != 'GET' or status not in (HTTP_200_OK, HTTP_304_NOT_MODIFIED):
+                return response, status
+
+            # Streamed bodies are not hashed, as that would read the whole stream
+            if status == HTTP_200_OK and not response.is_streamed:
+                etag, _ = response.get_etag()
+                if etag is None:
+                    etag = get_content_etag(response.get_data())
+                    response.set_etag(etag)
+
+                if is_not_modified(etag):
+                    response, status = generate_not_modified_response(etag, response.mimetype)
+
+            set_cache_headers(response, max_age, private)
+            if vary:
+                response.vary.update(vary)
+            return response, status
+
+        return decorator
+
+    return wrapper
@@ -0,0 +1,80 @@
+import hashlib
+from typing import Any, Iterable, Tuple
+
+from flask import Response, current_app, request
+
+from src.constants import http_status_codes as status
+
+
+def get_content_etag(content: bytes):
+    """
+    Generates an ETag from the hash of a response body.
+        Parameters:
+            bytes content;
+        Returns:
+            str: The ETag without quotes.
+    """
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def get_version_etag(versions: Iterable[Tuple[Any, int]]):
+    """
+    Generates an ETag from the versions of the objects a response consists of,
+    so it can be checked before loading and serializing the objects.
+        Parameters:
+            Iterable[Tuple[Any, int]] versions: ID and version of every object;
+        Returns:
+            str: The ETag without quotes.
+    """
+    content = ';'.join(f'{id}:{version}' for id, version in versions)
+    return get_content_etag(content.encode())
+
+
+def is_not_modified(etag: str):
+    """
+    Checks whether the client already has the current version of a resource,
+    based on the If-None-Match header of the request.
+        Parameters:
+            str etag;
+        Returns:
+            bool
+    """
+    return request.if_none_match.contains_weak(etag)
+
+
+def set_cache_headers(response: Response, max_age: int, private: bool):
+    """
+    Sets the Cache-Control header of a response. Private responses must be
+    revalidated by the client on every use, which is cheap with an ETag.
+        Parameters:
+            Response response;
+            int max_age: Seconds the response can be used without revalidation;
+            bool private: Whether the response belongs to a user;
+        Returns:
+            -
+    """
+    if private:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+
+
+def generate_not_modified_response(etag: str, mimetype: str = 'application/json'):
+    """
+    Generates a flask response without body for resources the client already has.
+    The mimetype of the revalidated response is kept, so the 304 gets the same
+    validator and Vary headers, e.g. from compression. The Content-Type header
+    itself is not sent with a 304.
+    Parameters:
+        str etag;
+        str mimetype: Mimetype of the revalidated response;
+    Returns:
+        tuple:
+            Response: Flask Response, without body
+            int: the response status code
+    """
+    response = current_app.response_class(status=status.HTTP_304_NOT_MODIFIED, mimetype=mimetype)
+    response.set_etag(etag)
+    return response, status.HTTP_304_NOT_MODIFIED
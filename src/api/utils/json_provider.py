@@ -0,0 +1,110 @@
+from typing import Any
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider of the flask app that encodes and decodes with orjson.
+    orjson natively encodes UUIDs, datetimes (ISO 8601), NumPy values and
+    encodes NaN as null. If orjson is not installed or cannot encode a value,
+    the default provider of flask is used.
+    """
+
+    @staticmethod
+    def default(o: Any):
+        """
+        Converts values that are not natively encoded, like NumPy values
+        that orjson does not support (e.g. string arrays).
+            Parameters:
+                Any o;
+            Returns:
+                Any: An encodable value.
+        """
+        if isinstance(o, (np.ndarray, np.generic)):
+            return o.tolist()
+
+        return DefaultJSONProvider.default(o)
+
+    def get_options(self, **kwargs: Any):
+        """
+        Returns the orjson options matching the settings of the provider.
+            Parameters:
+                Any kwargs: Keyword arguments of json.dumps;
+            Returns:
+                int: orjson option flags.
+        """
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+        if kwargs.get('sort_keys', self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent') is not None:
+            options |= orjson.OPT_INDENT_2
+
+        return options
+
+    def dump_bytes(self, obj: Any, **kwargs: Any):
+        """
+        Encodes an object as JSON bytes.
+            Parameters:
+                Any obj;
+                Any kwargs: Keyword arguments of json.dumps;
+            Returns:
+                bytes
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self.get_options(**kwargs))
+            except orjson.JSONEncodeError:
+                # For example integers with more than 64 bits
+                pass
+
+        return super().dumps(obj, **kwargs).encode()
+
+    def dumps(self, obj: Any, **kwargs: Any):
+        """
+        Encodes an object as JSON string.
+            Parameters:
+                Any obj;
+                Any kwargs: Keyword arguments of json.dumps;
+            Returns:
+                str
+        """
+        return self.dump_bytes(obj, **kwargs).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any):
+        """
+        Decodes a JSON string.
+            Parameters:
+                str | bytes s;
+                Any kwargs: Keyword arguments of json.loads;
+            Returns:
+                Any
+        """
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """
+        Creates a JSON response, the body is encoded directly to bytes.
+            Parameters:
+                Any args: Data to encode, like for jsonify;
+                Any kwargs: Data to encode, like for jsonify;
+            Returns:
+                Response
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        dump_args = {}
+
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args['indent'] = 2
+
+        return self._app.response_class(self.dump_bytes(obj, **dump_args), mimetype=self.mimetype)
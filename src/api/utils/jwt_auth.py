@@ -1,9 +1,12 @@
 import datetime
 
 import jwt
+from sqlalchemy.exc import NoResultFound
 
+from src.cache.cache import MISSING, get_cache
 from src.config import JWT_EXPIRY, JWT_SECRET_KEY
 from src.constants.errors import ApiErrors
+from src.database import queries
 
 
 def encode_auth_token(user_id: str):
@@ -55,3 +58,26 @@ def decode_auth_token(auth_token: str):
         return (False, ApiErrors.JwtAuth.jwt_token_expired)
     except jwt.InvalidTokenError:
         return (False, ApiErrors.JwtAuth.jwt_token_invalid)
+
+
+def user_exists(user_id: str):
+    """
+    Checks whether the user of a valid auth token exists. Existing users are
+    cached in the 'principal' dataset, so authenticated requests only query
+    the database once per TTL and user.
+        Parameters:
+            str user_id;
+        Returns:
+            bool: True if the user exists, else False
+    """
+    cache = get_cache()
+    if cache.get('principal', user_id) is not MISSING:
+        return True
+
+    try:
+        queries.get_user_by_id(user_id)
+    except NoResultFound:
+        return False
+
+    cache.set('principal', user_id, True)
+    return True
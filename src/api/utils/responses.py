@@ -1,6 +1,6 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
-from flask import jsonify, make_response
+from flask import current_app, jsonify, make_response, stream_with_context
 
 from src.api.utils import jwt_auth
 from src.constants import http_status_codes as status
@@ -23,6 +23,57 @@ def generate_success_response(response: List[Dict[str, Any]] | Dict[str, Any] |
     return make_response(jsonify(response_object)), status.HTTP_200_OK
 
 
+def generate_raw_success_response(raw_response: str | bytes):
+    """
+    Generates a flask response for successful requests from a response
+    that is already encoded as JSON, so it is not decoded and encoded again.
+    Parameters:
+        str | bytes raw_response: JSON encoded response;
+    Returns:
+        tuple:
+            Response: Flask Response, contains the response_object JSON
+            int: the response status code
+    """
+    if isinstance(raw_response, str):
+        raw_response = raw_response.encode()
+
+    body = b'{"response":' + raw_response + b',"success":true}'
+    return make_response(current_app.response_class(body, mimetype=current_app.json.mimetype)), status.HTTP_200_OK
+
+
+def generate_binary_success_response(body: bytes, headers: Dict[str, str]):
+    """
+    Generates a flask response with a binary body for successful requests.
+    Parameters:
+        bytes body;
+        Dict[str, str] headers: Headers that describe the body;
+    Returns:
+        tuple:
+            Response: Flask Response, contains the body
+            int: the response status code
+    """
+    response = make_response(current_app.response_class(
+        body, mimetype='application/octet-stream'))
+    response.headers.update(headers)
+    return response, status.HTTP_200_OK
+
+
+def generate_stream_success_response(chunks: Iterable[str | bytes], mimetype: str):
+    """
+    Generates a flask response for successful requests that is sent in chunks
+    while they are generated. The request context is kept until the last chunk is sent.
+    Parameters:
+        Iterable[str | bytes] chunks;
+        str mimetype;
+    Returns:
+        tuple:
+            Response: Flask Response, streams the chunks
+            int: the response status code
+    """
+    response = current_app.response_class(stream_with_context(chunks), mimetype=mimetype)
+    return response, status.HTTP_200_OK
+
+
 def generate_internal_error_response(message: str, error: Exception | str):
     """
     Generates a flask response for internal server errors.
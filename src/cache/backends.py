@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCacheBackend:
+    """
+    In-process cache backend that stores serialized values in an LRU ordered
+    dict. Entries expire after their TTL and the least recently used entries
+    are evicted as soon as the total size exceeds max_bytes.
+
+    Methods:
+        get(key):
+            - key (str): Key of the entry.
+            - Returns: bytes | None
+        set(key, value, ttl):
+            - key (str): Key of the entry.
+            - value (bytes): Serialized value.
+            - ttl (float): Time to live in seconds.
+            - Returns: None
+        delete(key):
+            - key (str): Key of the entry.
+            - Returns: None
+        clear():
+            - Returns: None
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        # Values bigger than the whole cache are never stored
+        if len(value) > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self.size += len(value)
+
+            # Evict least recently used entries until the cache fits again
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self.size -= len(value)
+
+
+class SQLiteCacheBackend:
+    """
+    Cache backend that stores serialized values in a SQLite file, so that
+    all worker processes on the same host (e.g. gunicorn workers) share
+    one cache. Eviction works like in the MemoryCacheBackend, based on the
+    last access time of each entry.
+
+    Methods:
+        get(key):
+            - key (str): Key of the entry.
+            - Returns: bytes | None
+        set(key, value, ttl):
+            - key (str): Key of the entry.
+            - value (bytes): Serialized value.
+            - ttl (float): Time to live in seconds.
+            - Returns: None
+        delete(key):
+            - key (str): Key of the entry.
+            - Returns: None
+        clear():
+            - Returns: None
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                'expires_at REAL NOT NULL, last_access REAL NOT NULL, '
+                'size INTEGER NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS cache_entries_last_access '
+                'ON cache_entries (last_access)'
+            )
+
+    def get(self, key: str):
+        now = time.time()
+
+        with self._connection() as connection:
+            row = connection.execute(
+                'SELECT value, expires_at FROM cache_entries WHERE key = ?',
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at <= now:
+                connection.execute(
+                    'DELETE FROM cache_entries WHERE key = ?', (key,))
+                return None
+
+            connection.execute(
+                'UPDATE cache_entries SET last_access = ? WHERE key = ?',
+                (now, key)
+            )
+            return bytes(value)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        # Values bigger than the whole cache are never stored
+        if len(value) > self.max_bytes:
+            return
+
+        now = time.time()
+
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO cache_entries '
+                '(key, value, expires_at, last_access, size) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, value, now + ttl, now, len(value))
+            )
+            self._evict(connection, now)
+
+    def delete(self, key: str):
+        with self._connection() as connection:
+            connection.execute(
+                'DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM cache_entries')
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        """
+        Removes expired entries and afterwards the least recently used
+        entries until the total size is below max_bytes.
+            Parameters:
+                Connection connection;
+                float now;
+            Returns:
+                -
+        """
+        connection.execute(
+            'DELETE FROM cache_entries WHERE expires_at <= ?', (now,))
+
+        (total_size,) = connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM cache_entries'
+        ).fetchone()
+        if total_size <= self.max_bytes:
+            return
+
+        keys_to_delete = []
+        rows = connection.execute(
+            'SELECT key, size FROM cache_entries ORDER BY last_access'
+        )
+        for key, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            keys_to_delete.append((key,))
+            total_size -= size
+
+        connection.executemany(
+            'DELETE FROM cache_entries WHERE key = ?', keys_to_delete)
+
+    def _connection(self):
+        """
+        Returns the SQLite connection of the current thread, as SQLite
+        connections can not be shared between threads.
+            Parameters:
+                -
+            Returns:
+                Connection: The connection, usable as transaction context manager.
+        """
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+
+        return connection
@@ -0,0 +1,124 @@
+import pickle
+import threading
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Callable
+
+from src import config
+from src.cache.backends import MemoryCacheBackend, SQLiteCacheBackend
+
+# Returned by Cache.get on a cache miss, as None is a valid cached value
+MISSING = object()
+
+
+class Cache:
+    """
+    Cache for datasets with individual TTLs in front of a cache backend.
+    Values are pickled before they are handed to the backend, so every
+    caller gets its own copy and can modify it safely.
+
+    Methods:
+        get(dataset, key):
+            - dataset (str): Name of the dataset, e.g. 'quote_info'.
+            - key (str): Key of the entry inside the dataset.
+            - Returns: Any | MISSING
+        set(dataset, key, value, ttl=None):
+            - dataset (str): Name of the dataset.
+            - key (str): Key of the entry inside the dataset.
+            - value (Any): Picklable value.
+            - ttl (float | None): Overrides the TTL of the dataset.
+            - Returns: None
+        delete(dataset, key):
+            - dataset (str): Name of the dataset.
+            - key (str): Key of the entry inside the dataset.
+            - Returns: None
+        stats():
+            - Returns: Dict[str, Dict[str, int]] hits and misses per dataset.
+    """
+
+    def __init__(self, backend: MemoryCacheBackend | SQLiteCacheBackend, ttls: dict[str, float]):
+        self.backend = backend
+        self.ttls = ttls
+        self._counters = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self._lock = threading.Lock()
+
+    def get(self, dataset: str, key: str):
+        value = self.backend.get(f'{dataset}:{key}')
+
+        with self._lock:
+            self._counters[dataset]['misses' if value is None else 'hits'] += 1
+
+        if value is None:
+            return MISSING
+        return pickle.loads(value)
+
+    def set(self, dataset: str, key: str, value: Any, ttl: float | None = None):
+        if ttl is None:
+            ttl = self.ttls[dataset]
+
+        self.backend.set(f'{dataset}:{key}',
+                         pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ttl)
+
+    def delete(self, dataset: str, key: str):
+        self.backend.delete(f'{dataset}:{key}')
+
+    def stats(self):
+        with self._lock:
+            return {dataset: dict(counter) for dataset, counter in self._counters.items()}
+
+
+_cache: Cache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the cache of this process. It is created on first use with the
+    backend that is set in the config.
+        Parameters:
+            -
+        Returns:
+            Cache
+    """
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            if config.CACHE_BACKEND == 'sqlite':
+                backend = SQLiteCacheBackend(config.CACHE_SQLITE_PATH,
+                                             config.CACHE_MAX_BYTES)
+            else:
+                backend = MemoryCacheBackend(config.CACHE_MAX_BYTES)
+            _cache = Cache(backend, config.CACHE_TTL)
+
+    return _cache
+
+
+def cached(dataset: str):
+    """
+    Decorator that caches the results of a market data function in the
+    given dataset. The key is built from the function name and its arguments.
+    Exceptions are not cached, None results (e.g. unknown tickers) are.
+        Parameters:
+            str dataset;
+        Returns:
+            function: The decorator.
+    """
+
+    def decorator(func: Callable):
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            key = f'{func.__module__}.{func.__name__}:{args!r}:{sorted(kwargs.items())!r}'
+
+            result = cache.get(dataset, key)
+            if result is MISSING:
+                result = func(*args, **kwargs)
+                cache.set(dataset, key, result)
+
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,5 +1,6 @@
 import datetime
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -9,7 +10,77 @@ load_dotenv()
 DATABASE_URL = os.getenv('DATABASE_URL')
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
 
+# Database connection pool, not used for SQLite
+DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', 5))
+DATABASE_MAX_OVERFLOW = int(os.getenv('DATABASE_MAX_OVERFLOW', 10))
+DATABASE_POOL_TIMEOUT = 30  # Seconds to wait for a free connection
+DATABASE_POOL_RECYCLE = 30 * 60  # Seconds until a connection is replaced
+DATABASE_POOL_PRE_PING = True  # Detect connections closed by the database
+
 # Other setting variables
 MINIMUM_PASSWORD_LEN = 8
 JWT_EXPIRY = datetime.timedelta(
     days=0, minutes=15)  # 15 minute session validity
+
+# Market data cache settings
+# CACHE_BACKEND can be 'memory' (per process) or 'sqlite' (shared by all
+# workers on the same host through CACHE_SQLITE_PATH)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', os.path.join(
+    tempfile.gettempdir(), 'portfoliopilot_cache.sqlite3'))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 64MB
+
+# Time to live (in seconds) of every cached dataset
+CACHE_TTL = {
+    'quote_info': 60,
+    'current_price': 30,
+    'price_history': 5 * 60,
+    'classification': 6 * 60 * 60,
+    'etf_holdings': 24 * 60 * 60,
+    # Top holdings and sector weights of funds, which are only reported monthly or quarterly
+    'etf_composition': 7 * 24 * 60 * 60,
+    'search': 60 * 60,
+    'isin': 7 * 24 * 60 * 60,
+    'symbol_validity': 24 * 60 * 60,
+    # Existence of authenticated users, deleted users are removed from the cache
+    # of the deleting process, other processes notice the deletion after the TTL
+    'principal': 60,
+    # Risk metrics per portfolio version, changed positions are never served from the cache
+    'risk': 5 * 60,
+    # Rolling covariance per set of tickers and window, updated with new bars,
+    # kept over the weekend so Monday's bar is added to Friday's state
+    'correlation': 3 * 24 * 60 * 60
+}
+INVALID_SYMBOL_TTL = 60 * 60  # Invalid symbols might be listed later on
+MISSING_MARKET_DATA_TTL = 10 * 60  # Missing data might be caused by a transient error
+
+# Seconds after which the most recent bars of a locally stored price history are refreshed
+PRICE_HISTORY_REFRESH_INTERVAL = 5 * 60
+# Number of price bars that are read and sent at once when price data is streamed
+PRICE_DATA_CHUNK_SIZE = 1000
+
+# Portfolio risk metrics
+RISK_BENCHMARK_TICKER = '^GSPC'  # Default benchmark of the beta
+RISK_FREE_RATE = float(os.getenv('RISK_FREE_RATE', 0.0))  # Annual rate of the Sharpe and Sortino ratio
+VAR_CONFIDENCE = 0.95  # Confidence level of the Value at Risk
+
+# Maximum number of symbols that are fetched with one batched request
+MARKET_DATA_BATCH_SIZE = 50
+QUOTE_BATCH_SIZE = 250  # Quotes are a lot smaller than other modules
+MAX_BULK_TICKERS = 1000  # Maximum number of tickers per bulk request
+
+# Thread pool for concurrent market data lookups
+MARKET_DATA_MAX_WORKERS = int(os.getenv('MARKET_DATA_MAX_WORKERS', 16))
+MARKET_DATA_MAX_PARALLELISM = 8  # Concurrent lookups per request
+MARKET_DATA_CALL_TIMEOUT = 15  # Seconds until a single lookup is given up
+MARKET_DATA_DEADLINE = 30  # Seconds until a fan out gives up on all lookups, queued ones included
+MARKET_DATA_REQUEST_TIMEOUT = 10  # Socket timeout of every request to yahoo finance
+ISIN_LOOKUP_TIMEOUT = 5  # The default timeout of yfinance is 30 seconds
+
+# Response compression, smaller responses are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # Bytes
+COMPRESSION_LEVELS = {
+    'zstd': 3,
+    'br': 4,
+    'gzip': 6
+}
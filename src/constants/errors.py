@@ -114,6 +114,11 @@ class ApiErrors:
         get_asset_by_ticker_error = 'Error finding asset.'
         get_asset_type_by_quote_type_error = 'Error finding asset type.'
         get_portfolio_analysis_error = 'Error fetching portfolio analysis.'
+        get_portfolio_valuation_error = 'Error calculating portfolio valuation.'
+        get_portfolio_performance_error = 'Error calculating portfolio performance.'
+        get_portfolio_risk_error = 'Error calculating portfolio risk.'
+        get_portfolio_correlation_error = 'Error calculating portfolio correlation.'
+        get_portfolio_exposure_error = 'Error calculating portfolio exposure.'
 
         # Input Errors
         portfolio_already_exists = 'Portfolio with this name already exists.'
@@ -123,13 +128,23 @@ class ApiErrors:
 
     class Assets:
         """
-        This class contains all error messages for /assets/...
+        This class contains all error messages for /assets/... and methods to generate such messages.
+
+        Methods:
+            too_many_tickers(limit):
+                - limit (int): Maximum number of tickers per request.
+                - Returns: str
         """
 
+        @staticmethod
+        def too_many_tickers(limit: int) -> str:
+            return f'Too many tickers, the maximum is {limit}.'
+
         # Internal errors
         search_error = 'Error executing search.'
         ticker_get_info_error = 'Error getting ticker info.'
         ticker_price_data_error = 'Unexpected error occurred while fetching price data.'
+        current_prices_error = 'Unexpected error occurred while fetching prices.'
 
         # Input Errors
         ticker_not_found = 'No data for ticker was found.'
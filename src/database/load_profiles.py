@@ -0,0 +1,38 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.database.models import Asset, Portfolio, PortfolioElement
+
+# Load profiles define which relationships are loaded together with the
+# queried objects. Every profile matches the relationships a serializer
+# walks, so serializing the result does not issue any further queries.
+LOAD_PROFILES = {
+    # Portfolio only, relationships are loaded lazily on access
+    'portfolio': [],
+    # Portfolio with all elements, their assets and asset types, as serialized by Portfolio.to_json
+    'portfolio_tree': [
+        selectinload(Portfolio.elements)
+        .joinedload(PortfolioElement.asset)
+        .joinedload(Asset.asset_type)
+    ],
+    # Elements with their assets and asset types, to load the elements of an already loaded portfolio
+    'portfolio_element_tree': [
+        joinedload(PortfolioElement.asset).joinedload(Asset.asset_type)
+    ]
+}
+
+
+def get_load_options(load_profile: str | None):
+    """
+    Returns the loader options of a load profile.
+        Parameters:
+            str | None load_profile: Name of the profile, None loads lazily.
+        Returns:
+            list: Loader options that can be passed to Query.options.
+    """
+    if load_profile is None:
+        return []
+
+    if load_profile not in LOAD_PROFILES:
+        raise ValueError(f'Unknown load profile: {load_profile}')
+
+    return LOAD_PROFILES[load_profile]
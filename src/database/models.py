@@ -1,8 +1,10 @@
 import uuid
 
-from sqlalchemy import Column, Float, ForeignKey, String, UniqueConstraint
+from sqlalchemy import (BigInteger, Column, DateTime, Float, ForeignKey,
+                        Integer, String, UniqueConstraint)
 from sqlalchemy.orm import declarative_base, relationship
 
+from src.database.serializers import get_serializer
 from src.database.uuid_type import UUID
 
 Base = declarative_base()
@@ -23,35 +25,13 @@ class Model(Base):
         """
         Custom function to return the object as a dictionary without any
         complex objects so that the dict can be parsed as JSON.
+        Uses the serializer that is compiled once per model class.
             Parameters:
                 -
             Returns:
                 dict: The object in dictionary format.
         """
-        relationships = self.__mapper__.relationships.keys()
-
-        if len(self._json_values) == 0:
-            self._json_values = self.__table__.columns.keys()
-
-        json_data = {}
-
-        for key in self._json_values:
-            if key in relationships:
-                is_list = self.__mapper__.relationships[key].uselist
-
-                if is_list:
-                    json_data[key] = []
-                    for item in getattr(self, key):
-                        json_data[key].append(item.to_json())
-                else:
-                    if self.__mapper__.relationships[key].query_class is not None or self.__mapper__.relationships[key].instrument_class is not None:
-                        json_data[key] = getattr(self, key).to_json()
-                    else:
-                        json_data[key] = getattr(self, key)
-            else:
-                json_data[key] = getattr(self, key)
-
-        return json_data
+        return get_serializer(type(self))(self)
 
 
 class User(Model):
@@ -69,6 +49,8 @@ class Portfolio(Model):
     id = Column(UUID(), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     user_id = Column(UUID(), ForeignKey('users.id'))
+    # Incremented on every change of the portfolio or its elements
+    version = Column(Integer, nullable=False, default=1)
     owner = relationship('User', back_populates='portfolios')
     elements = relationship(
         'PortfolioElement', back_populates='portfolio', cascade='all, delete-orphan')
@@ -118,3 +100,39 @@ class AssetType(Model):
     assets = relationship('Asset', back_populates='asset_type')
 
     _json_values = ['id', 'name', 'quote_type', 'unit_type']
+
+
+class PriceHistory(Model):
+    __tablename__ = 'price_histories'
+    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
+    ticker_symbol = Column(String, nullable=False)
+    interval = Column(String, nullable=False)
+    # UTC start of the stored range, None if the full history is stored
+    start = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+    bars = relationship(
+        'PriceBar', back_populates='price_history', cascade='all, delete-orphan')
+    __table_args__ = (UniqueConstraint(
+        'ticker_symbol', 'interval', name='price_history_ticker_interval_uc'),)
+
+    _json_values = ['ticker_symbol', 'interval', 'start', 'updated_at']
+
+
+class PriceBar(Model):
+    __tablename__ = 'price_bars'
+    # Composite primary key, price bars are only accessed by range
+    price_history_id = Column(UUID(), ForeignKey(
+        'price_histories.id'), primary_key=True)
+    date = Column(DateTime, primary_key=True)  # UTC
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(BigInteger, nullable=False)
+    dividends = Column(Float, nullable=False)
+    stock_splits = Column(Float, nullable=False)
+    capital_gains = Column(Float, nullable=True)  # Only exists for funds
+    price_history = relationship('PriceHistory', back_populates='bars')
+
+    _json_values = ['date', 'open', 'high', 'low', 'close',
+                    'volume', 'dividends', 'stock_splits', 'capital_gains']
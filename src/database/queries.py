@@ -1,10 +1,22 @@
+import datetime
+import uuid
 from functools import wraps
-from typing import Callable
+from typing import Any, Callable, Dict, List
 
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.cache.cache import get_cache
+from src.database.load_profiles import get_load_options
 from src.database.models import (Asset, AssetType, Portfolio, PortfolioElement,
-                                 User)
+                                 PriceBar, PriceHistory, User)
 from src.database.setup import session
 
+# Columns of a price bar that are updated, if the bar is already stored
+PRICE_BAR_VALUE_COLUMNS = ['open', 'high', 'low', 'close', 'volume',
+                           'dividends', 'stock_splits', 'capital_gains']
+
 
 def call_database_function(function: Callable):
     """
@@ -30,6 +42,19 @@ def call_database_function(function: Callable):
     return wrapper
 
 
+def increment_portfolio_versions(*criteria):
+    """
+    Increments the version of the portfolios matching the criteria.
+    Has to be called within a function decorated with call_database_function.
+        Parameters:
+            criteria: Filter criteria of the portfolios;
+        Returns:
+            -
+    """
+    session.query(Portfolio).filter(*criteria).update(
+        {Portfolio.version: Portfolio.version + 1}, synchronize_session='fetch')
+
+
 @call_database_function
 def get_user_by_email(email: str):
     """
@@ -54,6 +79,39 @@ def get_user_by_id(id: str):
     return session.query(User).filter_by(id=id).one()
 
 
+@call_database_function
+def _delete_user(user_id: str):
+    """
+    Deletes a user and its portfolios, see delete_user_by_id
+        Parameters:
+            str user_id;
+        Returns:
+            Boolean True if the user was successfully deleted, False otherwise
+    """
+    user_to_delete = session.query(User).filter_by(id=user_id).first()
+    if user_to_delete is None:
+        return False
+
+    for portfolio in user_to_delete.portfolios:
+        session.delete(portfolio)
+    session.delete(user_to_delete)
+    return True
+
+
+def delete_user_by_id(user_id: str):
+    """
+    Deletes a user and its portfolios. The user is removed from the cache of
+    authenticated users after the commit, so its auth tokens are rejected.
+        Parameters:
+            str user_id;
+        Returns:
+            Boolean True if the user was successfully deleted, False otherwise
+    """
+    deleted = _delete_user(user_id)
+    get_cache().delete('principal', str(user_id))
+    return deleted
+
+
 @call_database_function
 def add_new_user(email: str, password: str):
     """
@@ -87,16 +145,70 @@ def add_portfolio(name: str, user_id: str):
     return new_portfolio
 
 
+def query_with_load_profile(model, load_profile: str | None):
+    """
+    Creates a query for a model with the loader options of a load profile.
+    Objects that are already in the session are refreshed by the query,
+    so eagerly loaded relationships are up-to-date.
+        Parameters:
+            model;
+            str | None load_profile;
+        Returns:
+            Query
+    """
+    query = session.query(model)
+
+    if load_profile is None:
+        return query
+
+    return query.options(*get_load_options(load_profile)).populate_existing()
+
+
 @call_database_function
-def get_portfolio_by_id(portfolio_id: str):
+def get_portfolio_by_id(portfolio_id: str, load_profile: str | None = None):
     """
     Fetches a portfolio by its ID.
         Parameters:
             str portfolio_id;
+            str | None load_profile: Relationships to load, see load_profiles.py;
         Returns:
             Portfolio
     """
-    return session.query(Portfolio).filter_by(id=portfolio_id).first()
+    return query_with_load_profile(Portfolio, load_profile).filter_by(id=portfolio_id).first()
+
+
+@call_database_function
+def get_portfolio_owned_by_user(portfolio_id: str, user_id: str, load_profile: str | None = None):
+    """
+    Fetches a portfolio by its ID, if it belongs to a specific user.
+        Parameters:
+            str portfolio_id;
+            str user_id;
+            str | None load_profile: Relationships to load, see load_profiles.py;
+        Returns:
+            Portfolio | None: None if the portfolio does not exist or belongs to another user
+    """
+    return query_with_load_profile(Portfolio, load_profile).filter_by(id=portfolio_id, user_id=user_id).first()
+
+
+@call_database_function
+def load_portfolio_elements(portfolio: Portfolio):
+    """
+    Loads the elements of an already loaded portfolio together with their
+    assets and asset types in one query, without selecting the portfolio again.
+        Parameters:
+            Portfolio portfolio;
+        Returns:
+            Portfolio: The same portfolio with its elements.
+    """
+    elements = (
+        query_with_load_profile(PortfolioElement, 'portfolio_element_tree')
+        .filter_by(portfolio_id=portfolio.id)
+        .all()
+    )
+    set_committed_value(portfolio, 'elements', elements)
+
+    return portfolio
 
 
 @call_database_function
@@ -112,51 +224,56 @@ def get_portfolio_by_name(user_id: str, portfolio_name: str):
 
 
 @call_database_function
-def get_portfolios_by_user_id(user_id: str):
+def get_portfolios_by_user_id(user_id: str, load_profile: str | None = None):
     """
     Fetches every portfolio that belongs to a specific user
         Parameters:
             str user_id;
+            str | None load_profile: Relationships to load, see load_profiles.py;
         Returns:
             List[Portfolio]
     """
-    return session.query(Portfolio).filter_by(user_id=user_id).all()
+    return query_with_load_profile(Portfolio, load_profile).filter_by(user_id=user_id).all()
 
 
 @call_database_function
-def delete_portfolio_by_id(portfolio_id: str):
+def get_portfolio_versions_by_user_id(user_id: str):
     """
-    Deletes a portfolio based on the passed id
+    Fetches the ID and version of every portfolio that belongs to a specific user
         Parameters:
-            str portfolio_id;
+            str user_id;
         Returns:
-            Boolean True if the Portfolio was successfully deleted, False otherwise
+            List[Row]: id, version
     """
-    portfolio_to_delete = session.query(
-        Portfolio).filter_by(id=portfolio_id).first()
-    if portfolio_to_delete:
-        session.delete(portfolio_to_delete)
-        return True
-    else:
-        return False
+    return session.query(Portfolio.id, Portfolio.version).filter_by(user_id=user_id).order_by(Portfolio.id).all()
 
 
 @call_database_function
-def update_portfolio_name(portfolio_id: str, new_portfolio_name: str):
+def delete_portfolio(portfolio: Portfolio):
     """
-    Updates the name of a specific portfolio.
+    Deletes a portfolio that was fetched before, together with its elements
         Parameters:
-            str portfolio_id;
+            Portfolio portfolio;
+        Returns:
+            -
+    """
+    session.delete(portfolio)
+
+
+@call_database_function
+def update_portfolio_name(portfolio: Portfolio, new_portfolio_name: str):
+    """
+    Updates the name of a portfolio that was fetched before.
+        Parameters:
+            Portfolio portfolio;
             str new_portfolio_name;
         Returns:
             Portfolio
     """
+    portfolio.name = new_portfolio_name
+    portfolio.version += 1
 
-    existing_portfolio = session.query(
-        Portfolio).filter_by(id=portfolio_id).first()
-    existing_portfolio.name = new_portfolio_name
-
-    return existing_portfolio
+    return portfolio
 
 
 @call_database_function
@@ -173,6 +290,8 @@ def add_portfolio_element(portfolio_id: str, asset_id: str, count: float, buy_pr
         Returns:
             PortfolioElement
     """
+    increment_portfolio_versions(Portfolio.id == portfolio_id)
+
     existing_element = session.query(PortfolioElement).filter_by(portfolio_id=portfolio_id,
                                                                  asset_id=asset_id).first()
     if existing_element:
@@ -218,6 +337,7 @@ def delete_portfolio_element(portfolio_id: str, p_element_id: str):
         id=p_element_id, portfolio_id=portfolio_id).first()
     if portfolio_element:
         session.delete(portfolio_element)
+        increment_portfolio_versions(Portfolio.id == portfolio_id)
         return True
     else:
         return False
@@ -239,6 +359,7 @@ def update_portfolio_element(portfolio_id: str, p_element_id: str, count: float
     """
     portfolio_element = session.query(PortfolioElement).filter_by(
         id=p_element_id, portfolio_id=portfolio_id).one()
+    increment_portfolio_versions(Portfolio.id == portfolio_id)
 
     # Update count if existent and greater than 0, else delete the element
     if count is not None:
@@ -297,6 +418,38 @@ def get_asset_by_ticker(ticker: str):
     return session.query(Asset).filter_by(ticker_symbol=ticker).first()
 
 
+@call_database_function
+def get_all_ticker_symbols():
+    """
+    Fetches the ticker symbols of all assets.
+        Parameters:
+            -
+        Returns:
+            List[str]
+    """
+    return [ticker_symbol for (ticker_symbol,) in session.query(Asset.ticker_symbol).all()]
+
+
+@call_database_function
+def update_asset_isin(asset_id: str, isin: str):
+    """
+    Stores the ISIN of an asset.
+        Parameters:
+            str asset_id;
+            str isin;
+        Returns:
+            Asset
+    """
+    asset = session.query(Asset).filter_by(id=asset_id).one()
+    asset.isin = isin
+
+    # The asset is part of the serialized portfolios that hold it
+    increment_portfolio_versions(Portfolio.id.in_(
+        select(PortfolioElement.portfolio_id).where(PortfolioElement.asset_id == asset_id)))
+
+    return asset
+
+
 @call_database_function
 def get_asset_type_by_quote_type(quote_type: str):
     """
@@ -310,21 +463,209 @@ def get_asset_type_by_quote_type(quote_type: str):
 
 
 @call_database_function
-def get_ticker_symbols_of_portfolio(portfolio_id: int):
+def get_portfolio_positions(portfolio_id: str):
+    """
+    Fetches all elements of a portfolio together with their ticker symbol in one query.
+        Parameters:
+            str portfolio_id;
+        Returns:
+            List[Row]: id, ticker_symbol, count, buy_price, order_fee
+    """
+    return (
+        session.query(PortfolioElement.id, Asset.ticker_symbol, PortfolioElement.count,
+                      PortfolioElement.buy_price, PortfolioElement.order_fee)
+        .join(Asset, PortfolioElement.asset_id == Asset.id)
+        .filter(PortfolioElement.portfolio_id == portfolio_id)
+        .all()
+    )
+
+
+@call_database_function
+def get_price_history(ticker_symbol: str, interval: str):
+    """
+    Fetches the stored price history of a ticker for an interval.
+        Parameters:
+            str ticker_symbol;
+            str interval;
+        Returns:
+            PriceHistory
+    """
+    return session.query(PriceHistory).filter_by(ticker_symbol=ticker_symbol, interval=interval).first()
+
+
+def get_upsert_insert(model):
+    """
+    Creates an insert statement of the database dialect, which supports
+    ON CONFLICT clauses. Only PostgreSQL and SQLite are supported.
+        Parameters:
+            model;
+        Returns:
+            Insert
+    """
+    if session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def get_or_create_price_history(ticker_symbol: str, interval: str, start: datetime.datetime | None,
+                                now: datetime.datetime):
+    """
+    Fetches the price history of a ticker for an interval or creates it.
+    Concurrent requests might create the same price history, so it is
+    inserted with ON CONFLICT DO NOTHING and selected again.
+        Parameters:
+            str ticker_symbol;
+            str interval;
+            datetime | None start: Start of the stored range of a new price history;
+            datetime now;
+        Returns:
+            PriceHistory
+    """
+    price_history = session.query(PriceHistory).filter_by(ticker_symbol=ticker_symbol,
+                                                          interval=interval).first()
+    if price_history is not None:
+        return price_history
+
+    session.execute(
+        get_upsert_insert(PriceHistory)
+        .values(id=uuid.uuid4(), ticker_symbol=ticker_symbol, interval=interval,
+                start=start, updated_at=now)
+        .on_conflict_do_nothing(index_elements=['ticker_symbol', 'interval'])
+    )
+    return session.query(PriceHistory).filter_by(ticker_symbol=ticker_symbol,
+                                                 interval=interval).one()
+
+
+def upsert_price_bars(price_history_id: str, bars: List[Dict[str, Any]]):
+    """
+    Inserts price bars, bars with an already stored date are updated.
+    Concurrent refreshes of the same price history might have stored the
+    same bars after the stale bars were deleted.
+        Parameters:
+            str price_history_id;
+            List[Dict[str, Any]] bars;
+        Returns:
+            -
+    """
+    statement = get_upsert_insert(PriceBar)
+    statement = statement.on_conflict_do_update(
+        index_elements=['price_history_id', 'date'],
+        set_={column: statement.excluded[column] for column in PRICE_BAR_VALUE_COLUMNS}
+    )
+    session.execute(statement, [{**bar, 'price_history_id': price_history_id} for bar in bars])
+
+
+@call_database_function
+def store_price_bars(ticker_symbol: str, interval: str, start: datetime.datetime | None,
+                     bars: List[Dict[str, Any]], replace_all: bool):
+    """
+    Stores price bars in the price history of a ticker for an interval.
+    Stored bars from the date of the first new bar on are replaced by the new bars.
+    If replace_all is True, all stored bars are replaced and the start of the
+    stored range is set to start. Concurrent calls for the same price history
+    do not conflict, the bars of the last call are kept.
+        Parameters:
+            str ticker_symbol;
+            str interval;
+            datetime | None start;
+            List[Dict[str, Any]] bars;
+            bool replace_all;
+        Returns:
+            PriceHistory
+    """
+    now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+    price_history = get_or_create_price_history(ticker_symbol, interval, start, now)
+
+    bars_to_replace = session.query(PriceBar).filter(
+        PriceBar.price_history_id == price_history.id)
+
+    if replace_all:
+        price_history.start = start
+    elif bars:
+        bars_to_replace = bars_to_replace.filter(
+            PriceBar.date >= bars[0]['date'])
+    else:
+        bars_to_replace = None
+
+    if bars_to_replace is not None:
+        bars_to_replace.delete(synchronize_session=False)
+
+    price_history.updated_at = now
+
+    if bars:
+        upsert_price_bars(price_history.id, bars)
+
+    return price_history
+
+
+def select_price_bars(price_history_id: str, start: datetime.datetime | None = None):
     """
-    Fetches the ticker symbols associated with a specific portfolio
+    Creates the statement that selects the price bars of a price history, ordered by date.
         Parameters:
-            int portfolio_id
+            str price_history_id;
+            datetime | None start;
         Returns:
-            List of tickers
+            Select
     """
+    statement = select(
+        PriceBar.date, PriceBar.open, PriceBar.high, PriceBar.low, PriceBar.close,
+        PriceBar.volume, PriceBar.dividends, PriceBar.stock_splits, PriceBar.capital_gains
+    ).where(PriceBar.price_history_id == price_history_id)
+
+    if start is not None:
+        statement = statement.where(PriceBar.date >= start)
+
+    return statement.order_by(PriceBar.date)
+
 
-    tickers = [
-        ticker_symbol for (ticker_symbol,) in (
-            session.query(Asset.ticker_symbol)
-            .join(PortfolioElement, PortfolioElement.asset_id == Asset.id)
-            .filter(PortfolioElement.portfolio_id == portfolio_id)
-            .all()
-        )
-    ]
-    return tickers
+@call_database_function
+def get_price_bars(price_history_id: str, start: datetime.datetime | None = None):
+    """
+    Fetches the stored price bars of a price history, ordered by date.
+        Parameters:
+            str price_history_id;
+            datetime | None start;
+        Returns:
+            List[Row]: date, open, high, low, close, volume, dividends, stock_splits, capital_gains
+    """
+    return session.execute(select_price_bars(price_history_id, start)).all()
+
+
+def iter_price_bars(price_history_id: str, start: datetime.datetime | None, batch_size: int):
+    """
+    Fetches the stored price bars of a price history in batches, ordered by date.
+    Rows are fetched while iterating, so it is not wrapped by call_database_function.
+        Parameters:
+            str price_history_id;
+            datetime | None start;
+            int batch_size;
+        Returns:
+            Generator[List[Row]]: date, open, high, low, close, volume, dividends, stock_splits, capital_gains
+    """
+    try:
+        result = session.execute(select_price_bars(price_history_id, start),
+                                 execution_options={'yield_per': batch_size})
+        for partition in result.partitions():
+            yield partition
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+
+
+@call_database_function
+def get_last_price_bar(price_history_id: str):
+    """
+    Fetches the date, dividends and stock splits of the most recent stored price bar of a price history.
+        Parameters:
+            str price_history_id;
+        Returns:
+            Row | None: date, dividends, stock_splits
+    """
+    return (
+        session.query(PriceBar.date, PriceBar.dividends, PriceBar.stock_splits)
+        .filter(PriceBar.price_history_id == price_history_id)
+        .order_by(PriceBar.date.desc())
+        .first()
+    )
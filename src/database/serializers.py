@@ -0,0 +1,103 @@
+from operator import attrgetter, itemgetter
+from typing import Callable, Dict
+
+# Compiled serializer of every model class, created on first use
+_serializers: Dict[type, Callable] = {}
+
+
+def get_json_keys(model_class: type):
+    """
+    Returns the keys of a model that are revealed in its json representation.
+    Models without _json_values reveal all of their columns.
+        Parameters:
+            type model_class;
+        Returns:
+            List[str]
+    """
+    if len(model_class._json_values) > 0:
+        return list(model_class._json_values)
+    return model_class.__table__.columns.keys()
+
+
+def compile_serializer(model_class: type):
+    """
+    Creates a serializer for a model class. The mapper is inspected once,
+    so serializing an object only reads the precomputed attributes.
+        Parameters:
+            type model_class;
+        Returns:
+            Callable: Function that returns an object of the model as a dictionary.
+    """
+    relationships = model_class.__mapper__.relationships
+    keys = get_json_keys(model_class)
+
+    column_keys = tuple(key for key in keys if key not in relationships)
+    # Loaded attributes are read from the instance dict, which skips the
+    # attribute instrumentation. Attributes that are not loaded yet are read
+    # with getattr, so they are loaded like before.
+    # attrgetter and itemgetter only return a tuple for more than one key.
+    if len(column_keys) > 1:
+        get_loaded_columns = itemgetter(*column_keys)
+        get_columns = attrgetter(*column_keys)
+    else:
+        def get_loaded_columns(state):
+            return tuple(state[key] for key in column_keys)
+
+        def get_columns(obj):
+            return tuple(getattr(obj, key) for key in column_keys)
+
+    # Key, target model and whether the relationship is a list
+    relationship_plan = tuple(
+        (key, relationships[key].mapper.class_, relationships[key].uselist)
+        for key in keys if key in relationships
+    )
+
+    def serialize(obj):
+        state = obj.__dict__
+
+        try:
+            json_data = dict(zip(column_keys, get_loaded_columns(state)))
+        except KeyError:
+            json_data = dict(zip(column_keys, get_columns(obj)))
+
+        for key, related_class, is_list in relationship_plan:
+            related = state[key] if key in state else getattr(obj, key)
+            serialize_related = get_serializer(related_class)
+
+            if is_list:
+                json_data[key] = [serialize_related(item) for item in related]
+            else:
+                json_data[key] = None if related is None else serialize_related(related)
+
+        return json_data
+
+    return serialize
+
+
+def get_serializer(model_class: type):
+    """
+    Returns the serializer of a model class and compiles it on first use.
+        Parameters:
+            type model_class;
+        Returns:
+            Callable: Function that returns an object of the model as a dictionary.
+    """
+    serializer = _serializers.get(model_class)
+
+    if serializer is None:
+        serializer = _serializers[model_class] = compile_serializer(model_class)
+
+    return serializer
+
+
+def compile_all_serializers(base: type):
+    """
+    Compiles the serializers of all mapped models of a declarative base,
+    so the first requests do not pay for the compilation.
+        Parameters:
+            type base;
+        Returns:
+            -
+    """
+    for mapper in base.registry.mappers:
+        get_serializer(mapper.class_)
@@ -1,17 +1,81 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Engine, create_engine, inspect, make_url, text
+from sqlalchemy.orm import scoped_session, sessionmaker
 
-from src.config import DATABASE_URL
+from src.config import (DATABASE_MAX_OVERFLOW, DATABASE_POOL_PRE_PING,
+                        DATABASE_POOL_RECYCLE, DATABASE_POOL_SIZE,
+                        DATABASE_POOL_TIMEOUT, DATABASE_URL)
 from src.constants.asset_types import ASSET_TYPES
 from src.database.models import AssetType, Base
 
+
+def get_engine_options(database_url: str):
+    """
+    Returns the connection pool settings for the database engine.
+    SQLite uses its own pool implementation, so the settings are only
+    used for other databases.
+        Parameters:
+            str database_url;
+        Returns:
+            dict: Keyword arguments for create_engine.
+    """
+    if make_url(database_url).get_backend_name() == 'sqlite':
+        return {}
+
+    return {
+        'pool_size': DATABASE_POOL_SIZE,
+        'max_overflow': DATABASE_MAX_OVERFLOW,
+        'pool_timeout': DATABASE_POOL_TIMEOUT,
+        'pool_recycle': DATABASE_POOL_RECYCLE,
+        'pool_pre_ping': DATABASE_POOL_PRE_PING
+    }
+
+
 #  Creates a base class for all ORM models
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **get_engine_options(DATABASE_URL))
+
+
+#  Creates a session that gives query function context on which database they need to perform operations.
+#  Every thread gets its own session, which is removed at the end of every request.
+#  Objects are not expired on commit, as every query commits and eagerly loaded
+#  relationships would be loaded again on the next access otherwise.
+Session = sessionmaker(bind=engine, expire_on_commit=False)
+session = scoped_session(Session)
+
+
+def remove_session(exception: BaseException | None = None):
+    """
+    Closes the session of the current thread and returns its connection to the pool.
+    Registered as teardown function of the flask app.
+        Parameters:
+            BaseException | None exception;
+        Returns:
+            -
+    """
+    session.remove()
+
+
+# Columns that were added to existing tables, as create_all only creates missing tables
+SCHEMA_UPGRADES = [
+    ('portfolios', 'version', 'ALTER TABLE portfolios ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+]
+
 
+def upgrade_db_schema(engine: Engine):
+    """
+    Adds the columns of SCHEMA_UPGRADES that are missing in existing tables.
+        Parameters:
+            Engine engine;
+        Returns:
+            -
+    """
+    inspector = inspect(engine)
 
-#  Creates a session that gives query function context on which database they need to perform operations
-Session = sessionmaker(bind=engine)
-session = Session()
+    with engine.begin() as connection:
+        for table, column, statement in SCHEMA_UPGRADES:
+            if not inspector.has_table(table):
+                continue
+            if column not in {c['name'] for c in inspector.get_columns(table)}:
+                connection.execute(text(statement))
 
 
 def create_db_schema():
@@ -20,6 +84,7 @@ def create_db_schema():
     try:
         #  Creates Database Tables if they do not already exist
         Base.metadata.create_all(engine)
+        upgrade_db_schema(engine)
         initialize_default_data()
     except Exception as e:
         print(f'Error creating database schema: {e}')
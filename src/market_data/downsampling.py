@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# API names of the resampling intervals and the matching pandas offset aliases,
+# every bar is labelled with the start of its interval like the bars of yahoo finance
+RESAMPLE_RULES = {
+    '1d': 'D',
+    '1wk': 'W-MON',
+    '1mo': 'MS',
+    '3mo': 'QS',
+    '1y': 'YS'
+}
+
+# Aggregation of every price data column into one bar per interval
+OHLC_AGGREGATIONS = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Adj Close': 'last',
+    'Volume': 'sum',
+    'Dividends': 'sum',
+    'Capital Gains': 'sum'
+}
+
+# LTTB always keeps the first and the last bar
+MIN_POINTS = 3
+
+
+def resample_ohlc(df: pd.DataFrame, resample: str):
+    """
+    Aggregates the bars of a price history into one bar per interval.
+    Intervals without any bar are left out, every bar is labelled with
+    the start of its interval, e.g. weeks with their Monday.
+        Parameters:
+            DataFrame df: Price history with the date as first column;
+            str resample: Key of RESAMPLE_RULES;
+        Returns:
+            DataFrame: The aggregated price history.
+    """
+    df = df.set_index(df.columns[0])
+
+    # Split ratios multiply, 0 means no split
+    if 'Stock Splits' in df.columns:
+        df['Stock Splits'] = df['Stock Splits'].replace(0, 1)
+
+    aggregations = {column: OHLC_AGGREGATIONS.get(column, 'last')
+                    for column in df.columns}
+    if 'Stock Splits' in df.columns:
+        aggregations['Stock Splits'] = 'prod'
+
+    resampled = df.resample(RESAMPLE_RULES[resample], label='left', closed='left').agg(aggregations)
+
+    if 'Stock Splits' in df.columns:
+        resampled['Stock Splits'] = resampled['Stock Splits'].replace(1, 0)
+
+    resampled = resampled.dropna(subset=['Close'])
+    return resampled.reset_index()
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int):
+    """
+    Selects the points of a line that preserve its shape best, with the
+    Largest-Triangle-Three-Buckets algorithm. The points between the first
+    and the last point are split into buckets, from every bucket the point
+    that forms the largest triangle with the previously selected point and
+    the average of the next bucket is selected.
+        Parameters:
+            ndarray x: Ascending x values;
+            ndarray y;
+            int points: Number of points to select;
+        Returns:
+            ndarray: Ascending indices of the selected points.
+    """
+    n = len(x)
+    if points >= n or points < MIN_POINTS:
+        return np.arange(n)
+
+    # Bucket b contains the points edges[b] until edges[b + 1] - 1
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    counts = np.diff(edges)
+
+    # The average of the next bucket is the third point of every triangle,
+    # for the last bucket it is the last point
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Every selection depends on the previous one, so only the areas
+    # within a bucket are calculated vectorized
+    a = 0
+    for b in range(points - 2):
+        start, end = edges[b], edges[b + 1]
+        areas = np.abs((x[a] - next_x[b]) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (next_y[b] - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[b + 1] = a
+
+    return selected
+
+
+def downsample_lttb(df: pd.DataFrame, points: int):
+    """
+    Reduces a price history to a number of bars, selected by the shape of
+    the close price with LTTB. Selected bars are returned unchanged.
+        Parameters:
+            DataFrame df: Price history with the date as first column;
+            int points;
+        Returns:
+            DataFrame: The downsampled price history.
+    """
+    if len(df) <= points:
+        return df
+
+    # Only the spacing of the dates matters, so their unit does not
+    x = pd.to_datetime(df[df.columns[0]], utc=True).astype(np.int64).to_numpy(dtype=np.float64)
+    y = df['Close'].ffill().bfill().to_numpy(dtype=np.float64)
+
+    return df.iloc[lttb_indices(x, y, points)].reset_index(drop=True)
+
+
+def downsample(df: pd.DataFrame, points: int | None = None, resample: str | None = None):
+    """
+    Downsamples a price history, first by resampling, then to a number of points.
+        Parameters:
+            DataFrame df: Price history with the date as first column;
+            int | None points: Maximum number of bars, see downsample_lttb;
+            str | None resample: Interval of the bars, see resample_ohlc;
+        Returns:
+            DataFrame: The downsampled price history.
+    """
+    if resample is not None:
+        df = resample_ohlc(df, resample)
+    if points is not None:
+        df = downsample_lttb(df, points)
+
+    return df
@@ -1,6 +1,26 @@
 from yahooquery import Ticker
 
+from src.cache.cache import cached
+from src.config import MARKET_DATA_REQUEST_TIMEOUT, MISSING_MARKET_DATA_TTL
+from src.market_data.fan_out import fan_out_cached_batches
 
+# Sector keys of the fund sector weightings mapped to the sectors of the asset profiles
+SECTOR_NAMES = {
+    'realestate': 'Real Estate',
+    'consumer_cyclical': 'Consumer Cyclical',
+    'basic_materials': 'Basic Materials',
+    'consumer_defensive': 'Consumer Defensive',
+    'technology': 'Technology',
+    'communication_services': 'Communication Services',
+    'financial_services': 'Financial Services',
+    'utilities': 'Utilities',
+    'industrials': 'Industrials',
+    'energy': 'Energy',
+    'healthcare': 'Healthcare'
+}
+
+
+@cached('etf_holdings')
 def get_etf_info(ticker: str):
     """
     Returns specific basic etf information from yahoo finance.
@@ -17,3 +37,64 @@ def get_etf_info(ticker: str):
     }
 
     return etf_data
+
+
+def get_etf_compositions(tickers: list[str]):
+    """
+    Returns the top holdings and sector weights of multiple funds.
+    Compositions change rarely, so they are cached with a long TTL, see
+    fan_out_cached_batches. Tickers without holding information are only
+    cached shortly, as yahooquery returns no data on transient errors as well.
+        Parameters:
+            List[str] tickers;
+        Returns:
+            Dict[str, dict | None]: holdings and sector_weights per ticker,
+                None if the ticker has no holding information.
+    """
+    return fan_out_cached_batches('etf_composition', fetch_etf_compositions, tickers,
+                                  missing_ttl=MISSING_MARKET_DATA_TTL)
+
+
+def fetch_etf_compositions(tickers: tuple[str, ...]):
+    """
+    Fetches the top holdings and sector weights of multiple funds
+    from yahoo finance, without using the cache.
+        Parameters:
+            Tuple[str] tickers;
+        Returns:
+            Dict[str, dict | None]: holdings and sector_weights per ticker,
+                None if the ticker has no holding information.
+                holdings: List of symbol, name and weight of the top holdings.
+                sector_weights: Weight per sector, named like the stock sectors.
+    """
+    holding_info = Ticker(list(tickers), asynchronous=True,
+                          timeout=MARKET_DATA_REQUEST_TIMEOUT).fund_holding_info
+
+    compositions = {}
+    for ticker in tickers:
+        data = holding_info.get(ticker)
+
+        # yahooquery returns an error message instead of a dict for unknown tickers
+        if not isinstance(data, dict):
+            compositions[ticker] = None
+            continue
+
+        # Holdings without a symbol (e.g. cash or bonds) can not be matched with other positions
+        holdings = [
+            {'symbol': holding['symbol'], 'name': holding.get('holdingName'),
+             'weight': float(holding['holdingPercent'])}
+            for holding in data.get('holdings', [])
+            if holding.get('symbol') and holding.get('holdingPercent')
+        ]
+
+        # The sector weightings are a list of dicts with a single sector each
+        sector_weights = {}
+        for weighting in data.get('sectorWeightings', []):
+            for sector, weight in weighting.items():
+                if weight:
+                    name = SECTOR_NAMES.get(sector, sector)
+                    sector_weights[name] = sector_weights.get(name, 0.0) + float(weight)
+
+        compositions[ticker] = {'holdings': holdings, 'sector_weights': sector_weights}
+
+    return compositions
@@ -0,0 +1,167 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Hashable, Iterable
+
+from src.cache.cache import MISSING, get_cache
+from src.config import (MARKET_DATA_BATCH_SIZE, MARKET_DATA_CALL_TIMEOUT,
+                        MARKET_DATA_DEADLINE, MARKET_DATA_MAX_PARALLELISM,
+                        MARKET_DATA_MAX_WORKERS)
+
+# Long-lived thread pool that is shared by all market data lookups of this process
+executor = ThreadPoolExecutor(max_workers=MARKET_DATA_MAX_WORKERS,
+                              thread_name_prefix='market-data')
+
+# Marks the end of the items of a fan out call
+_NO_ITEM = object()
+
+
+class FanOutResult:
+    """
+    Result of a fan out call, containing the results of all successful
+    calls and the errors of all failed or timed out calls.
+
+    Methods:
+        raise_if_all_failed():
+            - Returns: None
+            - Raises: The first error, if no call was successful.
+    """
+
+    def __init__(self):
+        self.results: dict[Hashable, Any] = {}
+        self.errors: dict[Hashable, Exception] = {}
+
+    def raise_if_all_failed(self):
+        if self.errors and not self.results:
+            raise next(iter(self.errors.values()))
+
+
+def fan_out(func: Callable, items: Iterable[Hashable], max_parallelism: int | None = None,
+            timeout: float | None = None, deadline: float | None = None):
+    """
+    Calls func once per item on the shared market data thread pool, with
+    at most max_parallelism calls of this fan out running at the same time.
+    Calls that take longer than timeout are reported as TimeoutError.
+    The timeout starts once a call runs, so time spent queued behind other
+    requests on a busy pool does not count. The deadline covers the whole
+    fan out, once it has passed, queued calls are cancelled and all calls
+    that did not finish are reported as TimeoutError. Running calls can not
+    be interrupted, their result is discarded.
+        Parameters:
+            function func;
+            Iterable[Hashable] items;
+            int | None max_parallelism;
+            float | None timeout: Seconds per call;
+            float | None deadline: Seconds of the whole fan out;
+        Returns:
+            FanOutResult: Results and errors per item.
+    """
+    if max_parallelism is None:
+        max_parallelism = MARKET_DATA_MAX_PARALLELISM
+    if timeout is None:
+        timeout = MARKET_DATA_CALL_TIMEOUT
+    if deadline is None:
+        deadline = MARKET_DATA_DEADLINE
+    end = time.monotonic() + deadline
+
+    result = FanOutResult()
+    pending_items = iter(dict.fromkeys(items))
+    # Item and start time of every submitted call, None until the call runs
+    running: dict[Future, list] = {}
+
+    def run(call: list, item: Hashable):
+        call[1] = time.monotonic()
+        return func(item)
+
+    def submit_next():
+        item = next(pending_items, _NO_ITEM)
+        if item is not _NO_ITEM:
+            call = [item, None]
+            future = executor.submit(run, call, item)
+            running[future] = call
+
+    for _ in range(max_parallelism):
+        submit_next()
+
+    while running:
+        # Calls that have not started yet can not exceed their timeout
+        # before it has passed from now on
+        now = time.monotonic()
+        next_deadline = min(now + timeout if started is None else started + timeout
+                            for _, started in running.values())
+        next_deadline = min(next_deadline, end)
+        done, _ = wait(running, timeout=max(0, next_deadline - now),
+                       return_when=FIRST_COMPLETED)
+
+        for future in done:
+            item, _ = running.pop(future)
+            try:
+                result.results[item] = future.result()
+            except Exception as e:
+                result.errors[item] = e
+            submit_next()
+
+        # Give up on all calls that exceeded their timeout
+        now = time.monotonic()
+        for future, (item, started) in list(running.items()):
+            if started is not None and started + timeout <= now:
+                del running[future]
+                result.errors[item] = TimeoutError(
+                    f'Market data lookup for "{item}" timed out after {timeout}s.')
+                submit_next()
+
+        if running and time.monotonic() >= end:
+            break
+
+    # Give up on all remaining calls, queued calls do not occupy a worker anymore
+    for future, (item, _) in running.items():
+        future.cancel()
+        result.errors[item] = TimeoutError(
+            f'Market data lookup for "{item}" did not finish within {deadline}s.')
+    for item in pending_items:
+        result.errors[item] = TimeoutError(
+            f'Market data lookup for "{item}" did not start within {deadline}s.')
+
+    return result
+
+
+def fan_out_cached_batches(dataset: str, fetch_batch: Callable, tickers: Iterable[str],
+                           missing_ttl: float | None = None):
+    """
+    Returns the values of multiple tickers. Cached tickers are served from the
+    cache, all others are fetched together in batches of MARKET_DATA_BATCH_SIZE
+    and the batches run concurrently. Tickers of failed batches are left out.
+        Parameters:
+            str dataset: Cache dataset of the values;
+            function fetch_batch: Fetches the values of a tuple of tickers, returns a dict
+                with the value of every ticker, None if it was not found;
+            Iterable[str] tickers;
+            float | None missing_ttl: TTL of None values, the TTL of the dataset by default;
+        Returns:
+            Dict[str, Any]: Value per ticker.
+        Raises:
+            Exception: The first error, if every batch failed.
+    """
+    cache = get_cache()
+
+    values = {}
+    missing_tickers = []
+    for ticker in dict.fromkeys(tickers):
+        value = cache.get(dataset, ticker)
+        if value is MISSING:
+            missing_tickers.append(ticker)
+        else:
+            values[ticker] = value
+
+    batches = [
+        tuple(missing_tickers[i:i + MARKET_DATA_BATCH_SIZE])
+        for i in range(0, len(missing_tickers), MARKET_DATA_BATCH_SIZE)
+    ]
+    fetched = fan_out(fetch_batch, batches)
+    fetched.raise_if_all_failed()
+
+    for batch_values in fetched.results.values():
+        for ticker, value in batch_values.items():
+            cache.set(dataset, ticker, value, ttl=missing_ttl if value is None else None)
+            values[ticker] = value
+
+    return values
@@ -1,26 +1,71 @@
-from multiprocessing import Process, Queue
-
 import yfinance as yf
 
+from src.cache.cache import MISSING, cached, get_cache
+from src.config import ISIN_LOOKUP_TIMEOUT
+from src.database import queries
+from src.market_data.fan_out import fan_out
+from src.market_data.symbol_index import set_symbol_validity
+
 
-def get_isin(ticker: str, queue: Queue):
+def fetch_isin(ticker: str):
     """
-    Helper function that fetches ISIN from the ticker object
-    and puts it in a queue to give back to caller.
+    Helper function that fetches the ISIN from the ticker object.
         Parameters:
             str ticker;
-            Queue queue;
         Returns:
-            -
+            str | None: The ISIN or None if it is unknown.
+    """
+    isin = yf.Ticker(ticker).isin
+
+    if isin is None or isin == '-':
+        return None
+    return isin
+
+
+def get_isin(ticker: str):
     """
-    try:
-        ticker_obj = yf.Ticker(ticker)
-        isin = ticker_obj.isin
-        queue.put(isin)
-    except Exception as e:
-        queue.put('-')
+    Returns the ISIN of a ticker. ISINs that are already stored for an asset
+    or cached are reused, otherwise it is fetched on the market data thread
+    pool with a custom timeout, as the default timeout from yfinance is 30sec.
+    Fetched ISINs are stored for the asset, if the asset exists. Tickers
+    without an ISIN are cached too, so they are not looked up again.
+        Parameters:
+            str ticker;
+        Returns:
+            str | None: The ISIN or None if it is unknown or the lookup timed out.
+    """
+    asset = queries.get_asset_by_ticker(ticker)
+    if asset is not None and asset.isin:
+        return asset.isin
+
+    cache = get_cache()
+    isin = cache.get('isin', ticker)
+    if isin is not MISSING:
+        return isin
+
+    result = fan_out(fetch_isin, [ticker], timeout=ISIN_LOOKUP_TIMEOUT)
+    if ticker not in result.results:
+        # Failed or timed out lookups are retried on the next call
+        return None
+
+    # Tickers without an ISIN (e.g. funds or crypto) are cached as well
+    isin = result.results[ticker]
+    cache.set('isin', ticker, isin)
+
+    if isin is None:
+        return None
+
+    if asset is not None:
+        try:
+            queries.update_asset_isin(asset.id, isin)
+        except Exception:
+            # The ISIN is unique, another asset might already use it
+            pass
+
+    return isin
 
 
+@cached('quote_info')
 def get_general_info(ticker: str):
     """
     Returns all information about a ticker from yahoo finance.
@@ -32,25 +77,14 @@ def get_general_info(ticker: str):
     ticker_obj = yf.Ticker(ticker)
 
     if ticker_obj.info.get('symbol') is None:
+        set_symbol_validity(ticker, False)
         return None
 
+    set_symbol_validity(ticker, True)
     ticker_info = ticker_obj.info
 
-    # Use multiprocessing for custom 5sec timeout as default timeout
-    # from yfinance is 30sec.
-    queue = Queue()
-    process = Process(target=get_isin, args=(ticker, queue))
-    process.start()
-    process.join(timeout=5)
-
-    if process.is_alive():
-        # terminate the process if it's still running
-        process.terminate()
-        process.join()
-    else:
-        # get the result from the queue and put it into return dict
-        isin = queue.get()
-        if isin != '-':
-            ticker_info['isin'] = isin
+    isin = get_isin(ticker)
+    if isin is not None:
+        ticker_info['isin'] = isin
 
     return ticker_info
@@ -1,60 +1,361 @@
-import json
+import datetime
+from typing import Any, Callable
 
+import numpy as np
+import pandas as pd
 import yfinance as yf
+from yahooquery import Ticker
+from yfinance.exceptions import YFChartError, YFTickerMissingError
+
+from src.cache.cache import MISSING, cached, get_cache
+from src.config import (MARKET_DATA_REQUEST_TIMEOUT, PRICE_DATA_CHUNK_SIZE,
+                        QUOTE_BATCH_SIZE)
+from src.market_data.downsampling import downsample
+from src.market_data.fan_out import fan_out
+from src.market_data.price_history_store import (get_stored_price_history,
+                                                 is_stored,
+                                                 iter_stored_price_history,
+                                                 update_stored_price_history)
+from src.market_data.symbol_index import (check_symbol_validity,
+                                          get_symbol_validity,
+                                          set_symbol_validity)
 
 VALID_PERIODS = ['1d', '5d', '1mo', '3mo',
                  '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
 VALID_INTERVALS = ['1m', '2m', '5m', '15m', '30m',
                    '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']
+# JSON formats of the price data, records repeat the column names for every bar,
+# ndjson streams one record per line
+PRICE_DATA_FORMATS = ['records', 'columns', 'ndjson']
 
 
-def get_price_data(ticker: str, period: str, interval: str):
+def fetch_for_symbol(ticker: str, fetch: Callable[[], Any]):
     """
-    Returns the price data in JSON format for a specific period and interval.
+    Fetches data of a ticker. Whether the ticker exists is only checked,
+    if fetching the data failed.
+        Parameters:
+            str ticker;
+            Callable fetch: Fetches the data from yahoo finance;
+        Returns:
+            Any | None: The result of fetch, None if the ticker does not exist.
+    """
+    if get_symbol_validity(ticker) is False:
+        return None
+
+    try:
+        result = fetch()
+    except (YFChartError, YFTickerMissingError) as e:
+        if not check_symbol_validity(ticker):
+            return None
+        raise e
+
+    set_symbol_validity(ticker, True)
+
+    return result
+
+
+def fetch_price_history(ticker: str, period: str, interval: str):
+    """
+    Fetches price data from yahoo finance, without the local store.
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+        Returns:
+            DataFrame: PriceData with the date as first column.
+    """
+    df = yf.Ticker(ticker).history(
+        period=period, interval=interval, raise_errors=True,
+        timeout=MARKET_DATA_REQUEST_TIMEOUT)
+
+    # Reset index to make the DataFrame easier to convert to JSON
+    df.reset_index(inplace=True)
+    return df
+
+
+@cached('price_history')
+def get_price_history(ticker: str, period: str, interval: str):
+    """
+    Returns the price data for a specific period and interval as DataFrame.
         Parameters:
             str ticker;
             str period;
             str interval;
         Returns:
-            dict: PriceData for requested ticker in JSON format.
+            DataFrame | None: PriceData for requested ticker with a 'Date' column,
+                None if the ticker does not exist.
     """
 
     if period not in VALID_PERIODS or interval not in VALID_INTERVALS:
         raise Exception("Invalid period or interval")
 
-    ticker_obj = yf.Ticker(ticker)
-    if ticker_obj.info.get('symbol') is None:
+    if is_stored(period, interval):
+        return fetch_for_symbol(ticker, lambda: get_stored_price_history(ticker, period, interval))
+
+    return fetch_for_symbol(ticker, lambda: fetch_price_history(ticker, period, interval))
+
+
+def get_downsampled_price_history(ticker: str, period: str, interval: str,
+                                  points: int | None = None, resample: str | None = None):
+    """
+    Returns the price data as DataFrame, downsampled on request.
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+            int | None points: Maximum number of bars, selected with LTTB;
+            str | None resample: Interval the bars are aggregated to, see RESAMPLE_RULES;
+        Returns:
+            DataFrame | None: PriceData for requested ticker with the date as first column,
+                None if the ticker does not exist.
+    """
+    df = get_price_history(ticker, period, interval)
+
+    if df is None:
         return None
+
+    return downsample(df, points, resample)
+
+
+def get_price_data(ticker: str, period: str, interval: str,
+                   points: int | None = None, resample: str | None = None):
+    """
+    Returns the price data in JSON format for a specific period and interval.
+    The DataFrame is encoded once and the result is passed on without decoding it.
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+            int | None points: Maximum number of bars, selected with LTTB;
+            str | None resample: Interval the bars are aggregated to, see RESAMPLE_RULES;
+        Returns:
+            str | None: PriceData for requested ticker as JSON list of records,
+                None if the ticker does not exist.
+    """
+    df = get_downsampled_price_history(ticker, period, interval, points, resample)
+
+    if df is None:
+        return None
+
+    return df.to_json(orient='records', date_format='iso')
+
+
+def stream_price_data(ticker: str, period: str, interval: str,
+                      points: int | None = None, resample: str | None = None):
+    """
+    Returns the price data as NDJSON, one record per line, in chunks of
+    PRICE_DATA_CHUNK_SIZE bars. Price data from the local store is read chunk
+    by chunk while the response is sent, so the memory usage does not grow
+    with the period. The price data is fetched before the first chunk,
+    so errors are raised by this function and not while streaming.
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+            int | None points: Maximum number of bars, selected with LTTB;
+            str | None resample: Interval the bars are aggregated to, see RESAMPLE_RULES;
+        Returns:
+            Generator[str] | None: The NDJSON chunks, None if the ticker does not exist.
+    """
+    if points is None and resample is None and is_stored(period, interval):
+        stored = fetch_for_symbol(
+            ticker, lambda: update_stored_price_history(ticker, period, interval))
+        if stored is None:
+            return None
+
+        chunks = iter_stored_price_history(*stored)
     else:
-        df = ticker_obj.history(
-            period=period, interval=interval, raise_errors=True)
+        df = get_downsampled_price_history(ticker, period, interval, points, resample)
+        if df is None:
+            return None
 
-        # Reset index to make the DataFrame easier to convert to JSON
-        df.reset_index(inplace=True)
+        chunks = (df.iloc[i:i + PRICE_DATA_CHUNK_SIZE]
+                  for i in range(0, len(df), PRICE_DATA_CHUNK_SIZE))
 
-        json_price_data = json.loads(df.to_json(
-            orient='records', date_format='iso'))
-        return json_price_data
+    return (to_ndjson(chunk) for chunk in chunks if len(chunk) > 0)
+
+
+def to_ndjson(df: pd.DataFrame):
+    """
+    Encodes price data as NDJSON, one record per line.
+        Parameters:
+            DataFrame df;
+        Returns:
+            str: The records, every line ends with a line break.
+    """
+    lines = df.to_json(orient='records', date_format='iso', lines=True)
+
+    # Older pandas versions omit the last line break
+    return lines if lines.endswith('\n') else lines + '\n'
+
+
+def get_utc_dates(df: pd.DataFrame):
+    """
+    Returns the date column of a price history as UTC dates with millisecond precision.
+    The date column is the first column, named 'Date' or 'Datetime' for intraday data.
+        Parameters:
+            DataFrame df;
+        Returns:
+            ndarray: datetime64[ms] array.
+    """
+    dates = df[df.columns[0]]
+
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+
+    return dates.to_numpy(dtype='datetime64[ms]')
+
+
+def get_price_data_columns(ticker: str, period: str, interval: str,
+                           points: int | None = None, resample: str | None = None):
+    """
+    Returns the price data as parallel arrays, one per column, so the
+    column names are not repeated for every bar.
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+            int | None points: Maximum number of bars, selected with LTTB;
+            str | None resample: Interval the bars are aggregated to, see RESAMPLE_RULES;
+        Returns:
+            Dict[str, list | ndarray] | None: Dates as ISO strings and values per column,
+                None if the ticker does not exist.
+    """
+    df = get_downsampled_price_history(ticker, period, interval, points, resample)
+
+    if df is None:
+        return None
+
+    columns = {
+        df.columns[0]: np.datetime_as_string(get_utc_dates(df), unit='ms', timezone='UTC').tolist()
+    }
+    for column in df.columns[1:]:
+        columns[column] = df[column].to_numpy()
+
+    return columns
+
+
+def get_price_data_binary(ticker: str, period: str, interval: str,
+                          points: int | None = None, resample: str | None = None):
+    """
+    Returns the price data as packed little-endian float64 arrays, one
+    after another in column order. Dates are milliseconds since epoch (UTC).
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+            int | None points: Maximum number of bars, selected with LTTB;
+            str | None resample: Interval the bars are aggregated to, see RESAMPLE_RULES;
+        Returns:
+            tuple | None: None if the ticker does not exist, otherwise:
+                bytes: The packed columns.
+                List[str]: The column names.
+                int: The number of bars per column.
+    """
+    df = get_downsampled_price_history(ticker, period, interval, points, resample)
+
+    if df is None:
+        return None
+
+    values = np.empty((len(df.columns), len(df)), dtype='<f8')
+    values[0] = get_utc_dates(df).astype('int64')
+    for i, column in enumerate(df.columns[1:], start=1):
+        values[i] = df[column].to_numpy(dtype='float64', na_value=np.nan)
+
+    return values.tobytes(), list(df.columns), len(df)
 
 
 def get_current_price(ticker_symbol: str):
     """
-    Fetches the most recent price of a given ticker symbol.
+    Returns the current price of a given ticker symbol,
+    shares the cache entries of get_current_prices.
         Parameters:
             str ticker_symbol
         Returns:
-            JSON price_data
+            dict | None: price, timestamp and currency, None if the ticker does not exist.
     """
+    return get_current_prices([ticker_symbol])[ticker_symbol]
 
-    ticker = yf.Ticker(ticker_symbol)
 
-    if ticker.info.get('symbol') is None:
-        return None
+def get_current_prices(tickers: list[str]):
+    """
+    Returns the current price of multiple tickers. Cached prices are served
+    from the cache, all other prices are fetched with one batched quote
+    request per QUOTE_BATCH_SIZE tickers, the batches run concurrently.
+        Parameters:
+            List[str] tickers;
+        Returns:
+            Dict[str, dict | None]: price, timestamp and currency per ticker,
+                None if the ticker does not exist. Tickers of failed batches are left out.
+    """
+    cache = get_cache()
+
+    prices = {}
+    missing_tickers = []
+    for ticker in dict.fromkeys(tickers):
+        if get_symbol_validity(ticker) is False:
+            prices[ticker] = None
+            continue
+
+        price_info = cache.get('current_price', ticker)
+        if price_info is MISSING:
+            missing_tickers.append(ticker)
+        else:
+            prices[ticker] = price_info
+
+    batches = [
+        tuple(missing_tickers[i:i + QUOTE_BATCH_SIZE])
+        for i in range(0, len(missing_tickers), QUOTE_BATCH_SIZE)
+    ]
+    fetched = fan_out(fetch_current_prices, batches)
+    fetched.raise_if_all_failed()
+
+    for batch_prices in fetched.results.values():
+        for ticker, price_info in batch_prices.items():
+            if price_info is None:
+                # Tickers without a quote are not requested again until the invalid symbol expires
+                set_symbol_validity(ticker, False)
+            else:
+                set_symbol_validity(ticker, True)
+                cache.set('current_price', ticker, price_info)
+            prices[ticker] = price_info
+
+    return prices
+
+
+def fetch_current_prices(tickers: tuple[str, ...]):
+    """
+    Fetches the current price of multiple tickers with one quote request,
+    without using the cache.
+        Parameters:
+            Tuple[str] tickers;
+        Returns:
+            Dict[str, dict | None]: price, timestamp and currency per ticker,
+                None if the ticker does not exist.
+    """
+    quotes = Ticker(list(tickers), timeout=MARKET_DATA_REQUEST_TIMEOUT).quotes
+
+    # yahooquery returns an error message instead of a dict if the request failed
+    if not isinstance(quotes, dict):
+        raise Exception(quotes)
+
+    prices = {}
+    for ticker in tickers:
+        quote = quotes.get(ticker)
 
-    recent_data = ticker.history(period='1d')
+        if not isinstance(quote, dict) or quote.get('regularMarketPrice') is None:
+            prices[ticker] = None
+            continue
 
-    most_recent_price = recent_data['Close'].iloc[-1]
+        timestamp = quote.get('regularMarketTime')
+        if isinstance(timestamp, (int, float)):
+            timestamp = datetime.datetime.fromtimestamp(
+                timestamp, datetime.UTC).isoformat()
 
-    price_info = {"price": most_recent_price}
+        prices[ticker] = {
+            'price': quote['regularMarketPrice'],
+            'timestamp': timestamp,
+            'currency': quote.get('currency')
+        }
 
-    return price_info
+    return prices
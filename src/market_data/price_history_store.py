@@ -0,0 +1,220 @@
+import datetime
+from typing import Any, Dict, List
+
+import pandas as pd
+import yfinance as yf
+from sqlalchemy import Row
+
+from src.config import (MARKET_DATA_REQUEST_TIMEOUT, PRICE_DATA_CHUNK_SIZE,
+                        PRICE_HISTORY_REFRESH_INTERVAL)
+from src.database import queries
+
+# Price histories of these intervals and periods are stored locally.
+# Intraday data is only available for short periods on yahoo finance and
+# short periods are cheap to fetch, so they are not stored.
+STORED_INTERVALS = ['1d', '5d', '1wk', '1mo', '3mo']
+STORED_PERIODS = ['1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
+
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10)
+}
+
+# Columns of the yfinance price history and the PriceBar model
+PRICE_COLUMNS = {
+    'Date': 'date',
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Volume': 'volume',
+    'Dividends': 'dividends',
+    'Stock Splits': 'stock_splits',
+    'Capital Gains': 'capital_gains'
+}
+
+
+def is_stored(period: str, interval: str):
+    """
+    Checks whether price data for this period and interval is served from the local store.
+        Parameters:
+            str period;
+            str interval;
+        Returns:
+            bool
+    """
+    return period in STORED_PERIODS and interval in STORED_INTERVALS
+
+
+def get_period_start(period: str, now: datetime.datetime):
+    """
+    Calculates the start date of a period.
+        Parameters:
+            str period;
+            datetime now;
+        Returns:
+            datetime | None: The UTC start date, None for the maximum period.
+    """
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return datetime.datetime(now.year, 1, 1)
+
+    return (pd.Timestamp(now) - PERIOD_OFFSETS[period]).to_pydatetime()
+
+
+def fetch_price_bars(ticker: str, **kwargs):
+    """
+    Fetches price data from yahoo finance and converts it to price bars.
+        Parameters:
+            str ticker;
+            **kwargs: Passed on to yfinance history().
+        Returns:
+            List[Dict[str, Any]]: The price bars, ordered by date with UTC dates.
+    """
+    df = yf.Ticker(ticker).history(raise_errors=True, timeout=MARKET_DATA_REQUEST_TIMEOUT, **kwargs)
+    if df.empty:
+        return []
+
+    df.index = df.index.tz_convert('UTC').tz_localize(None)
+    df.index.name = 'Date'
+    df.reset_index(inplace=True)
+
+    df = df[[c for c in PRICE_COLUMNS if c in df.columns]]
+    return df.rename(columns=PRICE_COLUMNS).to_dict(orient='records')
+
+
+def has_new_corporate_action(bars: List[Dict[str, Any]], last_bar: Row):
+    """
+    Checks whether fetched bars contain a split or dividend that is not stored yet.
+        Parameters:
+            List[Dict[str, Any]] bars: Bars fetched since the last stored bar;
+            Row last_bar: date, dividends and stock_splits of the last stored bar;
+        Returns:
+            bool
+    """
+    for bar in bars:
+        if bar['date'] == last_bar.date:
+            # The last stored bar might have been stored before the action was known
+            if (bar['dividends'] != last_bar.dividends
+                    or bar['stock_splits'] != last_bar.stock_splits):
+                return True
+        elif bar['dividends'] or bar['stock_splits']:
+            return True
+
+    return False
+
+
+def update_stored_price_history(ticker: str, period: str, interval: str):
+    """
+    Makes sure the local store contains the price data of a ticker. Only data
+    that is missing locally is fetched from yahoo finance: the full period, if
+    the stored range does not cover it, or else the bars since the last stored
+    bar, if the stored data was not refreshed recently. The stored bars are
+    adjusted for splits and dividends, so the whole stored range is fetched
+    again once a new split or dividend occurs.
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+        Returns:
+            tuple:
+                str: ID of the stored price history.
+                datetime | None: UTC start date of the period.
+    """
+    now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+    start = get_period_start(period, now)
+
+    price_history = queries.get_price_history(ticker, interval)
+
+    if price_history is None or (price_history.start is not None and (
+            start is None or price_history.start > start)):
+        # Stored range does not cover the requested period
+        bars = fetch_price_bars(ticker, period=period, interval=interval)
+        price_history = queries.store_price_bars(
+            ticker, interval, start, bars, replace_all=True)
+
+    elif price_history.updated_at < now - datetime.timedelta(seconds=PRICE_HISTORY_REFRESH_INTERVAL):
+        # Only fetch bars since the last stored bar, which is replaced as it might have changed
+        last_bar = queries.get_last_price_bar(price_history.id)
+        if last_bar is None:
+            bars = fetch_price_bars(ticker, period=period, interval=interval)
+        else:
+            bars = fetch_price_bars(ticker, interval=interval,
+                                    start=last_bar.date.replace(tzinfo=datetime.UTC))
+
+        if last_bar is not None and has_new_corporate_action(bars, last_bar):
+            # Yahoo finance adjusts all earlier bars for splits and dividends,
+            # so the stored range is replaced with freshly adjusted bars
+            if price_history.start is None:
+                bars = fetch_price_bars(ticker, period='max', interval=interval)
+            else:
+                bars = fetch_price_bars(ticker, interval=interval,
+                                        start=price_history.start.replace(tzinfo=datetime.UTC))
+            price_history = queries.store_price_bars(
+                ticker, interval, price_history.start, bars, replace_all=True)
+        else:
+            price_history = queries.store_price_bars(
+                ticker, interval, start, bars, replace_all=False)
+
+    return price_history.id, start
+
+
+def price_bars_to_frame(rows: List[Row]):
+    """
+    Converts stored price bars to a DataFrame.
+        Parameters:
+            List[Row] rows: Price bars with all columns of PRICE_COLUMNS;
+        Returns:
+            DataFrame: PriceData with the same columns as a yfinance history.
+    """
+    df = pd.DataFrame.from_records(rows, columns=list(PRICE_COLUMNS))
+    df['Date'] = pd.to_datetime(df['Date'], utc=True)
+
+    # Capital gains are only available for funds
+    if df['Capital Gains'].isna().all():
+        df.drop(columns='Capital Gains', inplace=True)
+
+    return df
+
+
+def get_stored_price_history(ticker: str, period: str, interval: str):
+    """
+    Returns the price data of a ticker from the local store, see update_stored_price_history.
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+        Returns:
+            DataFrame: PriceData with the same columns as a yfinance history.
+    """
+    price_history_id, start = update_stored_price_history(ticker, period, interval)
+
+    return price_bars_to_frame(queries.get_price_bars(price_history_id, start))
+
+
+def iter_stored_price_history(price_history_id: str, start: datetime.datetime | None):
+    """
+    Reads the stored price data of a ticker in chunks, so only one chunk is
+    in memory at the same time. Whether capital gains are included is
+    decided by the first chunk, they are stored for all bars of funds.
+        Parameters:
+            str price_history_id;
+            datetime | None start;
+        Returns:
+            Generator[DataFrame]: PriceData chunks with the same columns as a yfinance history.
+    """
+    columns = None
+
+    for rows in queries.iter_price_bars(price_history_id, start, PRICE_DATA_CHUNK_SIZE):
+        df = price_bars_to_frame(rows)
+
+        if columns is None:
+            columns = list(df.columns)
+
+        yield df.reindex(columns=columns)
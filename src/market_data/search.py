@@ -1,8 +1,10 @@
 import yahooquery
 
+from src.cache.cache import cached
 from src.constants.asset_types import QUOTE_TYPE_LIST
 
 
+@cached('search')
 def search_assets(query: str, country: str | None = None):
     """
     Uses yahooquery to find assets for the passed query filtered
@@ -1,20 +1,55 @@
-import yfinance as yf
+from yahooquery import Ticker
 
+from src.config import MARKET_DATA_REQUEST_TIMEOUT
+from src.market_data.fan_out import fan_out_cached_batches
 
-def get_stock_classification(ticker: str):
+
+def get_stock_classifications(tickers: list[str]):
+    """
+    Returns the quote type, country, sector and pe of multiple tickers.
+    Cached tickers are served from the cache, all others are fetched
+    together with one multi-symbol yahooquery Ticker per batch and
+    the batches run concurrently. Tickers of failed batches are left out.
+        Parameters:
+            List[str] tickers;
+        Returns:
+            Dict[str, dict | None]: quoteType, country, sector and trailingPE per ticker,
+                None if the ticker was not found.
+    """
+    return fan_out_cached_batches('classification', fetch_stock_classifications, tickers)
+
+
+def fetch_stock_classifications(tickers: tuple[str, ...]):
     """
-    Returns the country, sector and pe of a given stock ticker or None if this information is not available
+    Fetches the quote type, country, sector and pe of multiple tickers
+    from yahoo finance, without using the cache.
         Parameters:
-            str ticker
+            Tuple[str] tickers;
         Returns:
-            JSON country, sector and trailingPE if Data is available
+            Dict[str, dict | None]: quoteType, country, sector and trailingPE per ticker,
+                None if the ticker was not found.
     """
-    stock = yf.Ticker(ticker)
-    if stock:
-        info = stock.info
-        ticker_type = info.get('quoteType')
+    modules = Ticker(list(tickers), asynchronous=True,
+                     timeout=MARKET_DATA_REQUEST_TIMEOUT).get_modules(
+        ['quoteType', 'assetProfile', 'summaryDetail'])
+
+    classifications = {}
+    for ticker in tickers:
+        data = modules.get(ticker)
+
+        # yahooquery returns an error message instead of a dict for unknown tickers
+        if not isinstance(data, dict) or not isinstance(data.get('quoteType'), dict):
+            classifications[ticker] = None
+            continue
+
+        asset_profile = data.get('assetProfile', {})
+        summary_detail = data.get('summaryDetail', {})
 
-        if ticker_type == 'EQUITY':
-            return info.get('country'), info.get('sector'), info.get('trailingPE')
+        classifications[ticker] = {
+            'quoteType': data['quoteType'].get('quoteType'),
+            'country': asset_profile.get('country'),
+            'sector': asset_profile.get('sector'),
+            'trailingPE': summary_detail.get('trailingPE')
+        }
 
-    return None
+    return classifications
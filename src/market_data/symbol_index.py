@@ -0,0 +1,77 @@
+import yfinance as yf
+
+from src.cache.cache import MISSING, get_cache
+from src.config import INVALID_SYMBOL_TTL
+from src.database import queries
+
+# Key of the cache entry that marks the index as seeded from the assets table
+SEEDED_KEY = '__seeded__'
+
+
+def seed_symbol_index():
+    """
+    Marks all ticker symbols of the assets table as valid, as assets are
+    only added for existing symbols. Seeding is repeated when the seeded
+    marker expires.
+        Parameters:
+            -
+        Returns:
+            -
+    """
+    cache = get_cache()
+
+    if cache.get('symbol_validity', SEEDED_KEY) is not MISSING:
+        return
+
+    for ticker in queries.get_all_ticker_symbols():
+        cache.set('symbol_validity', ticker, True)
+    cache.set('symbol_validity', SEEDED_KEY, True)
+
+
+def get_symbol_validity(ticker: str):
+    """
+    Looks up whether a ticker symbol is known to exist, without any upstream call.
+        Parameters:
+            str ticker;
+        Returns:
+            bool | None: True if it is known to be valid, False if it is known
+                to be invalid, None if it is unknown.
+    """
+    seed_symbol_index()
+
+    valid = get_cache().get('symbol_validity', ticker)
+    return None if valid is MISSING else valid
+
+
+def set_symbol_validity(ticker: str, valid: bool):
+    """
+    Stores whether a ticker symbol exists. Invalid symbols expire earlier,
+    as they might be listed later on.
+        Parameters:
+            str ticker;
+            bool valid;
+        Returns:
+            -
+    """
+    get_cache().set('symbol_validity', ticker, valid,
+                    ttl=None if valid else INVALID_SYMBOL_TTL)
+
+
+def check_symbol_validity(ticker: str):
+    """
+    Checks whether a ticker symbol exists. Unknown symbols are checked
+    with the quote info from yahoo finance.
+    Should only be called after an upstream call for the symbol failed,
+    to find out whether the symbol or the request was invalid.
+        Parameters:
+            str ticker;
+        Returns:
+            bool: Whether the symbol exists.
+    """
+    valid = get_symbol_validity(ticker)
+
+    if valid is None:
+        valid = yf.Ticker(ticker).info.get('symbol') is not None
+        set_symbol_validity(ticker, valid)
+
+    return valid
@@ -0,0 +1,180 @@
+import numpy as np
+
+from src.cache.cache import MISSING, get_cache
+from src.portfolio_analysis.performance import (get_close_price_matrix,
+                                                get_position_counts)
+
+# Shortest stored period that covers a window, with its approximate number of daily bars
+WINDOW_PERIODS = [('3mo', 63), ('6mo', 126), ('1y', 252), ('2y', 504), ('5y', 1260), ('10y', 2520)]
+MIN_WINDOW = 3
+MAX_WINDOW = 2520
+
+
+class RollingCovariance:
+    """
+    Covariance of the last returns of multiple tickers within a window.
+    The sums and the cross products of the returns are kept, so adding a
+    return and dropping the oldest one is O(n²) instead of recalculating
+    the covariance of the whole window. To avoid accumulating rounding
+    errors, the cross products are recalculated once the window was replaced.
+
+    Methods:
+        add(returns):
+            - returns (ndarray): Returns of one bar, one per ticker.
+            - Returns: None
+        covariance():
+            - Returns: ndarray covariance matrix.
+        correlation():
+            - Returns: ndarray correlation matrix.
+    """
+
+    def __init__(self, returns: np.ndarray, window: int):
+        returns = returns[-window:]
+
+        # Ring buffer of the returns, once it is full self.next is the position of the oldest
+        self.window = window
+        self.returns = np.empty((window, returns.shape[1]))
+        self.returns[:len(returns)] = returns
+        self.count = len(returns)
+        self.next = self.count % window
+        self._recalculate()
+
+    def _recalculate(self):
+        returns = self.returns[:self.count]
+        self.sums = returns.sum(axis=0)
+        self.products = returns.T @ returns
+        self.updates = 0
+
+    def add(self, returns: np.ndarray):
+        if self.count == self.window:
+            oldest = self.returns[self.next]
+            self.sums -= oldest
+            self.products -= np.outer(oldest, oldest)
+        else:
+            self.count += 1
+
+        self.returns[self.next] = returns
+        self.next = (self.next + 1) % self.window
+        self.sums += returns
+        self.products += np.outer(returns, returns)
+
+        self.updates += 1
+        if self.updates >= self.window:
+            self._recalculate()
+
+    def covariance(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.products - np.outer(self.sums, self.sums) / self.count) / (self.count - 1)
+
+    def correlation(self):
+        covariance = self.covariance()
+        std = np.sqrt(np.diag(covariance))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.clip(covariance / np.outer(std, std), -1, 1)
+
+
+def get_window_period(window: int):
+    """
+    Returns the shortest stored period that contains a window of daily returns.
+        Parameters:
+            int window;
+        Returns:
+            str
+    """
+    return next((period for period, bars in WINDOW_PERIODS if bars > window), 'max')
+
+
+def update_rolling_covariance(state: dict, dates: np.ndarray, prices: np.ndarray):
+    """
+    Adds the returns of all bars after the last bar of a cached state.
+        Parameters:
+            dict state: Cached state, see get_holdings_correlation;
+            ndarray dates;
+            ndarray prices;
+        Returns:
+            bool: False if the state can not be updated and needs to be recalculated,
+                e.g. because the last bar changed or a ticker has no price on a new bar.
+    """
+    last = np.searchsorted(dates, state['last_date'])
+    if last == len(dates) or dates[last] != state['last_date']:
+        return False
+    if not np.array_equal(prices[last], state['last_prices'], equal_nan=True):
+        return False
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        new_returns = prices[last + 1:] / prices[last:-1] - 1
+
+    if len(new_returns) >= state['covariance'].window or np.isnan(new_returns).any():
+        return False
+
+    for returns in new_returns:
+        state['covariance'].add(returns)
+
+    state['last_date'] = dates[-1]
+    state['last_prices'] = prices[-1]
+    return True
+
+
+def get_holdings_correlation(tickers: list[str], window: int):
+    """
+    Calculates the covariance and correlation matrix of the daily returns of
+    multiple tickers, over the last bars within the window where all tickers
+    have a return. The state is cached per set of tickers and window and only
+    updated with new bars on later calls.
+        Parameters:
+            List[str] tickers;
+            int window: Number of daily returns;
+        Returns:
+            dict: Tickers, covariance and correlation matrix, the number of returns
+                and the tickers without price data.
+    """
+    dates, prices, price_tickers = get_close_price_matrix(
+        sorted(set(tickers)), get_window_period(window), '1d')
+    missing_prices = [ticker for ticker in tickers if ticker not in price_tickers]
+
+    if len(dates) == 0:
+        return {'tickers': [], 'observations': 0, 'covariance': [], 'correlation': [],
+                'missing_prices': missing_prices}
+
+    cache = get_cache()
+    key = f'{",".join(price_tickers)}:{window}'
+    state = cache.get('correlation', key)
+
+    if state is MISSING or state['last_date'] != dates[-1] or not np.array_equal(
+            state['last_prices'], prices[-1], equal_nan=True):
+        if state is MISSING or not update_rolling_covariance(state, dates, prices):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = prices[1:] / prices[:-1] - 1
+
+            # Only bars where every ticker has a return
+            state = {
+                'covariance': RollingCovariance(returns[~np.isnan(returns).any(axis=1)], window),
+                'last_date': dates[-1],
+                'last_prices': prices[-1]
+            }
+
+        cache.set('correlation', key, state)
+
+    covariance: RollingCovariance = state['covariance']
+
+    return {
+        'tickers': price_tickers,
+        'observations': covariance.count,
+        'covariance': covariance.covariance(),
+        'correlation': covariance.correlation(),
+        'missing_prices': missing_prices
+    }
+
+
+def get_portfolio_correlation(portfolio_id: str, window: int):
+    """
+    Calculates the covariance and correlation matrix of the positions of a
+    portfolio, see get_holdings_correlation.
+        Parameters:
+            str portfolio_id;
+            int window: Number of daily returns;
+        Returns:
+            dict
+    """
+    return get_holdings_correlation(list(get_position_counts(portfolio_id).index), window)
@@ -0,0 +1,104 @@
+import pandas as pd
+
+from src.market_data.etf_data import get_etf_compositions
+from src.portfolio_analysis.stock_analysis import add_classifications
+from src.portfolio_analysis.valuation import (add_market_values,
+                                              get_position_table)
+
+# Quote types whose positions are decomposed into their holdings
+FUND_QUOTE_TYPES = ['ETF', 'MUTUALFUND']
+OTHER_SECTOR = 'Other'
+
+
+def get_fund_exposures(funds: pd.DataFrame, compositions: dict[str, dict]):
+    """
+    Splits the market values of fund positions into the values of their top
+    holdings and sectors. The value of sectors without a weighting is
+    assigned to OTHER_SECTOR, the value of the remaining holdings is left out.
+        Parameters:
+            DataFrame funds: Positions with ticker_symbol and market_value;
+            Dict[str, dict] compositions: Composition of every fund, see get_etf_compositions;
+        Returns:
+            tuple:
+                DataFrame: ticker_symbol and value per fund holding.
+                DataFrame: sector and value per fund sector.
+    """
+    holdings = []
+    sectors = []
+    for ticker, value in zip(funds['ticker_symbol'], funds['market_value']):
+        composition = compositions[ticker]
+
+        holdings += [(holding['symbol'], value * holding['weight'])
+                     for holding in composition['holdings']]
+
+        sector_weights = composition['sector_weights']
+        sectors += [(sector, value * weight) for sector, weight in sector_weights.items()]
+
+        unweighted = 1 - sum(sector_weights.values())
+        if unweighted > 1e-9:
+            sectors.append((OTHER_SECTOR, value * unweighted))
+
+    return (pd.DataFrame(holdings, columns=['ticker_symbol', 'value']),
+            pd.DataFrame(sectors, columns=['sector', 'value']))
+
+
+def get_portfolio_exposure(portfolio_id: str):
+    """
+    Calculates the look-through exposure of a portfolio. Funds are decomposed
+    into their top holdings and sector weights, which are merged with the
+    direct positions, e.g. a stock held directly and through an ETF is one holding.
+    Funds without holding information and other positions (e.g. crypto) are
+    treated as holdings of their own with an unknown sector.
+    Positions without a price are left out, values are not converted between currencies.
+        Parameters:
+            str portfolio_id;
+        Returns:
+            dict: Total value, direct and fund value of every holding, sector weights,
+                the percentage of fund holdings that are not reported, the positions
+                without a price and the funds without holding information.
+    """
+    positions = add_market_values(add_classifications(get_position_table(portfolio_id)))
+
+    missing_prices = positions.loc[positions['market_value'].isna(), 'ticker_symbol'].unique().tolist()
+    positions = positions[positions['market_value'] > 0]
+
+    is_fund = positions['quoteType'].isin(FUND_QUOTE_TYPES)
+    compositions = get_etf_compositions(positions.loc[is_fund, 'ticker_symbol'].unique().tolist())
+    missing_holdings = [ticker for ticker in positions.loc[is_fund, 'ticker_symbol'].unique()
+                        if compositions.get(ticker) is None]
+
+    # Funds without holding information are treated like direct positions
+    is_fund &= ~positions['ticker_symbol'].isin(missing_holdings)
+    direct = positions[~is_fund]
+    fund_holdings, fund_sectors = get_fund_exposures(positions[is_fund], compositions)
+
+    total_value = float(positions['market_value'].sum())
+    if total_value <= 0:
+        return {'total_value': 0.0, 'holdings': {}, 'sector_weights': {}, 'unattributed_percent': None,
+                'missing_prices': missing_prices, 'missing_holdings': missing_holdings}
+
+    holdings = pd.DataFrame({
+        'direct_value': direct.groupby('ticker_symbol')['market_value'].sum(),
+        'fund_value': fund_holdings.groupby('ticker_symbol')['value'].sum()
+    }).fillna(0.0)
+    holdings['value'] = holdings['direct_value'] + holdings['fund_value']
+    holdings['percent'] = (holdings['value'] / total_value * 100).round(2)
+    holdings = holdings.sort_values('value', ascending=False)
+
+    # Only stocks have a sector of their own
+    direct_sectors = direct['sector'].where(direct['quoteType'] == 'EQUITY').fillna(OTHER_SECTOR)
+    sectors = pd.concat([
+        direct['market_value'].groupby(direct_sectors).sum(),
+        fund_sectors.groupby('sector')['value'].sum()
+    ]).groupby(level=0).sum()
+
+    return {
+        'total_value': total_value,
+        'holdings': {ticker: {column: float(row[column])
+                              for column in ['value', 'percent', 'direct_value', 'fund_value']}
+                     for ticker, row in holdings.iterrows()},
+        'sector_weights': (sectors / total_value * 100).round(2).sort_values(ascending=False).to_dict(),
+        'unattributed_percent': round(float(1 - holdings['value'].sum() / total_value) * 100, 2),
+        'missing_prices': missing_prices,
+        'missing_holdings': missing_holdings
+    }
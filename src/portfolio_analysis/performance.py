@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from src.database.setup import remove_session
+from src.market_data.fan_out import fan_out
+from src.market_data.price_data import get_price_history, get_utc_dates
+from src.portfolio_analysis.valuation import get_position_table
+
+
+def fetch_close_prices(ticker: str, period: str, interval: str):
+    """
+    Returns the close prices of a ticker from the price history store.
+    Bars of different exchanges start at local midnight, so the UTC dates are
+    rounded to the nearest day to align the bars of the same trading day.
+        Parameters:
+            str ticker;
+            str period;
+            str interval;
+        Returns:
+            tuple | None: None if the ticker does not exist or has no price data, otherwise:
+                ndarray: datetime64[D] dates.
+                ndarray: Close prices.
+    """
+    try:
+        df = get_price_history(ticker, period, interval)
+    finally:
+        # Runs on the market data thread pool, which outlives the request
+        remove_session()
+
+    if df is None or df.empty:
+        return None
+
+    dates = (get_utc_dates(df) + np.timedelta64(12, 'h')).astype('datetime64[D]')
+    return dates, df['Close'].to_numpy(dtype=np.float64)
+
+
+def align_close_prices(closes: list[tuple[np.ndarray, np.ndarray]]):
+    """
+    Aligns close prices of multiple tickers into one matrix, with one row per
+    date of any ticker and one column per ticker. A ticker without a bar on a
+    date (e.g. on a holiday of its exchange) keeps its last price.
+        Parameters:
+            List[tuple[ndarray, ndarray]] closes: Ascending dates and close prices per ticker;
+        Returns:
+            tuple:
+                ndarray: The ascending dates.
+                ndarray: The close prices, NaN before the first bar of a ticker.
+    """
+    # Days are small integers, so the dates of all tickers are merged with a
+    # lookup table from day to row instead of sorting them
+    days = [dates.astype(np.int64) for dates, _ in closes]
+    first_day = min(d.min() for d in days)
+    is_date = np.zeros(max(d.max() for d in days) - first_day + 1, dtype=bool)
+    for d in days:
+        is_date[d - first_day] = True
+    rows = np.cumsum(is_date) - 1
+
+    matrix = np.full((int(is_date.sum()), len(closes)), np.nan)
+    for column, (d, (_, close)) in enumerate(zip(days, closes)):
+        matrix[rows[d - first_day], column] = close
+
+    dates = (np.flatnonzero(is_date) + first_day).astype('datetime64[D]')
+    return dates, pd.DataFrame(matrix).ffill().to_numpy()
+
+
+def get_position_counts(portfolio_id: str):
+    """
+    Returns the number of shares the portfolio holds of every ticker.
+        Parameters:
+            str portfolio_id;
+        Returns:
+            Series: Counts indexed by ticker symbol.
+    """
+    positions = get_position_table(portfolio_id)
+    return positions.groupby('ticker_symbol', sort=False)['count'].sum()
+
+
+def get_close_price_matrix(tickers: list[str], period: str, interval: str):
+    """
+    Fetches the close prices of multiple tickers concurrently and aligns
+    them, see align_close_prices.
+        Parameters:
+            List[str] tickers;
+            str period;
+            str interval;
+        Returns:
+            tuple:
+                ndarray: The ascending dates.
+                ndarray: The close prices, one column per ticker with price data.
+                List[str]: The tickers of the columns.
+    """
+    fetched = fan_out(lambda ticker: fetch_close_prices(ticker, period, interval), tickers)
+    fetched.raise_if_all_failed()
+
+    closes = {ticker: fetched.results[ticker] for ticker in dict.fromkeys(tickers)
+              if fetched.results.get(ticker) is not None}
+
+    if len(closes) == 0:
+        return np.array([], dtype='datetime64[D]'), np.empty((0, 0)), []
+
+    dates, matrix = align_close_prices(list(closes.values()))
+    return dates, matrix, list(closes)
+
+
+def get_portfolio_performance(portfolio_id: str, period: str, interval: str):
+    """
+    Calculates the value of a portfolio for every bar of a period, based on
+    the current positions. The close prices of all positions are aligned into
+    one matrix, which is multiplied with the position counts at once.
+    Positions are valued from their first bar on, values are not converted
+    between currencies.
+        Parameters:
+            str portfolio_id;
+            str period;
+            str interval;
+        Returns:
+            dict: Dates and values of the portfolio, the change over the period
+                and the tickers without price data.
+    """
+    counts = get_position_counts(portfolio_id)
+
+    dates, matrix, tickers = get_close_price_matrix(list(counts.index), period, interval)
+    missing_prices = [ticker for ticker in counts.index if ticker not in tickers]
+
+    if len(tickers) == 0:
+        return {'dates': [], 'values': [], 'change': None, 'change_percent': None,
+                'missing_prices': missing_prices}
+
+    values = np.nan_to_num(matrix) @ counts[tickers].to_numpy(dtype=np.float64)
+
+    # Dates before the first bar of any position have no value
+    first = int(np.argmax(values > 0)) if values.any() else len(values)
+    dates, values = dates[first:], values[first:]
+
+    change = float(values[-1] - values[0]) if len(values) > 0 else None
+    change_percent = float(change / values[0] * 100) if change is not None else None
+
+    return {
+        'dates': np.datetime_as_string(dates, unit='D').tolist(),
+        'values': values,
+        'change': change,
+        'change_percent': change_percent,
+        'missing_prices': missing_prices
+    }
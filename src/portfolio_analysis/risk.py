@@ -0,0 +1,176 @@
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+
+from src.cache.cache import cached
+from src.config import RISK_FREE_RATE, VAR_CONFIDENCE
+from src.portfolio_analysis.performance import (get_close_price_matrix,
+                                                get_position_counts)
+
+# Number of bars per year of every stored interval, used to annualize
+PERIODS_PER_YEAR = {
+    '1d': 252,
+    '5d': 252 / 5,
+    '1wk': 52,
+    '1mo': 12,
+    '3mo': 4
+}
+
+RISK_METRICS = ['volatility', 'max_drawdown', 'sharpe_ratio', 'sortino_ratio',
+                'beta', 'var_historical', 'var_parametric']
+
+
+def get_portfolio_returns(prices: np.ndarray, counts: np.ndarray):
+    """
+    Calculates the returns of a portfolio with constant position counts.
+    Every return is the average of the position returns, weighted by the
+    position values of the previous bar, so positions without a price yet
+    do not distort the returns.
+        Parameters:
+            ndarray prices: Close prices, one column per position;
+            ndarray counts: Count of every position;
+        Returns:
+            ndarray: The returns, one less than bars.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = prices[1:] / prices[:-1] - 1
+        previous_values = np.where(np.isnan(returns), 0, prices[:-1] * counts)
+
+        return (np.nansum(previous_values * returns, axis=1)
+                / previous_values.sum(axis=1))
+
+
+def get_risk_metrics(returns: np.ndarray, benchmark_returns: np.ndarray | None, periods_per_year: float,
+                     risk_free_rate: float = RISK_FREE_RATE, confidence: float = VAR_CONFIDENCE):
+    """
+    Calculates risk metrics for every column of a return matrix at once.
+    NaN returns (e.g. before the first bar of a ticker) are left out.
+    Volatility, Sharpe and Sortino ratio are annualized, drawdown and VaR are
+    fractions of the value, VaR is the loss of one bar that is not exceeded
+    with the confidence level.
+        Parameters:
+            ndarray returns: One row per bar, one column per return series;
+            ndarray | None benchmark_returns: Returns of the benchmark for the beta, one per bar;
+            float periods_per_year: Number of bars per year;
+            float risk_free_rate: Annual rate;
+            float confidence: Confidence level of the VaR;
+        Returns:
+            Dict[str, ndarray]: Every metric of RISK_METRICS with one value per column.
+    """
+    with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+        # Columns without enough returns result in NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+
+        mean = np.nanmean(returns, axis=0)
+        std = np.nanstd(returns, axis=0, ddof=1)
+
+        volatility = std * np.sqrt(periods_per_year)
+        excess_return = mean * periods_per_year - risk_free_rate
+
+        downside = np.minimum(returns - risk_free_rate / periods_per_year, 0)
+        downside_deviation = np.sqrt(np.nanmean(downside ** 2, axis=0) * periods_per_year)
+
+        levels = np.nancumprod(1 + returns, axis=0)
+        drawdowns = levels / np.maximum.accumulate(levels, axis=0) - 1
+
+        z_score = NormalDist().inv_cdf(1 - confidence)
+
+        metrics = {
+            'volatility': volatility,
+            'max_drawdown': drawdowns.min(axis=0, initial=0),
+            'sharpe_ratio': excess_return / volatility,
+            'sortino_ratio': excess_return / downside_deviation,
+            'beta': np.full(returns.shape[1], np.nan),
+            'var_historical': -np.nanquantile(returns, 1 - confidence, axis=0),
+            'var_parametric': -(mean + z_score * std)
+        }
+
+        if benchmark_returns is not None:
+            # Covariance over the bars where both returns exist
+            valid = ~np.isnan(returns) & ~np.isnan(benchmark_returns)[:, None]
+            n = valid.sum(axis=0)
+            r = np.where(valid, returns, 0)
+            b = np.where(valid, benchmark_returns[:, None], 0)
+            r_deviation = np.where(valid, r - r.sum(axis=0) / n, 0)
+            b_deviation = np.where(valid, b - b.sum(axis=0) / n, 0)
+
+            metrics['beta'] = ((r_deviation * b_deviation).sum(axis=0)
+                               / (b_deviation ** 2).sum(axis=0))
+
+    return metrics
+
+
+def metrics_to_json(metrics: dict[str, np.ndarray], column: int):
+    """
+    Returns the metrics of one column, NaN is converted to None.
+        Parameters:
+            Dict[str, ndarray] metrics;
+            int column;
+        Returns:
+            Dict[str, float | None]
+    """
+    return {name: None if np.isnan(values[column]) else float(values[column])
+            for name, values in metrics.items()}
+
+
+@cached('risk')
+def get_portfolio_risk(portfolio_id: str, version: int, period: str, interval: str, benchmark: str):
+    """
+    Calculates the risk metrics of a portfolio and every position, see get_risk_metrics.
+    The portfolio is treated as holding the current positions during the whole period.
+    The version is part of the cache key, so changes of the portfolio are
+    not served from the cache.
+        Parameters:
+            str portfolio_id;
+            int version: Version of the portfolio;
+            str period;
+            str interval;
+            str benchmark: Ticker of the benchmark for the beta;
+        Returns:
+            dict: Metrics of the portfolio and per ticker, the number of returns
+                and the tickers without price data.
+    """
+    counts = get_position_counts(portfolio_id)
+    empty_metrics = dict.fromkeys(RISK_METRICS)
+
+    if len(counts) == 0:
+        return {'benchmark': benchmark, 'observations': 0, 'portfolio': empty_metrics,
+                'positions': {}, 'missing_prices': []}
+
+    # The benchmark is aligned together with the positions
+    dates, matrix, tickers = get_close_price_matrix(
+        list(counts.index) + [benchmark], period, interval)
+    position_tickers = [ticker for ticker in counts.index if ticker in tickers]
+    missing_prices = [ticker for ticker in counts.index if ticker not in tickers]
+
+    if len(position_tickers) == 0:
+        return {'benchmark': benchmark, 'observations': 0, 'portfolio': empty_metrics,
+                'positions': {}, 'missing_prices': missing_prices}
+
+    prices = matrix[:, [tickers.index(ticker) for ticker in position_tickers]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position_returns = prices[1:] / prices[:-1] - 1
+
+    # First column is the portfolio, followed by the positions
+    returns = np.column_stack([
+        get_portfolio_returns(prices, counts[position_tickers].to_numpy(dtype=np.float64)),
+        position_returns
+    ])
+
+    benchmark_returns = None
+    if benchmark in tickers:
+        benchmark_prices = matrix[:, tickers.index(benchmark)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            benchmark_returns = benchmark_prices[1:] / benchmark_prices[:-1] - 1
+
+    metrics = get_risk_metrics(returns, benchmark_returns, PERIODS_PER_YEAR[interval])
+
+    return {
+        'benchmark': benchmark,
+        'observations': int(np.count_nonzero(~np.isnan(returns[:, 0]))),
+        'portfolio': metrics_to_json(metrics, 0),
+        'positions': {ticker: metrics_to_json(metrics, i + 1)
+                      for i, ticker in enumerate(position_tickers)},
+        'missing_prices': missing_prices
+    }
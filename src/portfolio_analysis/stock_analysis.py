@@ -1,46 +1,99 @@
-from collections import Counter
+import pandas as pd
 
-from src.database.queries import get_ticker_symbols_of_portfolio
-from src.market_data.stock_data import get_stock_classification
+from src.market_data.stock_data import get_stock_classifications
+from src.portfolio_analysis.valuation import (add_market_values,
+                                              get_position_table)
 
+# Values the positions can be weighted by
+DISTRIBUTION_WEIGHTS = ['market_value', 'cost_basis']
+CLASSIFICATION_COLUMNS = ['quoteType', 'country', 'sector', 'trailingPE']
 
-def get_stock_portfolio_distribution(portfolio_id: int):
+
+def add_classifications(positions: pd.DataFrame):
+    """
+    Adds the quote type, country, sector and P/E to positions,
+    the classifications of all tickers are fetched at once.
+        Parameters:
+            DataFrame positions: Positions with ticker_symbol;
+        Returns:
+            DataFrame: The positions with the columns of CLASSIFICATION_COLUMNS, NaN if not available.
+    """
+    classifications = get_stock_classifications(positions['ticker_symbol'].unique().tolist())
+    classification_table = pd.DataFrame.from_dict(
+        {ticker: c for ticker, c in classifications.items() if c is not None},
+        orient='index', columns=CLASSIFICATION_COLUMNS)
+
+    return positions.join(classification_table, on='ticker_symbol')
+
+
+def get_weight_distribution(weights: pd.Series, groups: pd.Series):
+    """
+    Sums up the weights per group in percent. Positions without a group are left out.
+        Parameters:
+            Series weights;
+            Series groups: Group of every position, e.g. the country;
+        Returns:
+            Dict[str, float]: Percentage per group, rounded to two decimals.
+    """
+    known = groups.notna() & (groups != '')
+    totals = weights[known].groupby(groups[known]).sum()
+
+    if totals.sum() <= 0:
+        return {}
+
+    return (totals / totals.sum() * 100).round(2).to_dict()
+
+
+def get_weighted_harmonic_pe(weights: pd.Series, pes: pd.Series):
+    """
+    Calculates the P/E of positions as weighted harmonic mean, which equals
+    the total value divided by the total earnings of the positions.
+    Positions without a positive P/E are left out.
+        Parameters:
+            Series weights;
+            Series pes;
+        Returns:
+            float | None: None if no position has a P/E.
+    """
+    pes = pd.to_numeric(pes, errors='coerce')
+    has_pe = pes > 0
+
+    if not has_pe.any():
+        return None
+
+    return float(weights[has_pe].sum() / (weights[has_pe] / pes[has_pe]).sum())
+
+
+def get_stock_portfolio_distribution(portfolio_id: str, weight_by: str = 'market_value'):
     """
-    Calculates the country and sector distribution of a given portfolio. Also gives back the average P/E
+    Calculates the country and sector distribution of the stocks of a portfolio,
+    weighted by market value or cost basis, and their P/E as weighted harmonic mean.
+    Stocks without a price are left out, if weighted by market value.
+    Values are not converted between currencies.
         Parameters:
-            int portfolio_id;
+            str portfolio_id;
+            str weight_by: One of DISTRIBUTION_WEIGHTS;
         Returns:
-            Tuple: country_weights, sector_weights, average_pe if data is available
-    """
-    tickers = get_ticker_symbols_of_portfolio(portfolio_id)
-
-    countries = []
-    sectors = []
-    trailing_pes = []
-    for ticker in tickers:
-        country, sector, trailing_pe = get_stock_classification(ticker)
-        if country:
-            countries.append(country)
-        if sector:
-            sectors.append(sector)
-        if trailing_pe:
-            trailing_pes.append(trailing_pe)
-
-    sum_of_countries = len(countries)
-    sum_of_sectors = len(sectors)
-    avg_trailing_pe = sum(trailing_pes) / len(trailing_pes)
-
-    country_counts = Counter(countries)
-    sector_counts = Counter(sectors)
-    #  e.g. {'Information Technology': 3, 'Financials': 1}
-
-    country_weights = {country: round(
-        (count / sum_of_countries) * 100, 2) for country, count in country_counts.items()}
-    sector_weights = {sector: round(
-        (count / sum_of_sectors) * 100, 2) for sector, count in sector_counts.items()}
+            dict: country_weights, sector_weights, avg_trailing_pe (None if not available),
+                weight_by and the stocks without a price.
+    """
+    positions = add_classifications(get_position_table(portfolio_id))
+
+    # Only stocks are included in the distribution
+    stocks = positions[positions['quoteType'] == 'EQUITY']
+    if weight_by == 'market_value':
+        stocks = add_market_values(stocks)
+
+    weights = stocks[weight_by]
+    missing_prices = stocks.loc[weights.isna(), 'ticker_symbol'].tolist()
+
+    stocks = stocks[weights > 0]
+    weights = stocks[weight_by]
 
     return {
-        "country_weights": country_weights,
-        "sector_weights": sector_weights,
-        "avg_trailing_pe": avg_trailing_pe
+        'country_weights': get_weight_distribution(weights, stocks['country']),
+        'sector_weights': get_weight_distribution(weights, stocks['sector']),
+        'avg_trailing_pe': get_weighted_harmonic_pe(weights, stocks['trailingPE']),
+        'weight_by': weight_by,
+        'missing_prices': missing_prices if weight_by == 'market_value' else []
     }
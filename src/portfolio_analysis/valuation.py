@@ -0,0 +1,85 @@
+import pandas as pd
+
+from src.database.queries import get_portfolio_positions
+from src.market_data.price_data import get_current_prices
+
+POSITION_COLUMNS = ['id', 'ticker_symbol', 'count', 'buy_price', 'order_fee']
+
+
+def get_position_table(portfolio_id: str):
+    """
+    Loads the positions of a portfolio with one query and calculates their cost basis.
+        Parameters:
+            str portfolio_id;
+        Returns:
+            DataFrame: One row per position with the columns of POSITION_COLUMNS and cost_basis.
+    """
+    positions = pd.DataFrame.from_records(
+        get_portfolio_positions(portfolio_id), columns=POSITION_COLUMNS)
+    positions['id'] = positions['id'].astype(str)
+    positions['order_fee'] = positions['order_fee'].fillna(0.0)
+    positions['cost_basis'] = positions['count'] * positions['buy_price'] + positions['order_fee']
+
+    return positions
+
+
+def add_market_values(positions: pd.DataFrame):
+    """
+    Adds the current price, its currency and the market value to positions,
+    the prices are fetched with one bulk request.
+        Parameters:
+            DataFrame positions: Positions with ticker_symbol and count;
+        Returns:
+            DataFrame: The positions with price, currency and market_value, NaN if no price is available.
+    """
+    prices = get_current_prices(positions['ticker_symbol'].unique().tolist())
+    price_table = pd.DataFrame.from_records(
+        [(ticker, p['price'], p['currency']) for ticker, p in prices.items() if p is not None],
+        columns=['ticker_symbol', 'price', 'currency'], index='ticker_symbol')
+    positions = positions.join(price_table, on='ticker_symbol')
+    positions['price'] = positions['price'].astype(float)
+    positions['market_value'] = positions['count'] * positions['price']
+
+    return positions
+
+
+def get_portfolio_valuation(portfolio_id: str):
+    """
+    Calculates market value, cost basis, unrealized P&L and weight of every
+    position of a portfolio. The positions are loaded with one query, the
+    prices with one bulk request and all values are calculated column-wise.
+    Values are not converted between currencies.
+        Parameters:
+            str portfolio_id;
+        Returns:
+            dict: Portfolio totals and the valuation of every position.
+    """
+    positions = add_market_values(get_position_table(portfolio_id))
+    positions['unrealized_pnl'] = positions['market_value'] - positions['cost_basis']
+    positions['unrealized_pnl_percent'] = positions['unrealized_pnl'] / positions['cost_basis'] * 100
+
+    # Positions without a price are left out of the totals
+    valued = positions['price'].notna()
+    total_market_value = positions.loc[valued, 'market_value'].sum()
+    total_cost_basis = positions.loc[valued, 'cost_basis'].sum()
+    total_unrealized_pnl = total_market_value - total_cost_basis
+
+    if total_market_value > 0:
+        positions['weight'] = positions['market_value'] / total_market_value * 100
+    else:
+        positions['weight'] = float('nan')
+
+    if total_cost_basis > 0:
+        total_unrealized_pnl_percent = float(total_unrealized_pnl / total_cost_basis * 100)
+    else:
+        total_unrealized_pnl_percent = None
+
+    return {
+        'total_market_value': float(total_market_value),
+        'total_cost_basis': float(total_cost_basis),
+        'total_unrealized_pnl': float(total_unrealized_pnl),
+        'total_unrealized_pnl_percent': total_unrealized_pnl_percent,
+        'missing_prices': positions.loc[~valued, 'ticker_symbol'].tolist(),
+        # NaN is not valid JSON, so missing values are converted to None
+        'positions': positions.astype(object).where(positions.notna(), None).to_dict(orient='records')
+    }
@@ -0,0 +1,120 @@
+import gzip
+import json
+
+import brotli
+import pytest
+import zstandard
+from flask import Flask, Response
+
+from src.api.utils.compression import compress_response
+from src.api.utils.decorators import conditional_get
+from src.api.utils.http_cache import (generate_not_modified_response,
+                                      is_not_modified)
+from src.api.utils.responses import generate_success_response
+from src.config import COMPRESSION_MIN_SIZE
+
+DECOMPRESSORS = {
+    'gzip': gzip.decompress,
+    'br': brotli.decompress,
+    'zstd': lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)
+}
+
+
+@pytest.fixture(scope='function')
+def app():
+    app = Flask(__name__)
+    app.after_request(compress_response)
+
+    @app.route('/large')
+    @conditional_get(max_age=60)
+    def get_large():
+        return generate_success_response(['value'] * COMPRESSION_MIN_SIZE)
+
+    @app.route('/versioned')
+    @conditional_get(private=True)
+    def get_versioned():
+        # Checks the ETag before generating the response, like versioned resources
+        if is_not_modified('version-1'):
+            return generate_not_modified_response('version-1')
+
+        response, status = generate_success_response(['value'] * COMPRESSION_MIN_SIZE)
+        response.set_etag('version-1')
+        return response, status
+
+    @app.route('/small')
+    def get_small():
+        return generate_success_response('value')
+
+    @app.route('/stream')
+    def get_stream():
+        return Response((json.dumps({'bar': i}) + '\n' for i in range(100)),
+                        mimetype='application/x-ndjson')
+
+    return app
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br', 'zstd'])
+def test_compression(app: Flask, encoding: str):
+    client = app.test_client()
+
+    response = client.get('/large', headers={'Accept-Encoding': encoding})
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.headers['ETag'].startswith('W/')
+
+    data = DECOMPRESSORS[encoding](response.get_data())
+    assert json.loads(data)['response'] == ['value'] * COMPRESSION_MIN_SIZE
+
+    # The weak ETag still matches, the 304 has the same validator and Vary header
+    etag = response.headers['ETag']
+    response = client.get('/large', headers={'Accept-Encoding': encoding,
+                                              'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert 'Content-Type' not in response.headers
+
+    response = client.get('/stream', headers={'Accept-Encoding': encoding})
+    assert response.headers['Content-Encoding'] == encoding
+
+    lines = DECOMPRESSORS[encoding](response.get_data()).decode().splitlines()
+    assert [json.loads(line)['bar'] for line in lines] == list(range(100))
+
+
+def test_compression_skipped(app: Flask):
+    client = app.test_client()
+
+    # Small responses are not worth compressing
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.json['response'] == 'value'
+
+    # Encodings the client does not accept are not used
+    response = client.get('/large', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert not response.headers['ETag'].startswith('W/')
+
+    # Preferences of the client are respected
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip;q=1.0, br;q=0.5'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+def test_compression_not_modified(app: Flask):
+    client = app.test_client()
+
+    response = client.get('/versioned', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == 'W/"version-1"'
+
+    # The 304 is generated before the response body, but gets the same headers
+    response = client.get('/versioned', headers={'Accept-Encoding': 'gzip',
+                                                 'If-None-Match': 'W/"version-1"'})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == 'W/"version-1"'
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+    # Without a negotiated encoding the ETag stays strong
+    response = client.get('/versioned', headers={'Accept-Encoding': 'identity',
+                                                 'If-None-Match': '"version-1"'})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == '"version-1"'
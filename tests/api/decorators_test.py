@@ -0,0 +1,21 @@
+import pytest
+
+from src.api.utils.decorators import jwt_required, validate_portfolio_owner
+
+
+def test_decorator_signature_validation():
+    # Missing parameters are reported when the route is defined
+    with pytest.raises(TypeError):
+        @jwt_required
+        def get_data():
+            pass
+
+    with pytest.raises(TypeError):
+        @validate_portfolio_owner
+        def get_portfolio(user_id: str):
+            pass
+
+    @jwt_required
+    @validate_portfolio_owner
+    def get_portfolio(user_id: str, portfolio):
+        pass
@@ -0,0 +1,80 @@
+import pytest
+from flask import Flask
+
+from src.api.utils.decorators import conditional_get
+from src.api.utils.responses import (generate_not_found_response,
+                                     generate_success_response)
+
+
+@pytest.fixture(scope='function')
+def app():
+    app = Flask(__name__)
+    data = {'value': 1}
+
+    @app.route('/data', methods=['GET', 'POST'])
+    @conditional_get(max_age=60)
+    def get_data():
+        return generate_success_response(data)
+
+    @app.route('/negotiated')
+    @conditional_get(max_age=60, vary=['Accept'])
+    def get_negotiated():
+        return generate_success_response(data)
+
+    @app.route('/missing')
+    @conditional_get(max_age=60)
+    def get_missing():
+        return generate_not_found_response('Not found')
+
+    app.config['data'] = data
+    return app
+
+
+def test_conditional_get(app: Flask):
+    client = app.test_client()
+
+    response = client.get('/data')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, max-age=60'
+
+    response = client.get('/data', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.headers['Cache-Control'] == 'public, max-age=60'
+
+    # The ETag changes with the content
+    app.config['data']['value'] = 2
+    response = client.get('/data', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['response'] == {'value': 2}
+    assert response.headers['ETag'] != etag
+
+
+def test_conditional_get_vary(app: Flask):
+    client = app.test_client()
+
+    response = client.get('/negotiated')
+    assert response.status_code == 200
+    assert response.headers['Vary'] == 'Accept'
+
+    # Shared caches need the header on revalidations as well
+    response = client.get('/negotiated', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+    assert response.headers['Vary'] == 'Accept'
+
+    response = client.get('/data')
+    assert 'Vary' not in response.headers
+
+
+def test_conditional_get_not_cacheable(app: Flask):
+    client = app.test_client()
+
+    response = client.get('/missing')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+    assert 'Cache-Control' not in response.headers
+
+    response = client.post('/data')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
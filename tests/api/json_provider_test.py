@@ -0,0 +1,61 @@
+import datetime
+import json
+import uuid
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from src.api.utils.json_provider import FastJSONProvider
+from src.api.utils.responses import generate_raw_success_response
+
+
+@pytest.fixture(scope='function')
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def test_json_provider_types(app: Flask):
+    data = {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'date': datetime.datetime(2024, 1, 2, 3, 4, 5),
+        'nan': float('nan'),
+        'numpy': np.float64(1.5),
+        'array': np.array([1.0, float('nan')]),
+        'strings': np.array(['a', 'b']),
+        1: 'non string key'
+    }
+
+    assert json.loads(app.json.dumps(data)) == {
+        'id': '12345678-1234-5678-1234-567812345678',
+        'date': '2024-01-02T03:04:05',
+        'nan': None,
+        'numpy': 1.5,
+        'array': [1.0, None],
+        'strings': ['a', 'b'],
+        '1': 'non string key'
+    }
+
+    # Values orjson cannot encode are encoded by the default provider
+    assert json.loads(app.json.dumps({'big': 2 ** 70})) == {'big': 2 ** 70}
+
+    assert app.json.loads('{"a": [1, 2.5, null]}') == {'a': [1, 2.5, None]}
+
+    with pytest.raises(ValueError):
+        app.json.loads('abc')
+
+
+def test_json_provider_response(app: Flask):
+    with app.app_context():
+        response = app.json.response({'b': 1, 'a': 2})
+
+        assert response.is_json
+        assert response.get_data() == b'{"a":2,"b":1}'
+
+        response, status = generate_raw_success_response('[{"Close":1.5}]')
+
+        assert status == 200
+        assert response.is_json
+        assert response.json == {'success': True, 'response': [{'Close': 1.5}]}
@@ -1,6 +1,7 @@
 import pytest
 from flask.testing import FlaskClient
 
+from src.config import MAX_BULK_TICKERS
 from src.constants.errors import ApiErrors
 
 
@@ -139,6 +140,14 @@ def get_test_asset_price_data():
          ApiErrors.invalid_query_param('period')),
         ('AAPL', '1y', '1day', False, 400,
          ApiErrors.invalid_query_param('interval')),
+        ('AAPL', '1y', '1d&format=rows', False, 400,
+         ApiErrors.invalid_query_param('format')),
+        ('AAPL', '1y', '1d&points=2', False, 400,
+         ApiErrors.invalid_query_param('points')),
+        ('AAPL', '1y', '1d&points=abc', False, 400,
+         ApiErrors.invalid_query_param('points')),
+        ('AAPL', '1y', '1d&resample=2wk', False, 400,
+         ApiErrors.invalid_query_param('resample')),
         ('AAPL', '1y', '1m', False, 400, 'AAPL: 1m data not available for'),
         ('TESTTICKER123', '1y', '1d', False,
          404, ApiErrors.Assets.ticker_not_found),
@@ -177,3 +186,47 @@ def test_assets_price_data(
     else:
         assert not response.json['success']
         assert message in response.json['message']
+
+
+def get_test_current_prices_invalid():
+    """
+    Helper function that returns a list of test data.
+        Parameters:
+            -
+        Returns:
+            List[Tuple]: A list of test data.
+    """
+    return [
+        ('GET', None, ApiErrors.missing_query_param('tickers')),
+        ('GET', ' , ', ApiErrors.field_is_empty('tickers')),
+        ('GET', ','.join(['AAPL'] * (MAX_BULK_TICKERS + 1)),
+         ApiErrors.Assets.too_many_tickers(MAX_BULK_TICKERS)),
+        ('POST', 'AAPL', ApiErrors.field_wrong_type('tickers', 'list of strings')),
+        ('POST', ['AAPL', 1], ApiErrors.field_wrong_type('tickers', 'list of strings')),
+        ('POST', [], ApiErrors.field_is_empty('tickers')),
+    ]
+
+
+@pytest.mark.parametrize('method,tickers,message', get_test_current_prices_invalid())
+def test_current_prices_invalid(test_client: FlaskClient, method: str, tickers: str | list, message: str):
+    """
+    Parametrized test for invalid requests to the bulk current prices endpoint.
+        Parameters:
+            FlaskClient test_client;
+            str method;
+            str | list tickers;
+            str message;
+        Returns:
+            -
+    """
+    if method == 'GET':
+        path = '/assets/prices' if tickers is None else f'/assets/prices?tickers={tickers}'
+        response = test_client.get(path)
+    else:
+        response = test_client.post('/assets/prices', json={'tickers': tickers})
+
+    assert response.status_code == 400
+    assert response.is_json
+
+    assert not response.json['success']
+    assert response.json['message'] == message
@@ -17,7 +17,8 @@ def get_all_post_urls_with_json():
     return [
         ('POST', '/user/login', False),
         ('POST', '/user/register', False),
-        ('POST', '/user/portfolios/create', True)
+        ('POST', '/user/portfolios/create', True),
+        ('POST', '/assets/prices', False)
     ]
 
 
@@ -1,10 +1,18 @@
+import numpy as np
 import pytest
 from flask.testing import FlaskClient
 
+from src.cache.cache import Cache
 from src.constants.errors import ApiErrors
 from src.constants.messages import ApiMessages
+from src.portfolio_analysis import exposure, performance
 from tests.api.routes.helper_requests import (create_portfolio, get_portfolio,
                                               login_user)
+from tests.database.helper_queries import (count_queries,
+                                           generate_random_string)
+from tests.market_data.conftest import memory_cache
+from tests.portfolio_analysis.conftest import analysis_portfolio_factory
+from tests.portfolio_analysis.performance_test import create_price_history
 
 
 def get_test_portfolios_create():
@@ -366,3 +374,298 @@ def test_add_portfolio_element(test_client: FlaskClient,
     else:
         assert not response.json['success']
         assert response.json['message'] == message
+
+
+def test_get_user_portfolio_conditional(test_client: FlaskClient):
+    """
+    Test to the portfolio endpoints for correct ETag and 304 handling.
+        Parameters:
+            FlaskClient test_client;
+        Returns:
+            -
+    """
+    auth_token = login_user(test_client, 'alex@example.com', 'Password123!')
+    assert auth_token is not None
+    headers = {'Authorization': 'Bearer ' + auth_token}
+
+    portfolio_id = get_portfolio(test_client, auth_token, 'Conditional')
+    assert portfolio_id is not None
+
+    for path in [f'/user/portfolios/{portfolio_id}', '/user/portfolios']:
+        response = test_client.get(path, headers=headers)
+        etag = response.headers['ETag']
+
+        assert response.status_code == 200
+        assert 'private' in response.headers['Cache-Control']
+
+        # The client already has the current version, only the versions are loaded
+        with count_queries() as statements:
+            response = test_client.get(path, headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert len(statements) == 1
+        assert response.headers['ETag'] == etag
+        assert response.get_data() == b''
+
+        # Every change of the portfolio creates a new version
+        response = test_client.put(f'/user/portfolios/{portfolio_id}',
+                                   json={'name': f'Conditional {path.count("/")}'},
+                                   headers=headers)
+        assert response.status_code == 200
+
+        response = test_client.get(path, headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    # Other users do not get a 304 for foreign portfolios
+    other_token = login_user(test_client, 'john.doe@example.com', 'Password123!')
+    response = test_client.get(f'/user/portfolios/{portfolio_id}',
+                               headers={'Authorization': 'Bearer ' + other_token,
+                                        'If-None-Match': etag})
+    assert response.status_code == 404
+
+
+ANALYSIS_POSITIONS = [('TSTA', 10.0, 8.0), ('TSTB', 5.0, 20.0), ('TSTETF', 4.0, 40.0)]
+
+ANALYSIS_CLASSIFICATIONS = {
+    'TSTA': {'quoteType': 'EQUITY', 'country': 'United States',
+             'sector': 'Technology', 'trailingPE': 20.0},
+    'TSTB': {'quoteType': 'EQUITY', 'country': 'Germany',
+             'sector': 'Healthcare', 'trailingPE': 10.0},
+    'TSTETF': {'quoteType': 'ETF', 'country': None, 'sector': None, 'trailingPE': None}
+}
+
+ANALYSIS_COMPOSITIONS = {
+    'TSTETF': {
+        'holdings': [{'symbol': 'TSTA', 'name': 'Test A', 'weight': 0.5}],
+        'sector_weights': {'Technology': 0.6, 'Healthcare': 0.4}
+    }
+}
+
+ANALYSIS_PRICES = {'TSTA': 10.0, 'TSTB': 20.0, 'TSTETF': 50.0}
+
+ANALYSIS_DATES = ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+
+ANALYSIS_CLOSES = {
+    'TSTA': [8.0, 10.0, 9.0, 10.0],
+    'TSTB': [20.0, 18.0, 22.0, 20.0],
+    'TSTETF': [40.0, 44.0, 48.0, 50.0],
+    '^GSPC': [100.0, 102.0, 101.0, 103.0]
+}
+
+
+@pytest.fixture(scope='function')
+def analysis_portfolio(test_client: FlaskClient, memory_cache: Cache, analysis_portfolio_factory, monkeypatch):
+    """
+    Pytest Fixture that creates a portfolio with two stocks and an ETF,
+    market data is not fetched from yahoo finance.
+        Parameters:
+            FlaskClient test_client;
+            Cache memory_cache;
+            function analysis_portfolio_factory;
+            MonkeyPatch monkeypatch;
+        Returns:
+            tuple:
+                str: The portfolio ID.
+                dict: The request headers with the auth token.
+    """
+    monkeypatch.setattr(performance, 'get_price_history', lambda ticker, period, interval:
+                        create_price_history(ANALYSIS_DATES, 'America/New_York', ANALYSIS_CLOSES[ticker]))
+    monkeypatch.setattr(exposure, 'get_etf_compositions',
+                        lambda tickers: {t: ANALYSIS_COMPOSITIONS[t] for t in tickers})
+
+    auth_token = login_user(test_client, 'alex@example.com', 'Password123!')
+    assert auth_token is not None
+
+    # Market values: TSTA 100, TSTB 100, TSTETF 200
+    portfolio_id = create_portfolio(test_client, auth_token, generate_random_string())
+    analysis_portfolio_factory(ANALYSIS_POSITIONS, ANALYSIS_CLASSIFICATIONS, ANALYSIS_PRICES, portfolio_id)
+
+    return portfolio_id, {'Authorization': 'Bearer ' + auth_token}
+
+
+def get_portfolio_analysis(test_client: FlaskClient, analysis_portfolio: tuple[str, dict], endpoint: str):
+    """
+    Helper function that requests an analysis endpoint of a portfolio.
+        Parameters:
+            FlaskClient test_client;
+            tuple analysis_portfolio: The portfolio ID and request headers;
+            str endpoint;
+        Returns:
+            dict: The response of the endpoint.
+    """
+    portfolio_id, headers = analysis_portfolio
+    response = test_client.get(f'/user/portfolios/{portfolio_id}/{endpoint}', headers=headers)
+
+    assert response.status_code == 200
+    assert response.json['success']
+    return response.json['response']
+
+
+@pytest.mark.parametrize('endpoint,expected', [
+    ('valuation', {'total_market_value': 0.0, 'positions': []}),
+    ('performance', {'dates': [], 'values': []}),
+    ('risk', {'observations': 0, 'benchmark': '^GSPC'}),
+    ('correlation', {'tickers': [], 'correlation': []}),
+    ('exposure', {'total_value': 0.0, 'holdings': {}})
+])
+def test_get_user_portfolio_analysis_empty(test_client: FlaskClient, endpoint: str, expected: dict):
+    """
+    Test to the portfolio analysis endpoints for correct behavior with an empty portfolio.
+        Parameters:
+            FlaskClient test_client;
+            str endpoint;
+            dict expected: Expected values of the response;
+        Returns:
+            -
+    """
+    auth_token = login_user(test_client, 'alex@example.com', 'Password123!')
+    assert auth_token is not None
+
+    portfolio_id = get_portfolio(test_client, auth_token, 'Empty Analysis')
+    assert portfolio_id is not None
+
+    response = test_client.get(f'/user/portfolios/{portfolio_id}/{endpoint}',
+                               headers={'Authorization': 'Bearer ' + auth_token})
+
+    assert response.status_code == 200
+    assert response.json['success']
+    for key, value in expected.items():
+        assert response.json['response'][key] == value
+
+
+@pytest.mark.parametrize('endpoint,param', [
+    ('analysis?weight_by=count', 'weight_by'),
+    ('performance?period=1d', 'period'),
+    ('performance?interval=1m', 'interval'),
+    ('risk?interval=1m', 'interval'),
+    ('correlation?window=2', 'window'),
+    ('correlation?window=abc', 'window'),
+    ('correlation?window=100000', 'window')
+])
+def test_get_user_portfolio_analysis_invalid_params(test_client: FlaskClient, endpoint: str, param: str):
+    """
+    Test to the portfolio analysis endpoints for correct behavior with invalid query params.
+        Parameters:
+            FlaskClient test_client;
+            str endpoint: Endpoint with the query params;
+            str param: The invalid query param;
+        Returns:
+            -
+    """
+    auth_token = login_user(test_client, 'alex@example.com', 'Password123!')
+    assert auth_token is not None
+
+    portfolio_id = get_portfolio(test_client, auth_token, 'Empty Analysis')
+    assert portfolio_id is not None
+
+    response = test_client.get(f'/user/portfolios/{portfolio_id}/{endpoint}',
+                               headers={'Authorization': 'Bearer ' + auth_token})
+
+    assert response.status_code == 400
+    assert response.json['message'] == ApiErrors.invalid_query_param(param)
+
+
+def test_get_user_portfolio_valuation(test_client: FlaskClient, analysis_portfolio: tuple[str, dict]):
+    """
+    Test to the portfolio valuation endpoint for correct values of a portfolio with positions.
+        Parameters:
+            FlaskClient test_client;
+            tuple analysis_portfolio;
+        Returns:
+            -
+    """
+    valuation_json = get_portfolio_analysis(test_client, analysis_portfolio, 'valuation')
+
+    assert valuation_json['total_market_value'] == 400.0
+    assert valuation_json['total_cost_basis'] == 340.0
+    assert valuation_json['total_unrealized_pnl'] == 60.0
+    assert len(valuation_json['positions']) == 3
+
+
+def test_get_user_portfolio_performance(test_client: FlaskClient, analysis_portfolio: tuple[str, dict]):
+    """
+    Test to the portfolio performance endpoint for correct values of a portfolio with positions.
+        Parameters:
+            FlaskClient test_client;
+            tuple analysis_portfolio;
+        Returns:
+            -
+    """
+    performance_json = get_portfolio_analysis(test_client, analysis_portfolio, 'performance')
+
+    # Values of the constant positions on every day
+    assert performance_json['dates'] == ANALYSIS_DATES
+    assert performance_json['values'] == [340.0, 366.0, 392.0, 400.0]
+    assert performance_json['change_percent'] == pytest.approx(60 / 340 * 100)
+
+
+def test_get_user_portfolio_risk(test_client: FlaskClient, analysis_portfolio: tuple[str, dict]):
+    """
+    Test to the portfolio risk endpoint for correct values of a portfolio with positions.
+        Parameters:
+            FlaskClient test_client;
+            tuple analysis_portfolio;
+        Returns:
+            -
+    """
+    risk_json = get_portfolio_analysis(test_client, analysis_portfolio, 'risk')
+
+    values = [340.0, 366.0, 392.0, 400.0]
+    returns = np.diff(values) / values[:-1]
+    assert risk_json['observations'] == 3
+    assert risk_json['portfolio']['volatility'] == pytest.approx(np.std(returns, ddof=1) * np.sqrt(252))
+    assert set(risk_json['positions']) == {'TSTA', 'TSTB', 'TSTETF'}
+
+
+def test_get_user_portfolio_correlation(test_client: FlaskClient, analysis_portfolio: tuple[str, dict]):
+    """
+    Test to the portfolio correlation endpoint for correct values of a portfolio with positions.
+        Parameters:
+            FlaskClient test_client;
+            tuple analysis_portfolio;
+        Returns:
+            -
+    """
+    correlation_json = get_portfolio_analysis(test_client, analysis_portfolio, 'correlation')
+
+    closes = np.array([ANALYSIS_CLOSES[t] for t in ['TSTA', 'TSTB', 'TSTETF']]).T
+    assert correlation_json['tickers'] == ['TSTA', 'TSTB', 'TSTETF']
+    assert correlation_json['observations'] == 3
+    np.testing.assert_allclose(correlation_json['correlation'],
+                               np.corrcoef(np.diff(closes, axis=0) / closes[:-1], rowvar=False))
+
+
+def test_get_user_portfolio_stock_analysis(test_client: FlaskClient, analysis_portfolio: tuple[str, dict]):
+    """
+    Test to the portfolio analysis endpoint for correct values of a portfolio with positions.
+        Parameters:
+            FlaskClient test_client;
+            tuple analysis_portfolio;
+        Returns:
+            -
+    """
+    analysis_json = get_portfolio_analysis(test_client, analysis_portfolio, 'analysis')
+
+    # The ETF is not a stock
+    assert analysis_json['sector_weights'] == {'Technology': 50.0, 'Healthcare': 50.0}
+    assert analysis_json['country_weights'] == {'United States': 50.0, 'Germany': 50.0}
+
+
+def test_get_user_portfolio_exposure(test_client: FlaskClient, analysis_portfolio: tuple[str, dict]):
+    """
+    Test to the portfolio exposure endpoint for correct values of a portfolio with positions.
+        Parameters:
+            FlaskClient test_client;
+            tuple analysis_portfolio;
+        Returns:
+            -
+    """
+    exposure_json = get_portfolio_analysis(test_client, analysis_portfolio, 'exposure')
+
+    # Half of the ETF is TSTA, the rest of its holdings is not reported
+    assert exposure_json['total_value'] == 400.0
+    assert exposure_json['holdings']['TSTA'] == {'value': 200.0, 'percent': 50.0,
+                                                 'direct_value': 100.0, 'fund_value': 100.0}
+    assert exposure_json['holdings']['TSTB']['percent'] == 25.0
+    assert exposure_json['unattributed_percent'] == 25.0
+    assert exposure_json['sector_weights'] == {'Technology': 55.0, 'Healthcare': 45.0}
@@ -1,9 +1,14 @@
 import pytest
 from flask.testing import FlaskClient
 
+from src.api.utils.jwt_auth import decode_auth_token
+from src.cache.cache import MISSING, Cache
 from src.constants.errors import ApiErrors
 from src.constants.messages import ApiMessages
+from src.database.queries import delete_user_by_id
 from tests.api.routes.helper_requests import login_user
+from tests.database.helper_queries import count_queries
+from tests.market_data.conftest import memory_cache
 
 
 def get_test_users_register():
@@ -206,3 +211,52 @@ def test_user_refresh(test_client: FlaskClient, email: str, password: str):
 
     assert response.json['response']['message'] == ApiMessages.User.session_refresh_success
     assert response.json['response']['auth_token'] is not None
+
+
+def test_user_principal_cache(test_client: FlaskClient, memory_cache: Cache):
+    """
+    Test that the existence of an authenticated user is only queried once.
+        Parameters:
+            FlaskClient test_client;
+            Cache memory_cache;
+        Returns:
+            -
+    """
+    auth_token = login_user(test_client, 'cached.user@example.com', 'Password123!')
+    headers = {'Authorization': 'Bearer ' + auth_token}
+
+    with count_queries() as first_statements:
+        response = test_client.get('/user/refresh', headers=headers)
+    assert response.status_code == 200
+
+    with count_queries() as cached_statements:
+        response = test_client.get('/user/refresh', headers=headers)
+    assert response.status_code == 200
+    assert len(cached_statements) == len(first_statements) - 1
+
+
+def test_user_principal_cache_deleted_user(test_client: FlaskClient, memory_cache: Cache):
+    """
+    Test that the auth token of a deleted user is rejected immediately,
+    even though the user is still cached as authenticated.
+        Parameters:
+            FlaskClient test_client;
+            Cache memory_cache;
+        Returns:
+            -
+    """
+    auth_token = login_user(test_client, 'deleted.user@example.com', 'Password123!')
+    headers = {'Authorization': 'Bearer ' + auth_token}
+
+    response = test_client.get('/user/refresh', headers=headers)
+    assert response.status_code == 200
+
+    _, user_id = decode_auth_token(auth_token)
+    assert memory_cache.get('principal', user_id) is True
+
+    assert delete_user_by_id(user_id)
+    assert memory_cache.get('principal', user_id) is MISSING
+
+    response = test_client.get('/user/refresh', headers=headers)
+    assert response.status_code == 401
+    assert response.json['message'] == ApiErrors.JwtAuth.user_id_not_exist
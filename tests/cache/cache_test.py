@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from src.cache.backends import MemoryCacheBackend, SQLiteCacheBackend
+from src.cache.cache import MISSING, Cache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCacheBackend(max_bytes=100)
+    return SQLiteCacheBackend(str(tmp_path / 'cache.sqlite3'), max_bytes=100)
+
+
+def test_cache_get_set(backend):
+    cache = Cache(backend, {'quote_info': 60})
+
+    assert cache.get('quote_info', 'AAPL') is MISSING
+
+    cache.set('quote_info', 'AAPL', {'symbol': 'AAPL'})
+    cache.set('quote_info', 'TEST123', None)
+
+    assert cache.get('quote_info', 'AAPL') == {'symbol': 'AAPL'}
+    assert cache.get('quote_info', 'TEST123') is None
+
+    # Every caller gets its own copy of the cached value
+    cache.get('quote_info', 'AAPL')['etfData'] = {}
+    assert cache.get('quote_info', 'AAPL') == {'symbol': 'AAPL'}
+
+    assert cache.stats() == {'quote_info': {'hits': 4, 'misses': 1}}
+
+    cache.delete('quote_info', 'AAPL')
+    assert cache.get('quote_info', 'AAPL') is MISSING
+
+
+def test_cache_ttl(backend):
+    cache = Cache(backend, {'quote_info': 0.05})
+
+    cache.set('quote_info', 'AAPL', 1.0)
+    cache.set('quote_info', 'MSFT', 2.0, ttl=60)
+    assert cache.get('quote_info', 'AAPL') == 1.0
+
+    time.sleep(0.1)
+
+    assert cache.get('quote_info', 'AAPL') is MISSING
+    assert cache.get('quote_info', 'MSFT') == 2.0
+
+
+def test_cache_lru_eviction(backend):
+    cache = Cache(backend, {'search': 60})
+
+    # Each entry is roughly 40 bytes, so only two of them fit into 100 bytes
+    cache.set('search', 'a', 'a' * 20)
+    cache.set('search', 'b', 'b' * 20)
+    time.sleep(0.01)
+    assert cache.get('search', 'a') == 'a' * 20
+
+    cache.set('search', 'c', 'c' * 20)
+
+    assert cache.get('search', 'b') is MISSING
+    assert cache.get('search', 'a') == 'a' * 20
+    assert cache.get('search', 'c') == 'c' * 20
+
+    # Values bigger than the cache are not stored at all
+    cache.set('search', 'd', 'd' * 200)
+    assert cache.get('search', 'd') is MISSING
+    assert cache.get('search', 'c') == 'c' * 20
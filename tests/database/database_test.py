@@ -1,8 +1,13 @@
+import threading
+
 import pytest
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm.session import Session
 
 from src.database.models import *
 from src.database.queries import *
+from src.database.setup import remove_session, upgrade_db_schema
+from src.database.setup import session as scoped_session_registry
 from tests.database.conftest import session
 from tests.database.helper_queries import *
 
@@ -41,6 +46,17 @@ def test_get_user_by_id(session: Session):
     assert user.id == new_user.id
 
 
+def test_delete_user_by_id(session: Session):
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+
+    assert delete_user_by_id(new_user.id)
+    assert session.query(User).filter_by(id=new_user.id).first() is None
+    assert session.query(Portfolio).filter_by(id=new_portfolio.id).first() is None
+
+    assert not delete_user_by_id(new_user.id)
+
+
 def test_portfolio_insertion(session: Session):
     new_user = generate_new_user()
     new_portfolio = generate_new_portfolio(new_user.id)
@@ -151,6 +167,144 @@ def test_get_portfolio_by_id(session: Session):
     assert fetched_portfolio_by_id.name == new_portfolio.name
 
 
+def generate_portfolio_tree(user_id: str, portfolio_count: int, element_count: int):
+    asset_type = generate_new_asset_type()
+    assets = [generate_new_asset(asset_type.id) for _ in range(element_count)]
+
+    for _ in range(portfolio_count):
+        portfolio = generate_new_portfolio(user_id)
+        for asset in assets:
+            generate_new_portfolio_element(portfolio.id, asset.id)
+
+
+@pytest.mark.parametrize('portfolio_count,element_count', [(1, 1), (5, 10)])
+def test_get_portfolios_by_user_id_load_profile(session: Session, portfolio_count: int, element_count: int):
+    new_user = generate_new_user()
+    generate_portfolio_tree(new_user.id, portfolio_count, element_count)
+
+    # Start with an empty session, like a new request
+    remove_session()
+
+    with count_queries() as statements:
+        portfolios = get_portfolios_by_user_id(
+            new_user.id, load_profile='portfolio_tree')
+        portfolios_json = [p.to_json() for p in portfolios]
+
+    # Portfolios and the whole element tree, independent of their number
+    assert len(statements) == 2
+    assert len(portfolios_json) == portfolio_count
+    assert all(len(p['elements']) == element_count for p in portfolios_json)
+    assert all(e['asset']['asset_type'] is not None
+               for p in portfolios_json for e in p['elements'])
+
+    remove_session()
+
+    # Without load profile every relationship is loaded separately
+    with count_queries() as statements:
+        portfolios = get_portfolios_by_user_id(new_user.id)
+        assert [p.to_json() for p in portfolios] == portfolios_json
+
+    assert len(statements) > 2
+
+
+def test_get_portfolio_by_id_load_profile(session: Session):
+    new_user = generate_new_user()
+    generate_portfolio_tree(new_user.id, 1, 10)
+    portfolio_id = get_portfolios_by_user_id(new_user.id)[0].id
+
+    remove_session()
+
+    with count_queries() as statements:
+        portfolio = get_portfolio_by_id(
+            portfolio_id, load_profile='portfolio_tree')
+        portfolio_json = portfolio.to_json()
+
+    assert len(statements) == 2
+    assert len(portfolio_json['elements']) == 10
+
+    with pytest.raises(ValueError):
+        get_portfolio_by_id(portfolio_id, load_profile='unknown')
+
+
+def test_get_portfolio_owned_by_user(session: Session):
+    new_user = generate_new_user()
+    other_user = generate_new_user()
+    generate_portfolio_tree(new_user.id, 1, 3)
+    portfolio_id = get_portfolios_by_user_id(new_user.id)[0].id
+
+    assert get_portfolio_owned_by_user(portfolio_id, other_user.id) is None
+
+    remove_session()
+
+    # Ownership check and the whole element tree
+    with count_queries() as statements:
+        portfolio = get_portfolio_owned_by_user(
+            portfolio_id, str(new_user.id), load_profile='portfolio_tree')
+        portfolio_json = portfolio.to_json()
+
+    assert len(statements) == 2
+    assert len(portfolio_json['elements']) == 3
+
+
+def test_load_portfolio_elements(session: Session):
+    new_user = generate_new_user()
+    generate_portfolio_tree(new_user.id, 1, 3)
+    portfolio_id = get_portfolios_by_user_id(new_user.id)[0].id
+
+    remove_session()
+
+    portfolio = get_portfolio_owned_by_user(portfolio_id, str(new_user.id))
+
+    # Only the element tree is loaded, the portfolio is not selected again
+    with count_queries() as statements:
+        assert load_portfolio_elements(portfolio) is portfolio
+        portfolio_json = portfolio.to_json()
+
+    assert len(statements) == 1
+    assert 'FROM portfolios' not in statements[0]
+    assert len(portfolio_json['elements']) == 3
+
+
+def test_portfolio_to_json(session: Session):
+    new_asset_type = generate_new_asset_type()
+    new_asset = generate_new_asset(new_asset_type.id)
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+    new_portfolio_element = generate_new_portfolio_element(
+        new_portfolio.id, new_asset.id)
+
+    portfolio = get_portfolio_by_id(
+        new_portfolio.id, load_profile='portfolio_tree')
+
+    assert portfolio.to_json() == {
+        'id': new_portfolio.id,
+        'name': new_portfolio.name,
+        'elements': [{
+            'id': new_portfolio_element.id,
+            'count': new_portfolio_element.count,
+            'buy_price': new_portfolio_element.buy_price,
+            'order_fee': new_portfolio_element.order_fee,
+            'portfolio_id': new_portfolio.id,
+            'asset': {
+                'id': new_asset.id,
+                'name': new_asset.name,
+                'ticker_symbol': new_asset.ticker_symbol,
+                'isin': new_asset.isin,
+                'default_currency': new_asset.default_currency,
+                'asset_type': {
+                    'id': new_asset_type.id,
+                    'name': new_asset_type.name,
+                    'quote_type': new_asset_type.quote_type,
+                    'unit_type': new_asset_type.unit_type
+                }
+            }
+        }]
+    }
+
+    # Scalar relationships that are not set are serialized as None
+    assert PortfolioElement(count=1.0, buy_price=1.0).to_json()['asset'] is None
+
+
 def test_get_portfolio_by_name(session: Session):
     new_user = generate_new_user()
     new_portfolio = generate_new_portfolio(new_user.id)
@@ -166,16 +320,47 @@ def test_update_portfolio_name(session: Session):
     new_user = generate_new_user()
     new_portfolio = generate_new_portfolio(new_user.id)
 
-    updated_portfolio = update_portfolio_name(new_portfolio.id, NEW_NAME)
+    updated_portfolio = update_portfolio_name(new_portfolio, NEW_NAME)
     assert updated_portfolio is not None
     assert updated_portfolio.name == NEW_NAME
 
 
+def test_portfolio_version(session: Session):
+    new_asset_type = generate_new_asset_type()
+    new_asset = generate_new_asset(new_asset_type.id)
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+
+    def get_version():
+        return session.query(Portfolio.version).filter_by(id=new_portfolio.id).scalar()
+
+    assert get_version() == 1
+
+    new_portfolio_element = generate_new_portfolio_element(
+        new_portfolio.id, new_asset.id)
+    assert get_version() == 2
+
+    update_portfolio_element(new_portfolio.id, new_portfolio_element.id, count=5.0)
+    assert get_version() == 3
+
+    update_portfolio_name(new_portfolio, generate_random_string())
+    assert get_version() == 4
+
+    # The ISIN of held assets is part of the portfolio
+    update_asset_isin(new_asset.id, generate_random_string())
+    assert get_version() == 5
+
+    delete_portfolio_element(new_portfolio.id, new_portfolio_element.id)
+    assert get_version() == 6
+
+    assert get_portfolio_versions_by_user_id(new_user.id) == [(new_portfolio.id, 6)]
+
+
 def test_portfolio_deletion(session: Session):
     new_user = generate_new_user()
     new_portfolio = generate_new_portfolio(new_user.id)
 
-    delete_portfolio_by_id(new_portfolio.id)
+    delete_portfolio(new_portfolio)
 
     fetched_portfolio = session.query(
         Portfolio).filter_by(id=new_portfolio.id).first()
@@ -190,7 +375,7 @@ def test_consequences_of_portfolio_deletion(session: Session):
     new_portfolio_element = generate_new_portfolio_element(
         new_portfolio.id, new_asset.id)
 
-    delete_portfolio_by_id(new_portfolio.id)
+    delete_portfolio(new_portfolio)
 
     fetched_portfolio = session.query(
         Portfolio).filter_by(id=new_portfolio.id).first()
@@ -235,3 +420,51 @@ def test_get_asset_type_by_name(session: Session):
 
     assert fetched_asset_type is not None
     assert fetched_asset_type.name == new_asset_type.name
+
+
+def test_update_asset_isin(session: Session):
+    new_asset_type = generate_new_asset_type()
+    new_asset = generate_new_asset(new_asset_type.id)
+    NEW_ISIN = generate_random_string()
+
+    update_asset_isin(new_asset.id, NEW_ISIN)
+
+    fetched_asset = session.query(Asset).filter_by(id=new_asset.id).first()
+    assert fetched_asset.isin == NEW_ISIN
+
+
+def test_session_per_thread(session: Session):
+    thread_sessions = {}
+
+    def get_thread_session(i: int):
+        thread_sessions[i] = (scoped_session_registry(), scoped_session_registry())
+
+    threads = [threading.Thread(target=get_thread_session, args=(i,))
+               for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Within a thread the session is reused, across threads it is not
+    assert all(first is second for first, second in thread_sessions.values())
+    assert len({id(first) for first, _ in thread_sessions.values()}) == 4
+
+    # Removing the session of a thread creates a new one on the next use
+    current_session = scoped_session_registry()
+    remove_session()
+    assert scoped_session_registry() is not current_session
+
+
+def test_upgrade_db_schema():
+    # Database of an older version without the portfolio version
+    legacy_engine = create_engine('sqlite://')
+    with legacy_engine.begin() as connection:
+        connection.execute(text('CREATE TABLE portfolios (id CHAR(32) PRIMARY KEY, name VARCHAR NOT NULL)'))
+        connection.execute(text("INSERT INTO portfolios VALUES ('1', 'Legacy')"))
+
+    upgrade_db_schema(legacy_engine)
+    upgrade_db_schema(legacy_engine)
+
+    with legacy_engine.connect() as connection:
+        assert connection.execute(text('SELECT version FROM portfolios')).scalar() == 1
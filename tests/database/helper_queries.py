@@ -1,7 +1,11 @@
 import random
 import string
+from contextlib import contextmanager
+
+from sqlalchemy import event
 
 from src.database.queries import *
+from src.database.setup import engine
 
 
 def generate_random_email(n=10):
@@ -106,3 +110,24 @@ def insert_new_asset_type(name: str, quote_type: str, unit_type: str):
     session.add(new_asset_type)
     session.commit()
     return new_asset_type
+
+
+@contextmanager
+def count_queries():
+    """
+    Counts the SQL statements that are executed within the context.
+        Parameters:
+            -
+        Returns:
+            list: Contains the executed statements once the context is left.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,21 @@
+import pytest
+
+from src import config
+from src.cache import cache
+from src.cache.backends import MemoryCacheBackend
+
+
+@pytest.fixture(scope='function')
+def memory_cache(monkeypatch):
+    """
+    Pytest Fixture that replaces the process cache with an empty memory cache.
+        Parameters:
+            MonkeyPatch monkeypatch;
+        Returns:
+            Cache: The empty cache.
+    """
+    new_cache = cache.Cache(MemoryCacheBackend(
+        config.CACHE_MAX_BYTES), config.CACHE_TTL)
+    monkeypatch.setattr(cache, '_cache', new_cache)
+
+    yield new_cache
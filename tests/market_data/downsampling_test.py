@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from src.market_data.downsampling import (downsample, downsample_lttb,
+                                          lttb_indices, resample_ohlc)
+
+
+def generate_price_history(days: int):
+    dates = pd.date_range('2024-01-01', periods=days, freq='D', tz='UTC', name='Date')
+    close = np.arange(1, days + 1, dtype=float)
+    return pd.DataFrame({
+        'Date': dates,
+        'Open': close - 0.5,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(days, 10, dtype=np.int64),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0
+    })
+
+
+def test_resample_ohlc():
+    df = generate_price_history(21)
+    df.loc[2, 'Stock Splits'] = 2.0
+    df.loc[3, 'Stock Splits'] = 3.0
+    # Leave a gap of one week, which is left out
+    df = df[(df['Date'] < '2024-01-08') | (df['Date'] >= '2024-01-15')]
+
+    resampled = resample_ohlc(df, '1wk')
+
+    assert list(resampled.columns) == list(df.columns)
+    assert len(resampled) == 2
+
+    first_week = resampled.iloc[0]
+    assert first_week['Date'] == pd.Timestamp('2024-01-01', tz='UTC')
+    assert first_week['Open'] == 0.5
+    assert first_week['High'] == 8
+    assert first_week['Low'] == 0
+    assert first_week['Close'] == 7
+    assert first_week['Volume'] == 70
+    assert first_week['Stock Splits'] == 6.0
+    assert resampled.iloc[1]['Stock Splits'] == 0.0
+
+
+def test_resample_ohlc_weekly_dates():
+    # Starts on a Wednesday
+    df = generate_price_history(21).iloc[2:]
+
+    resampled = resample_ohlc(df, '1wk')
+
+    # Weeks are labelled with their Monday, even if the first days are missing
+    assert resampled['Date'].tolist() == [pd.Timestamp(date, tz='UTC')
+                                          for date in ['2024-01-01', '2024-01-08', '2024-01-15']]
+    assert resampled['Open'].tolist() == [2.5, 7.5, 14.5]
+    assert resampled['Close'].tolist() == [7, 14, 21]
+
+    # Months are labelled with their first day as well
+    assert resample_ohlc(df, '1mo')['Date'].tolist() == [pd.Timestamp('2024-01-01', tz='UTC')]
+
+
+def test_lttb_indices():
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[37] = 10  # A single spike has to be kept
+
+    indices = lttb_indices(x, y, 10)
+
+    assert len(indices) == 10
+    assert indices[0] == 0 and indices[-1] == 99
+    assert 37 in indices
+    assert np.all(np.diff(indices) > 0)
+
+    # Nothing to reduce
+    assert lttb_indices(x, y, 100).tolist() == list(range(100))
+
+
+def test_downsample():
+    df = generate_price_history(3650)
+
+    downsampled = downsample_lttb(df, 500)
+    assert len(downsampled) == 500
+    assert list(downsampled.columns) == list(df.columns)
+    assert downsampled.iloc[0].equals(df.iloc[0])
+    assert downsampled.iloc[-1].equals(df.iloc[-1])
+
+    # Resampling is done first
+    downsampled = downsample(df, points=50, resample='1mo')
+    assert len(downsampled) == 50
+    assert downsampled['Date'].dt.day.eq(1).all()
+
+    assert downsample(df).equals(df)
@@ -0,0 +1,64 @@
+import time
+
+from src.cache.cache import Cache
+from src.market_data import etf_data
+
+
+class FakeTicker:
+    """
+    Replaces the yahooquery Ticker and records which symbols were requested.
+    """
+
+    requests = []
+
+    def __init__(self, symbols, **kwargs):
+        self.symbols = symbols
+        FakeTicker.requests.append(symbols)
+
+    @property
+    def fund_holding_info(self):
+        return {
+            symbol: {
+                'holdings': [
+                    {'symbol': 'AAPL', 'holdingName': 'Apple Inc', 'holdingPercent': 0.07},
+                    {'symbol': '', 'holdingName': 'Cash', 'holdingPercent': 0.01}
+                ],
+                'sectorWeightings': [{'technology': 0.3}, {'realestate': 0.02}, {'energy': 0}]
+            } if symbol != 'INVALID' else 'No fundamentals data found for symbol: INVALID'
+            for symbol in self.symbols
+        }
+
+
+def test_get_etf_compositions(memory_cache: Cache, monkeypatch):
+    monkeypatch.setattr(etf_data, 'Ticker', FakeTicker)
+    FakeTicker.requests = []
+
+    tickers = ['SPY', 'INVALID', 'SPY']
+    compositions = etf_data.get_etf_compositions(tickers)
+
+    assert FakeTicker.requests == [['SPY', 'INVALID']]
+    assert compositions['INVALID'] is None
+    assert compositions['SPY'] == {
+        'holdings': [{'symbol': 'AAPL', 'name': 'Apple Inc', 'weight': 0.07}],
+        'sector_weights': {'Technology': 0.3, 'Real Estate': 0.02}
+    }
+
+    # All tickers are served from the cache now
+    etf_data.get_etf_compositions(tickers)
+    assert len(FakeTicker.requests) == 1
+
+
+def test_get_etf_compositions_missing(memory_cache: Cache, monkeypatch):
+    monkeypatch.setattr(etf_data, 'Ticker', FakeTicker)
+    monkeypatch.setattr(etf_data, 'MISSING_MARKET_DATA_TTL', 0.05)
+    FakeTicker.requests = []
+
+    etf_data.get_etf_compositions(['SPY', 'INVALID'])
+
+    # Missing compositions might be transient errors, so they expire first
+    time.sleep(0.1)
+    compositions = etf_data.get_etf_compositions(['SPY', 'INVALID'])
+
+    assert FakeTicker.requests == [['SPY', 'INVALID'], ['INVALID']]
+    assert compositions['INVALID'] is None
+    assert compositions['SPY'] is not None
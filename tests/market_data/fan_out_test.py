@@ -0,0 +1,114 @@
+import threading
+import time
+
+from src.config import MARKET_DATA_MAX_WORKERS
+from src.market_data.fan_out import executor, fan_out
+
+
+def test_fan_out_runs_concurrently():
+    def lookup(symbol: str):
+        time.sleep(0.1)
+        return symbol.lower()
+
+    start = time.monotonic()
+    result = fan_out(lookup, ['AAPL', 'MSFT', 'NVDA', 'SAP'], max_parallelism=4)
+    duration = time.monotonic() - start
+
+    assert result.results == {'AAPL': 'aapl', 'MSFT': 'msft',
+                              'NVDA': 'nvda', 'SAP': 'sap'}
+    assert result.errors == {}
+    assert duration < 0.3
+
+
+def test_fan_out_max_parallelism():
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def lookup(symbol: str):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return symbol
+
+    result = fan_out(lookup, [str(i) for i in range(10)], max_parallelism=2)
+
+    assert len(result.results) == 10
+    assert max_running == 2
+
+
+def test_fan_out_partial_failures():
+    def lookup(symbol: str):
+        if symbol == 'INVALID':
+            raise ValueError('Unknown symbol')
+        if symbol == 'SLOW':
+            time.sleep(0.5)
+        return symbol
+
+    start = time.monotonic()
+    result = fan_out(lookup, ['AAPL', 'INVALID', 'SLOW'], timeout=0.1)
+
+    assert time.monotonic() - start < 0.4
+    assert result.results == {'AAPL': 'AAPL'}
+    assert isinstance(result.errors['INVALID'], ValueError)
+    assert isinstance(result.errors['SLOW'], TimeoutError)
+
+    # Some calls succeeded, so no error is raised
+    result.raise_if_all_failed()
+
+
+def test_fan_out_saturated_pool():
+    # Occupy every worker of the shared pool, like concurrent requests
+    release = threading.Event()
+    blockers = [executor.submit(release.wait) for _ in range(MARKET_DATA_MAX_WORKERS)]
+    timer = threading.Timer(0.3, release.set)
+    timer.start()
+
+    def lookup(symbol: str):
+        time.sleep(0.01)
+        return symbol
+
+    try:
+        start = time.monotonic()
+        result = fan_out(lookup, ['AAPL', 'MSFT', 'NVDA'], timeout=0.1)
+    finally:
+        release.set()
+        timer.cancel()
+
+    # Waiting in the queue does not count against the timeout
+    assert time.monotonic() - start >= 0.25
+    assert result.results == {'AAPL': 'AAPL', 'MSFT': 'MSFT', 'NVDA': 'NVDA'}
+    assert result.errors == {}
+    assert all(blocker.result() for blocker in blockers)
+
+
+def test_fan_out_deadline():
+    # Occupy every worker of the shared pool, so all calls stay queued
+    release = threading.Event()
+    blockers = [executor.submit(release.wait) for _ in range(MARKET_DATA_MAX_WORKERS)]
+    calls = []
+
+    def lookup(symbol: str):
+        calls.append(symbol)
+        return symbol
+
+    try:
+        start = time.monotonic()
+        result = fan_out(lookup, ['AAPL', 'MSFT', 'NVDA'], max_parallelism=2, timeout=0.1, deadline=0.2)
+        duration = time.monotonic() - start
+    finally:
+        release.set()
+
+    # Queued calls count against the deadline and are cancelled
+    assert 0.2 <= duration < 0.4
+    assert result.results == {}
+    assert list(result.errors) == ['AAPL', 'MSFT', 'NVDA']
+    assert all(isinstance(error, TimeoutError) for error in result.errors.values())
+
+    assert all(blocker.result() for blocker in blockers)
+    time.sleep(0.05)
+    assert calls == []
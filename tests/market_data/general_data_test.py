@@ -0,0 +1,72 @@
+import time
+
+from sqlalchemy.orm.session import Session
+
+from src.cache.cache import MISSING, Cache
+from src.database.models import Asset
+from src.market_data import general_data
+from tests.database.conftest import session
+from tests.database.helper_queries import (generate_new_asset_type,
+                                           insert_new_asset)
+
+
+def test_get_isin_uses_stored_isin(session: Session, memory_cache: Cache, monkeypatch):
+    new_asset_type = generate_new_asset_type()
+    insert_new_asset('Apple', 'AAPL', 'US0378331005', 'USD', new_asset_type.id)
+
+    def fetch_isin(ticker: str):
+        raise AssertionError('ISIN should not be fetched')
+
+    monkeypatch.setattr(general_data, 'fetch_isin', fetch_isin)
+
+    assert general_data.get_isin('AAPL') == 'US0378331005'
+
+
+def test_get_isin_persists_fetched_isin(session: Session, memory_cache: Cache, monkeypatch):
+    new_asset_type = generate_new_asset_type()
+    new_asset = insert_new_asset('SAP', 'SAP', None, 'EUR', new_asset_type.id)
+
+    fetched_tickers = []
+
+    def fetch_isin(ticker: str):
+        fetched_tickers.append(ticker)
+        return 'DE0007164600'
+
+    monkeypatch.setattr(general_data, 'fetch_isin', fetch_isin)
+
+    assert general_data.get_isin('SAP') == 'DE0007164600'
+    assert general_data.get_isin('SAP') == 'DE0007164600'
+    assert fetched_tickers == ['SAP']
+
+    fetched_asset = session.query(Asset).filter_by(id=new_asset.id).first()
+    assert fetched_asset.isin == 'DE0007164600'
+
+
+def test_get_isin_caches_missing_isin(session: Session, memory_cache: Cache, monkeypatch):
+    fetched_tickers = []
+
+    def fetch_isin(ticker: str):
+        fetched_tickers.append(ticker)
+        return None
+
+    monkeypatch.setattr(general_data, 'fetch_isin', fetch_isin)
+
+    assert general_data.get_isin('BTC-USD') is None
+    assert general_data.get_isin('BTC-USD') is None
+    assert fetched_tickers == ['BTC-USD']
+
+
+def test_get_isin_timeout(session: Session, memory_cache: Cache, monkeypatch):
+    def fetch_isin(ticker: str):
+        time.sleep(0.5)
+        return 'US0378331005'
+
+    monkeypatch.setattr(general_data, 'fetch_isin', fetch_isin)
+    monkeypatch.setattr(general_data, 'ISIN_LOOKUP_TIMEOUT', 0.1)
+
+    start = time.monotonic()
+    assert general_data.get_isin('AAPL') is None
+    assert time.monotonic() - start < 0.4
+
+    # Timeouts are not cached
+    assert memory_cache.get('isin', 'AAPL') is MISSING
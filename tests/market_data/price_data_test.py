@@ -0,0 +1,180 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.orm.session import Session
+from yfinance.exceptions import YFChartError
+
+from src.cache.cache import Cache
+from src.market_data import price_data, symbol_index
+from tests.database.conftest import session
+from tests.database.helper_queries import (generate_new_asset_type,
+                                           insert_new_asset)
+
+
+class FakeTicker:
+    """
+    Replaces the yfinance Ticker and records every upstream call.
+    The ticker 'INVALID' does not exist.
+    """
+
+    calls = []
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        FakeTicker.calls.append(('info', self.ticker))
+        return {} if self.ticker == 'INVALID' else {'symbol': self.ticker}
+
+    def history(self, period: str, interval: str = '1d', **kwargs):
+        FakeTicker.calls.append(('history', self.ticker))
+
+        if self.ticker == 'INVALID':
+            raise YFChartError(self.ticker, 'No data found, symbol may be delisted')
+        if interval == '1m':
+            raise YFChartError(self.ticker, '1m data not available')
+
+        index = pd.DatetimeIndex(['2024-01-02'], name='Date', tz='UTC')
+        return pd.DataFrame({'Close': [1.5]}, index=index)
+
+
+@pytest.fixture(scope='function')
+def fake_ticker(monkeypatch):
+    monkeypatch.setattr(price_data.yf, 'Ticker', FakeTicker)
+    FakeTicker.calls = []
+
+
+def test_price_data_single_upstream_call(session: Session, memory_cache: Cache, fake_ticker):
+    # Unknown valid ticker needs one call and is known afterwards
+    assert json.loads(price_data.get_price_data('MSFT', '1d', '1d')) == [
+        {'Date': '2024-01-02T00:00:00.000Z', 'Close': 1.5}]
+    assert FakeTicker.calls == [('history', 'MSFT')]
+    assert symbol_index.get_symbol_validity('MSFT') is True
+
+    # Errors of known tickers are passed on without checking the ticker
+    FakeTicker.calls = []
+    with pytest.raises(YFChartError):
+        price_data.get_price_data('MSFT', '1d', '1m')
+    assert FakeTicker.calls == [('history', 'MSFT')]
+
+
+def test_price_data_formats(session: Session, memory_cache: Cache, fake_ticker):
+    columns = price_data.get_price_data_columns('MSFT', '1d', '1d')
+    assert list(columns) == ['Date', 'Close']
+    assert columns['Date'] == ['2024-01-02T00:00:00.000Z']
+    assert columns['Close'].tolist() == [1.5]
+
+    body, column_names, rows = price_data.get_price_data_binary('MSFT', '1d', '1d')
+    assert column_names == ['Date', 'Close']
+    assert rows == 1
+    assert np.frombuffer(body, dtype='<f8').tolist() == [
+        pd.Timestamp('2024-01-02', tz='UTC').timestamp() * 1000, 1.5]
+
+    # The price history is only fetched once for all formats
+    assert FakeTicker.calls == [('history', 'MSFT')]
+
+    assert price_data.get_price_data_columns('INVALID', '1d', '1d') is None
+    assert price_data.get_price_data_binary('INVALID', '1d', '1d') is None
+
+
+def test_stream_price_data(session: Session, memory_cache: Cache, fake_ticker):
+    lines = ''.join(price_data.stream_price_data('MSFT', '1d', '1d')).splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'Date': '2024-01-02T00:00:00.000Z', 'Close': 1.5}]
+
+    assert price_data.stream_price_data('INVALID', '1d', '1d') is None
+
+
+def test_price_data_invalid_ticker(session: Session, memory_cache: Cache, fake_ticker):
+    assert price_data.get_price_data('INVALID', '1d', '1d') is None
+    assert FakeTicker.calls == [('history', 'INVALID'), ('info', 'INVALID')]
+
+    # Known invalid tickers need no upstream call at all
+    FakeTicker.calls = []
+    assert price_data.get_current_price('INVALID') is None
+    assert FakeTicker.calls == []
+
+
+def test_symbol_index_seeded_from_assets(session: Session, memory_cache: Cache, fake_ticker, monkeypatch):
+    monkeypatch.setattr(price_data, 'Ticker', FakeQuoteTicker)
+    new_asset_type = generate_new_asset_type()
+    insert_new_asset('Apple', 'AAPL', None, 'USD', new_asset_type.id)
+
+    assert symbol_index.get_symbol_validity('AAPL') is True
+    assert symbol_index.get_symbol_validity('NVDA') is None
+
+    assert price_data.get_current_price('AAPL')['price'] == 100.0
+    assert FakeTicker.calls == []
+
+
+class FakeQuoteTicker:
+    """
+    Replaces the yahooquery Ticker and records which symbols were requested.
+    """
+
+    requests = []
+
+    def __init__(self, symbols, **kwargs):
+        self.symbols = symbols
+        FakeQuoteTicker.requests.append(symbols)
+
+    @property
+    def quotes(self):
+        return {
+            symbol: {
+                'regularMarketPrice': 100.0,
+                'regularMarketTime': 1704207600,
+                'currency': 'USD'
+            }
+            for symbol in self.symbols if symbol != 'UNKNOWN'
+        }
+
+
+def test_get_current_prices(session: Session, memory_cache: Cache, fake_ticker, monkeypatch):
+    monkeypatch.setattr(price_data, 'Ticker', FakeQuoteTicker)
+    monkeypatch.setattr(price_data, 'QUOTE_BATCH_SIZE', 2)
+    FakeQuoteTicker.requests = []
+
+    # The known invalid ticker is not requested at all
+    symbol_index.set_symbol_validity('INVALID', False)
+
+    tickers = ['AAPL', 'MSFT', 'NVDA', 'UNKNOWN', 'INVALID']
+    prices = price_data.get_current_prices(tickers)
+
+    assert sorted(FakeQuoteTicker.requests) == [
+        ['AAPL', 'MSFT'], ['NVDA', 'UNKNOWN']]
+    assert prices['AAPL'] == {
+        'price': 100.0,
+        'timestamp': '2024-01-02T15:00:00+00:00',
+        'currency': 'USD'
+    }
+    assert prices['UNKNOWN'] is None
+    assert prices['INVALID'] is None
+
+    # Found prices are served from the cache
+    price_data.get_current_prices(['AAPL', 'MSFT'])
+    assert len(FakeQuoteTicker.requests) == 2
+
+    # Tickers without a quote are known to be invalid
+    assert symbol_index.get_symbol_validity('UNKNOWN') is False
+    price_data.get_current_prices(['UNKNOWN'])
+    assert len(FakeQuoteTicker.requests) == 2
+
+
+def test_get_current_price(session: Session, memory_cache: Cache, fake_ticker, monkeypatch):
+    monkeypatch.setattr(price_data, 'Ticker', FakeQuoteTicker)
+    FakeQuoteTicker.requests = []
+
+    assert price_data.get_current_price('AAPL') == {
+        'price': 100.0,
+        'timestamp': '2024-01-02T15:00:00+00:00',
+        'currency': 'USD'
+    }
+    assert price_data.get_current_price('UNKNOWN') is None
+
+    # The single and the batched prices share the cache entries
+    assert price_data.get_current_prices(['AAPL', 'UNKNOWN'])['AAPL']['price'] == 100.0
+    assert FakeQuoteTicker.requests == [['AAPL'], ['UNKNOWN']]
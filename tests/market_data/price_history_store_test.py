@@ -0,0 +1,164 @@
+import datetime
+
+import pandas as pd
+from sqlalchemy.orm.session import Session
+
+from src.database.models import PriceHistory
+from src.database import queries
+from src.market_data import price_history_store
+from tests.database.conftest import session
+
+
+class FakeTicker:
+    """
+    Replaces the yfinance Ticker with daily price data of the last 3 years
+    and records the arguments of every history call. If a split date is set,
+    the bar of that date has a 10:1 split and all prices are adjusted for it.
+    """
+
+    requests = []
+    split_date = None
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    def history(self, period: str = None, start: datetime.datetime = None, **kwargs):
+        FakeTicker.requests.append({'period': period, 'start': start})
+
+        end = pd.Timestamp.now(tz='America/New_York').normalize()
+        index = pd.date_range(end - pd.DateOffset(years=3), end,
+                              freq='D', name='Date')
+        df = pd.DataFrame({
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5,
+            'Volume': 100, 'Dividends': 0.0, 'Stock Splits': 0.0
+        }, index=index)
+
+        if FakeTicker.split_date is not None:
+            df[['Open', 'High', 'Low', 'Close']] /= 10
+            df.loc[FakeTicker.split_date, 'Stock Splits'] = 10.0
+
+        if start is not None:
+            return df[df.index >= start]
+        if period != 'max':
+            return df[df.index.tz_convert(None) >= price_history_store.get_period_start(
+                period, datetime.datetime.now(datetime.UTC).replace(tzinfo=None))]
+        return df
+
+
+def test_stored_price_history(session: Session, monkeypatch):
+    monkeypatch.setattr(price_history_store.yf, 'Ticker', FakeTicker)
+    FakeTicker.requests = []
+
+    df = price_history_store.get_stored_price_history('AAPL', '1y', '1d')
+    assert FakeTicker.requests == [{'period': '1y', 'start': None}]
+    assert list(df.columns) == ['Date', 'Open', 'High', 'Low', 'Close',
+                                'Volume', 'Dividends', 'Stock Splits']
+    assert str(df['Date'].dt.tz) == 'UTC'
+    assert 364 <= len(df) <= 367
+
+    # Shorter periods are served locally
+    df = price_history_store.get_stored_price_history('AAPL', '1mo', '1d')
+    assert len(FakeTicker.requests) == 1
+    assert 28 <= len(df) <= 32
+
+    # Outdated data is refreshed since the last stored bar only
+    price_history = session.query(PriceHistory).filter_by(
+        ticker_symbol='AAPL').one()
+    price_history.updated_at -= datetime.timedelta(days=1)
+    session.commit()
+
+    df = price_history_store.get_stored_price_history('AAPL', '1y', '1d')
+    assert len(FakeTicker.requests) == 2
+    assert FakeTicker.requests[1]['start'] is not None
+    assert 364 <= len(df) <= 367
+    assert df['Date'].is_unique
+
+    # Longer periods than the stored range are fetched completely
+    df = price_history_store.get_stored_price_history('AAPL', 'max', '1d')
+    assert FakeTicker.requests[2] == {'period': 'max', 'start': None}
+    assert len(df) > 1000
+
+    price_history_store.get_stored_price_history('AAPL', '2y', '1d')
+    assert len(FakeTicker.requests) == 3
+
+
+def test_iter_stored_price_history(session: Session, monkeypatch):
+    monkeypatch.setattr(price_history_store.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(price_history_store, 'PRICE_DATA_CHUNK_SIZE', 100)
+
+    price_history_id, start = price_history_store.update_stored_price_history(
+        'AAPL', 'max', '1d')
+    chunks = list(price_history_store.iter_stored_price_history(
+        price_history_id, start))
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert len(chunks) > 10
+
+    # The chunks form the same price history as the complete DataFrame
+    df = price_history_store.get_stored_price_history('AAPL', 'max', '1d')
+    assert pd.concat(chunks, ignore_index=True).equals(df)
+
+
+def test_stored_price_history_split(session: Session, monkeypatch):
+    monkeypatch.setattr(price_history_store.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(FakeTicker, 'split_date', None)
+    FakeTicker.requests = []
+
+    price_history_store.get_stored_price_history('AAPL', '1y', '1d')
+    price_history = session.query(PriceHistory).filter_by(
+        ticker_symbol='AAPL').one()
+    stored_start = price_history.start
+
+    # A split on the last bar adjusts all earlier bars on yahoo finance
+    FakeTicker.split_date = pd.Timestamp.now(tz='America/New_York').normalize()
+    price_history.updated_at -= datetime.timedelta(days=1)
+    session.commit()
+
+    df = price_history_store.get_stored_price_history('AAPL', '1y', '1d')
+
+    # The tail contains the split, so the stored range is fetched again
+    assert len(FakeTicker.requests) == 3
+    assert FakeTicker.requests[1]['start'] is not None
+    assert FakeTicker.requests[2]['start'] == stored_start.replace(tzinfo=datetime.UTC)
+
+    # No price cliff on the split date
+    assert (df['Close'] == 0.15).all()
+    assert df['Stock Splits'].iloc[-1] == 10.0
+    assert 364 <= len(df) <= 367
+
+    # The stored split does not cause another refetch
+    session.query(PriceHistory).filter_by(ticker_symbol='AAPL').one().updated_at -= \
+        datetime.timedelta(days=1)
+    session.commit()
+
+    price_history_store.get_stored_price_history('AAPL', '1y', '1d')
+    assert len(FakeTicker.requests) == 4
+
+
+def test_overlapping_refreshes(session: Session, monkeypatch):
+    monkeypatch.setattr(price_history_store.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(FakeTicker, 'split_date', None)
+
+    # The second refresh runs completely after the first one deleted its bars,
+    # like two requests that refresh the same ticker at the same time
+    upsert_price_bars = queries.upsert_price_bars
+    overlapping = []
+
+    def upsert_after_overlapping_refresh(price_history_id, bars):
+        if not overlapping:
+            overlapping.append(price_history_store.fetch_price_bars('AAPL', period='1y', interval='1d'))
+            queries.store_price_bars('AAPL', '1d', None, overlapping[0], replace_all=False)
+        upsert_price_bars(price_history_id, bars)
+
+    monkeypatch.setattr(queries, 'upsert_price_bars', upsert_after_overlapping_refresh)
+
+    df = price_history_store.get_stored_price_history('AAPL', '1y', '1d')
+
+    assert len(overlapping) == 1
+    assert session.query(PriceHistory).filter_by(ticker_symbol='AAPL').count() == 1
+    assert df['Date'].is_unique
+    assert 364 <= len(df) <= 367
+
+    # Creating an existing price history again returns the stored one
+    price_history = queries.store_price_bars('AAPL', '1d', None, [], replace_all=False)
+    assert session.query(PriceHistory).filter_by(ticker_symbol='AAPL').one().id == price_history.id
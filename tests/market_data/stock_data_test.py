@@ -0,0 +1,48 @@
+from src.cache.cache import Cache
+from src.market_data import fan_out, stock_data
+
+
+class FakeTicker:
+    """
+    Replaces the yahooquery Ticker and records which symbols were requested.
+    """
+
+    requests = []
+
+    def __init__(self, symbols, **kwargs):
+        self.symbols = symbols
+        FakeTicker.requests.append(symbols)
+
+    def get_modules(self, modules):
+        return {
+            symbol: {
+                'quoteType': {'quoteType': 'EQUITY'},
+                'assetProfile': {'country': 'United States', 'sector': 'Technology'},
+                'summaryDetail': {'trailingPE': 30.0}
+            } if symbol != 'INVALID' else 'Quote not found for ticker symbol: INVALID'
+            for symbol in self.symbols
+        }
+
+
+def test_get_stock_classifications_batches(memory_cache: Cache, monkeypatch):
+    monkeypatch.setattr(stock_data, 'Ticker', FakeTicker)
+    monkeypatch.setattr(fan_out, 'MARKET_DATA_BATCH_SIZE', 2)
+    FakeTicker.requests = []
+
+    tickers = ['AAPL', 'MSFT', 'NVDA', 'INVALID', 'AAPL']
+    classifications = stock_data.get_stock_classifications(tickers)
+
+    # 4 unique tickers with a batch size of 2 need 2 requests
+    assert sorted(FakeTicker.requests) == [['AAPL', 'MSFT'], ['NVDA', 'INVALID']]
+
+    assert classifications['INVALID'] is None
+    assert classifications['AAPL'] == {
+        'quoteType': 'EQUITY',
+        'country': 'United States',
+        'sector': 'Technology',
+        'trailingPE': 30.0
+    }
+
+    # All tickers are served from the cache now
+    stock_data.get_stock_classifications(tickers)
+    assert len(FakeTicker.requests) == 2
@@ -0,0 +1,51 @@
+import pytest
+
+from src.database.queries import get_asset_by_ticker
+from src.portfolio_analysis import stock_analysis, valuation
+from tests.database.helper_queries import (generate_new_asset_type,
+                                           generate_new_portfolio,
+                                           generate_new_user,
+                                           generate_random_string,
+                                           insert_new_asset,
+                                           insert_new_portfolio_element)
+
+
+@pytest.fixture(scope='function')
+def analysis_portfolio_factory(monkeypatch):
+    """
+    Pytest Fixture that returns a function to create a portfolio with positions,
+    the classifications and prices of the tickers are not fetched from yahoo finance.
+    The function takes:
+        List[tuple] positions: Ticker, count and buy price of every position;
+        Dict[str, dict | None] classifications: Classification per ticker;
+        Dict[str, float] prices: Current price per ticker, tickers without a price have none;
+        str | None portfolio_id: Existing portfolio to add the positions to;
+    and returns the portfolio ID.
+        Parameters:
+            MonkeyPatch monkeypatch;
+        Returns:
+            function
+    """
+
+    def create_portfolio(positions: list[tuple[str, float, float]], classifications: dict[str, dict | None],
+                         prices: dict[str, float], portfolio_id: str | None = None):
+        monkeypatch.setattr(stock_analysis, 'get_stock_classifications',
+                            lambda tickers: {t: classifications.get(t) for t in tickers})
+        monkeypatch.setattr(valuation, 'get_current_prices', lambda tickers: {
+            t: {'price': prices[t], 'timestamp': None, 'currency': 'USD'} if t in prices else None
+            for t in tickers})
+
+        if portfolio_id is None:
+            portfolio_id = generate_new_portfolio(generate_new_user().id).id
+        asset_type = generate_new_asset_type()
+
+        for ticker_symbol, count, buy_price in positions:
+            asset = get_asset_by_ticker(ticker_symbol)
+            if asset is None:
+                asset = insert_new_asset(ticker_symbol, ticker_symbol, generate_random_string(),
+                                         'USD', asset_type.id)
+            insert_new_portfolio_element(portfolio_id, asset.id, count, buy_price, 0.0)
+
+        return portfolio_id
+
+    return create_portfolio
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm.session import Session
+
+from src.portfolio_analysis import correlation
+from tests.database.conftest import session
+from tests.database.helper_queries import (generate_new_asset_type,
+                                           generate_new_portfolio,
+                                           generate_new_user, insert_new_asset,
+                                           insert_new_portfolio_element)
+from tests.market_data.conftest import memory_cache
+
+
+def test_rolling_covariance():
+    returns = np.random.default_rng(0).normal(0, 0.01, (40, 4))
+
+    covariance = correlation.RollingCovariance(returns[:5], window=10)
+    np.testing.assert_allclose(covariance.covariance(), np.cov(returns[:5], rowvar=False))
+
+    # Fill the window and replace it more than once
+    for i in range(5, 40):
+        covariance.add(returns[i])
+        window = returns[max(0, i - 9):i + 1]
+
+        assert covariance.count == len(window)
+        np.testing.assert_allclose(covariance.covariance(), np.cov(window, rowvar=False))
+        np.testing.assert_allclose(covariance.correlation(), np.corrcoef(window, rowvar=False))
+
+
+def test_get_window_period():
+    assert correlation.get_window_period(20) == '3mo'
+    assert correlation.get_window_period(252) == '2y'
+    assert correlation.get_window_period(2520) == 'max'
+
+
+def test_get_portfolio_correlation(session: Session, memory_cache, monkeypatch):
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+    new_asset_type = generate_new_asset_type()
+
+    dates = pd.bdate_range('2024-01-01', periods=40, tz='America/New_York', name='Date')
+    rng = np.random.default_rng(1)
+    closes = {ticker: 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+              for ticker in ['AAPL', 'MSFT', 'SAP']}
+    bars = {'count': 30}
+
+    monkeypatch.setattr(
+        'src.portfolio_analysis.performance.get_price_history',
+        lambda ticker, period, interval: pd.DataFrame(
+            {'Date': dates[:bars['count']], 'Close': closes[ticker][:bars['count']]}))
+
+    for ticker in closes:
+        new_asset = insert_new_asset(ticker, ticker, None, 'USD', new_asset_type.id)
+        insert_new_portfolio_element(new_portfolio.id, new_asset.id, 1.0, 1.0, 0.0)
+
+    def expected_returns():
+        prices = np.column_stack([closes[ticker][:bars['count']] for ticker in sorted(closes)])
+        return (prices[1:] / prices[:-1] - 1)[-20:]
+
+    result = correlation.get_portfolio_correlation(new_portfolio.id, 20)
+
+    assert result['tickers'] == ['AAPL', 'MSFT', 'SAP']
+    assert result['observations'] == 20
+    np.testing.assert_allclose(result['correlation'], np.corrcoef(expected_returns(), rowvar=False))
+
+    # New bars are added to the cached state
+    created = []
+    rolling_covariance_init = correlation.RollingCovariance.__init__
+
+    def init(self, returns, window):
+        created.append(self)
+        rolling_covariance_init(self, returns, window)
+
+    monkeypatch.setattr(correlation.RollingCovariance, '__init__', init)
+
+    bars['count'] = 32
+    result = correlation.get_portfolio_correlation(new_portfolio.id, 20)
+
+    assert created == []
+    np.testing.assert_allclose(result['covariance'], np.cov(expected_returns(), rowvar=False))
+
+    # A changed last bar is not added, but recalculated
+    closes['AAPL'][31] *= 1.01
+    result = correlation.get_portfolio_correlation(new_portfolio.id, 20)
+
+    assert len(created) == 1
+    np.testing.assert_allclose(result['covariance'], np.cov(expected_returns(), rowvar=False))
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+from sqlalchemy.orm.session import Session
+
+from src.portfolio_analysis import exposure
+from src.portfolio_analysis.exposure import *
+from tests.database.conftest import session
+
+CLASSIFICATIONS = {
+    'AAPL': {'quoteType': 'EQUITY', 'country': 'United States',
+             'sector': 'Technology', 'trailingPE': 20.0},
+    'SPY': {'quoteType': 'ETF', 'country': None, 'sector': None, 'trailingPE': None},
+    'NOINFO': {'quoteType': 'ETF', 'country': None, 'sector': None, 'trailingPE': None},
+    'BTC-USD': {'quoteType': 'CRYPTOCURRENCY', 'country': None, 'sector': None, 'trailingPE': None},
+    'DELISTED': None
+}
+
+COMPOSITIONS = {
+    'SPY': {
+        'holdings': [{'symbol': 'AAPL', 'name': 'Apple Inc', 'weight': 0.1},
+                     {'symbol': 'MSFT', 'name': 'Microsoft Corp', 'weight': 0.2}],
+        'sector_weights': {'Technology': 0.5, 'Healthcare': 0.3}
+    },
+    'NOINFO': None
+}
+
+
+POSITIONS = [('AAPL', 1.0, 50.0), ('SPY', 2.0, 400.0), ('NOINFO', 2.0, 40.0),
+             ('BTC-USD', 1.0, 100.0), ('DELISTED', 1.0, 10.0)]
+
+PRICES = {'AAPL': 100.0, 'SPY': 500.0, 'NOINFO': 50.0, 'BTC-USD': 300.0}
+
+
+@pytest.fixture(scope='function')
+def portfolio_id(session: Session, analysis_portfolio_factory, monkeypatch):
+    """
+    Pytest Fixture that creates a portfolio with a stock, ETFs, crypto and an unknown ticker,
+    fund holdings are not fetched from yahoo finance.
+        Parameters:
+            Session session;
+            function analysis_portfolio_factory;
+            MonkeyPatch monkeypatch;
+        Returns:
+            str: The portfolio ID.
+    """
+    monkeypatch.setattr(exposure, 'get_etf_compositions',
+                        lambda tickers: {t: COMPOSITIONS[t] for t in tickers})
+    return analysis_portfolio_factory(POSITIONS, CLASSIFICATIONS, PRICES)
+
+
+def test_get_portfolio_exposure(portfolio_id: str):
+    # Market values: AAPL 100, SPY 1000, NOINFO 100, BTC-USD 300
+    exposure_dict = get_portfolio_exposure(portfolio_id)
+
+    assert exposure_dict['total_value'] == 1500.0
+    assert exposure_dict['missing_prices'] == ['DELISTED']
+    assert exposure_dict['missing_holdings'] == ['NOINFO']
+
+    # AAPL is held directly and through the ETF
+    holdings = exposure_dict['holdings']
+    assert list(holdings) == ['BTC-USD', 'AAPL', 'MSFT', 'NOINFO']
+    assert holdings['AAPL'] == {'value': 200.0, 'percent': 13.33,
+                                'direct_value': 100.0, 'fund_value': 100.0}
+    assert holdings['MSFT'] == {'value': 200.0, 'percent': 13.33,
+                                'direct_value': 0.0, 'fund_value': 200.0}
+    assert holdings['NOINFO']['direct_value'] == 100.0
+
+    # 70% of the ETF value are not in its top holdings
+    assert exposure_dict['unattributed_percent'] == pytest.approx(46.67)
+
+    # Technology: AAPL 100 + 50% of SPY, other: crypto, NOINFO and 20% of SPY
+    assert exposure_dict['sector_weights'] == {
+        'Technology': 40.0, 'Other': 40.0, 'Healthcare': 20.0}
+    assert sum(exposure_dict['sector_weights'].values()) == pytest.approx(100)
+
+
+def test_get_portfolio_exposure_empty(session: Session, analysis_portfolio_factory, monkeypatch):
+    monkeypatch.setattr(exposure, 'get_etf_compositions',
+                        lambda tickers: {t: COMPOSITIONS[t] for t in tickers})
+
+    portfolio_id = analysis_portfolio_factory([], CLASSIFICATIONS, {})
+    exposure_dict = get_portfolio_exposure(portfolio_id)
+    assert exposure_dict['total_value'] == 0.0
+    assert exposure_dict['holdings'] == {}
+    assert exposure_dict['unattributed_percent'] is None
+
+    # No price available
+    analysis_portfolio_factory([('SPY', 1.0, 10.0)], CLASSIFICATIONS, {}, portfolio_id)
+
+    exposure_dict = get_portfolio_exposure(portfolio_id)
+    assert exposure_dict['sector_weights'] == {}
+    assert exposure_dict['missing_prices'] == ['SPY']
+
+
+def test_get_fund_exposures():
+    funds = pd.DataFrame({'ticker_symbol': ['SPY', 'QQQ'], 'market_value': [100.0, 50.0]})
+    compositions = {
+        'SPY': COMPOSITIONS['SPY'],
+        'QQQ': {'holdings': [], 'sector_weights': {'Technology': 0.7, 'Healthcare': 0.3}}
+    }
+
+    holdings, sectors = get_fund_exposures(funds, compositions)
+
+    assert holdings.groupby('ticker_symbol')['value'].sum().to_dict() == {'AAPL': 10.0, 'MSFT': 20.0}
+
+    # Fully weighted funds have no unknown sector
+    sector_values = sectors.groupby('sector')['value'].sum()
+    assert sector_values.to_dict() == pytest.approx(
+        {'Technology': 85.0, 'Healthcare': 45.0, 'Other': 20.0})
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.orm.session import Session
+
+from src.portfolio_analysis import performance
+from tests.database.conftest import session
+from tests.database.helper_queries import (generate_new_asset_type,
+                                           generate_new_portfolio,
+                                           generate_new_user, insert_new_asset,
+                                           insert_new_portfolio_element)
+
+
+def create_price_history(dates: list[str], tz: str, close: list[float]):
+    index = pd.DatetimeIndex(dates, name='Date').tz_localize(tz)
+    return pd.DataFrame({'Date': index, 'Open': close, 'Close': close})
+
+
+def test_align_close_prices():
+    closes = [
+        (np.array(['2024-01-02', '2024-01-03', '2024-01-04'], dtype='datetime64[D]'),
+         np.array([1.0, 2.0, 3.0])),
+        (np.array(['2024-01-03', '2024-01-05'], dtype='datetime64[D]'),
+         np.array([10.0, 30.0]))
+    ]
+
+    dates, matrix = performance.align_close_prices(closes)
+
+    np.testing.assert_array_equal(dates, np.array(
+        ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'], dtype='datetime64[D]'))
+    np.testing.assert_array_equal(matrix[:, 0], [1.0, 2.0, 3.0, 3.0])
+    np.testing.assert_array_equal(matrix[:, 1], [np.nan, 10.0, 10.0, 30.0])
+
+
+def test_get_portfolio_performance(session: Session, monkeypatch):
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+    new_asset_type = generate_new_asset_type()
+
+    # Local midnight of both exchanges is on a different UTC date,
+    # SAP has no bar on the third day and starts one day later
+    histories = {
+        'AAPL': create_price_history(['2024-01-02', '2024-01-03', '2024-01-04'],
+                                     'America/New_York', [100.0, 110.0, 120.0]),
+        'SAP.DE': create_price_history(['2024-01-03', '2024-01-05'],
+                                       'Europe/Berlin', [50.0, 60.0]),
+        'DELISTED': None
+    }
+    monkeypatch.setattr(performance, 'get_price_history',
+                        lambda ticker, period, interval: histories[ticker])
+
+    for ticker, count in [('AAPL', 2.0), ('SAP.DE', 10.0), ('DELISTED', 1.0)]:
+        new_asset = insert_new_asset(ticker, ticker, None, 'USD', new_asset_type.id)
+        insert_new_portfolio_element(new_portfolio.id, new_asset.id, count, 1.0, 0.0)
+
+    result = performance.get_portfolio_performance(new_portfolio.id, '1y', '1d')
+
+    assert result['dates'] == ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+    np.testing.assert_array_equal(result['values'], [200.0, 720.0, 740.0, 840.0])
+    assert result['change'] == 640.0
+    assert result['change_percent'] == pytest.approx(320.0)
+    assert result['missing_prices'] == ['DELISTED']
+
+
+def test_get_portfolio_performance_empty(session: Session):
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+
+    result = performance.get_portfolio_performance(new_portfolio.id, '1y', '1d')
+
+    assert result['dates'] == []
+    assert result['change'] is None
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.orm.session import Session
+
+from src.portfolio_analysis import risk
+from tests.database.conftest import session
+from tests.database.helper_queries import (generate_new_asset_type,
+                                           generate_new_portfolio,
+                                           generate_new_user, insert_new_asset,
+                                           insert_new_portfolio_element)
+from tests.market_data.conftest import memory_cache
+
+
+def test_get_portfolio_returns():
+    prices = np.array([[10.0, np.nan],
+                       [11.0, 20.0],
+                       [11.0, 30.0]])
+
+    returns = risk.get_portfolio_returns(prices, np.array([2.0, 1.0]))
+
+    # The second position has no return before its second price
+    np.testing.assert_allclose(returns, [0.1, 0.5 * 20 / 42])
+
+
+def test_get_risk_metrics():
+    returns = np.array([[0.1, np.nan],
+                        [-0.2, 0.05],
+                        [0.05, -0.1],
+                        [0.1, 0.05]])
+    benchmark_returns = returns[:, 0] / 2
+
+    metrics = risk.get_risk_metrics(returns, benchmark_returns, 252,
+                                    risk_free_rate=0.0, confidence=0.95)
+
+    for column in range(returns.shape[1]):
+        r = returns[~np.isnan(returns[:, column]), column]
+        b = benchmark_returns[~np.isnan(returns[:, column])]
+        volatility = r.std(ddof=1) * np.sqrt(252)
+
+        assert metrics['volatility'][column] == pytest.approx(volatility)
+        assert metrics['sharpe_ratio'][column] == pytest.approx(r.mean() * 252 / volatility)
+        assert metrics['beta'][column] == pytest.approx(
+            np.cov(r, b)[0, 1] / np.var(b, ddof=1))
+        assert metrics['var_historical'][column] == pytest.approx(-np.quantile(r, 0.05))
+
+    # 1.1 -> 0.88 is the largest drop
+    assert metrics['max_drawdown'][0] == pytest.approx(-0.2)
+    assert metrics['beta'][0] == pytest.approx(2.0)
+    assert metrics['var_parametric'][0] == pytest.approx(
+        -(returns[:, 0].mean() - 1.6448536 * returns[:, 0].std(ddof=1)))
+
+
+def test_get_portfolio_risk(session: Session, memory_cache, monkeypatch):
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+    new_asset_type = generate_new_asset_type()
+
+    dates = pd.bdate_range('2024-01-01', periods=60, tz='America/New_York', name='Date')
+    rng = np.random.default_rng(0)
+    benchmark = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+    histories = {
+        '^GSPC': benchmark,
+        'AAPL': benchmark ** 2 / 100,
+        'MSFT': 100 * np.cumprod(1 + rng.normal(0, 0.02, len(dates)))
+    }
+
+    calls = []
+
+    def get_price_history(ticker, period, interval):
+        calls.append(ticker)
+        return pd.DataFrame({'Date': dates, 'Close': histories[ticker]})
+
+    monkeypatch.setattr('src.portfolio_analysis.performance.get_price_history', get_price_history)
+
+    for ticker, count in [('AAPL', 2.0), ('MSFT', 1.0)]:
+        new_asset = insert_new_asset(ticker, ticker, None, 'USD', new_asset_type.id)
+        insert_new_portfolio_element(new_portfolio.id, new_asset.id, count, 1.0, 0.0)
+
+    result = risk.get_portfolio_risk(new_portfolio.id, 1, '1y', '1d', '^GSPC')
+
+    assert result['observations'] == len(dates) - 1
+    assert set(result['positions']) == {'AAPL', 'MSFT'}
+    assert result['missing_prices'] == []
+    assert result['positions']['AAPL']['beta'] == pytest.approx(2.0, rel=0.05)
+    assert result['portfolio']['volatility'] > 0
+    assert result['portfolio']['max_drawdown'] <= 0
+    assert all(value is not None for value in result['portfolio'].values())
+
+    # Cached per version
+    assert len(calls) == 3
+    assert risk.get_portfolio_risk(new_portfolio.id, 1, '1y', '1d', '^GSPC') == result
+    assert len(calls) == 3
+    risk.get_portfolio_risk(new_portfolio.id, 2, '1y', '1d', '^GSPC')
+    assert len(calls) == 6
+
+
+def test_get_portfolio_risk_empty(session: Session, memory_cache):
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+
+    result = risk.get_portfolio_risk(new_portfolio.id, 1, '1y', '1d', '^GSPC')
+
+    assert result['observations'] == 0
+    assert result['portfolio']['volatility'] is None
@@ -3,68 +3,41 @@ from sqlalchemy.orm.session import Session
 
 from src.portfolio_analysis.stock_analysis import *
 from tests.database.conftest import session
-from tests.database.helper_queries import (generate_new_asset_type,
-                                           generate_new_portfolio,
-                                           generate_new_user,
-                                           generate_random_float,
-                                           generate_random_string,
-                                           insert_new_asset,
-                                           insert_new_portfolio_element)
-
-
-def test_get_stock_portfolio_distribution(session: Session):
-    new_user = generate_new_user()
-    new_portfolio = generate_new_portfolio(new_user.id)
-    new_asset_type = generate_new_asset_type()
-
-    #  Technology / United States
-    name = 'Apple'
-    ticker_symbol = 'AAPL'
-    isin = generate_random_string()
-    default_currency = generate_random_string()
-
-    new_asset = insert_new_asset(
-        name, ticker_symbol, isin, default_currency, new_asset_type.id)
-
-    count = generate_random_float()
-    buy_price = generate_random_float()
-    order_fee = generate_random_float()
-    insert_new_portfolio_element(
-        new_portfolio.id, new_asset.id, count, buy_price, order_fee)
-
-    #  Technology / Germany
-    name = 'SAP'
-    ticker_symbol = 'SAP'
-    isin = generate_random_string()
-    default_currency = generate_random_string()
-
-    new_asset = insert_new_asset(
-        name, ticker_symbol, isin, default_currency, new_asset_type.id)
-
-    count = generate_random_float()
-    buy_price = generate_random_float()
-    order_fee = generate_random_float()
-    insert_new_portfolio_element(
-        new_portfolio.id, new_asset.id, count, buy_price, order_fee)
-
-    #  Consumer Cyclical / China
-    name = 'Alibaba'
-    ticker_symbol = 'BABA'
-    isin = generate_random_string()
-    default_currency = generate_random_string()
-
-    new_asset = insert_new_asset(
-        name, ticker_symbol, isin, default_currency, new_asset_type.id)
-
-    count = generate_random_float()
-    buy_price = generate_random_float()
-    order_fee = generate_random_float()
-    insert_new_portfolio_element(
-        new_portfolio.id, new_asset.id, count, buy_price, order_fee)
-
-    analysis_dict = (
-        get_stock_portfolio_distribution(new_portfolio.id)
-    )
+
+CLASSIFICATIONS = {
+    'AAPL': {'quoteType': 'EQUITY', 'country': 'United States',
+             'sector': 'Technology', 'trailingPE': 20.0},
+    'SAP': {'quoteType': 'EQUITY', 'country': 'Germany',
+            'sector': 'Technology', 'trailingPE': 25.0},
+    'BABA': {'quoteType': 'EQUITY', 'country': 'China',
+             'sector': 'Consumer Cyclical', 'trailingPE': None},
+    'SPY': {'quoteType': 'ETF', 'country': None, 'sector': None, 'trailingPE': None},
+    'DELISTED': None
+}
+
+
+POSITIONS = [('AAPL', 2.0, 50.0), ('SAP', 0.5, 100.0), ('BABA', 2.0, 100.0),
+             ('SPY', 10.0, 400.0), ('DELISTED', 1.0, 10.0)]
+
+PRICES = {'AAPL': 100.0, 'SAP': 200.0, 'BABA': 50.0, 'SPY': 500.0}
+
+
+@pytest.fixture(scope='function')
+def portfolio_id(session: Session, analysis_portfolio_factory):
+    """
+    Pytest Fixture that creates a portfolio with stocks, an ETF and an unknown ticker.
+        Parameters:
+            Session session;
+            function analysis_portfolio_factory;
+        Returns:
+            str: The portfolio ID.
+    """
+    return analysis_portfolio_factory(POSITIONS, CLASSIFICATIONS, PRICES)
+
+
+def test_get_stock_portfolio_distribution(portfolio_id: str):
+    # Market values: AAPL 200, SAP 100, BABA 100, the ETF is not a stock
+    analysis_dict = get_stock_portfolio_distribution(portfolio_id)
 
     test_country_weightings = analysis_dict['country_weights']
     test_sector_weightings = analysis_dict['sector_weights']
@@ -72,9 +45,43 @@ def test_get_stock_portfolio_distribution(session: Session):
     assert len(test_country_weightings) == 3
     assert len(test_sector_weightings) == 2
 
-    assert test_country_weightings['United States'] == 33.33
-    assert test_country_weightings['Germany'] == 33.33
-    assert test_country_weightings['China'] == 33.33
+    assert test_country_weightings['United States'] == 50.0
+    assert test_country_weightings['Germany'] == 25.0
+    assert test_country_weightings['China'] == 25.0
+
+    assert test_sector_weightings['Technology'] == 75.0
+    assert test_sector_weightings['Consumer Cyclical'] == 25.0
+
+    # Total value 300 of the stocks with a P/E divided by earnings of 200 / 20 + 100 / 25
+    assert analysis_dict['avg_trailing_pe'] == pytest.approx(300 / 14)
+    assert analysis_dict['missing_prices'] == []
+
+
+def test_get_stock_portfolio_distribution_cost_basis(portfolio_id: str):
+    # Cost basis: AAPL 100, SAP 50, BABA 200
+    analysis_dict = get_stock_portfolio_distribution(portfolio_id, 'cost_basis')
+
+    assert analysis_dict['weight_by'] == 'cost_basis'
+    assert analysis_dict['country_weights'] == {
+        'United States': 28.57, 'Germany': 14.29, 'China': 57.14}
+    assert analysis_dict['avg_trailing_pe'] == pytest.approx(150 / 7)
+
+
+def test_get_stock_portfolio_distribution_missing_data(session: Session, analysis_portfolio_factory):
+    # Empty portfolio
+    portfolio_id = analysis_portfolio_factory([], CLASSIFICATIONS, {})
+    analysis_dict = get_stock_portfolio_distribution(portfolio_id)
+    assert analysis_dict['country_weights'] == {}
+    assert analysis_dict['avg_trailing_pe'] is None
+
+    # No price and no P/E available
+    analysis_portfolio_factory([('BABA', 1.0, 10.0)], CLASSIFICATIONS, {}, portfolio_id)
+
+    analysis_dict = get_stock_portfolio_distribution(portfolio_id)
+    assert analysis_dict['sector_weights'] == {}
+    assert analysis_dict['avg_trailing_pe'] is None
+    assert analysis_dict['missing_prices'] == ['BABA']
 
-    assert test_sector_weightings['Technology'] == 66.67
-    assert test_sector_weightings['Consumer Cyclical'] == 33.33
+    analysis_dict = get_stock_portfolio_distribution(portfolio_id, 'cost_basis')
+    assert analysis_dict['country_weights'] == {'China': 100.0}
+    assert analysis_dict['avg_trailing_pe'] is None
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy.orm.session import Session
+
+from src.portfolio_analysis import valuation
+from tests.database.conftest import session
+from tests.database.helper_queries import (generate_new_asset_type,
+                                           generate_new_portfolio,
+                                           generate_new_user, insert_new_asset,
+                                           insert_new_portfolio_element)
+
+
+def test_get_portfolio_valuation(session: Session, monkeypatch):
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+    new_asset_type = generate_new_asset_type()
+
+    prices = {
+        'AAPL': {'price': 200.0, 'timestamp': None, 'currency': 'USD'},
+        'MSFT': {'price': 50.0, 'timestamp': None, 'currency': 'USD'},
+        'DELISTED': None
+    }
+    monkeypatch.setattr(valuation, 'get_current_prices',
+                        lambda tickers: {t: prices[t] for t in tickers})
+
+    for ticker, count, buy_price, order_fee in [('AAPL', 3, 100.0, 10.0),
+                                                ('MSFT', 4, 50.0, 0.0),
+                                                ('DELISTED', 1, 10.0, None)]:
+        new_asset = insert_new_asset(
+            ticker, ticker, None, 'USD', new_asset_type.id)
+        insert_new_portfolio_element(
+            new_portfolio.id, new_asset.id, count, buy_price, order_fee)
+
+    result = valuation.get_portfolio_valuation(new_portfolio.id)
+
+    assert result['total_market_value'] == 800.0
+    assert result['total_cost_basis'] == 510.0
+    assert result['total_unrealized_pnl'] == 290.0
+    assert result['total_unrealized_pnl_percent'] == pytest.approx(56.86, 0.01)
+    assert result['missing_prices'] == ['DELISTED']
+
+    positions = {p['ticker_symbol']: p for p in result['positions']}
+
+    assert positions['AAPL']['market_value'] == 600.0
+    assert positions['AAPL']['cost_basis'] == 310.0
+    assert positions['AAPL']['unrealized_pnl'] == 290.0
+    assert positions['AAPL']['weight'] == 75.0
+    assert positions['AAPL']['currency'] == 'USD'
+
+    assert positions['MSFT']['unrealized_pnl'] == 0.0
+    assert positions['MSFT']['weight'] == 25.0
+
+    assert positions['DELISTED']['price'] is None
+    assert positions['DELISTED']['market_value'] is None
+    assert positions['DELISTED']['cost_basis'] == 10.0
+
+
+def test_get_portfolio_valuation_empty(session: Session):
+    new_user = generate_new_user()
+    new_portfolio = generate_new_portfolio(new_user.id)
+
+    result = valuation.get_portfolio_valuation(new_portfolio.id)
+
+    assert result['total_market_value'] == 0.0
+    assert result['total_unrealized_pnl_percent'] is None
+    assert result['positions'] == []